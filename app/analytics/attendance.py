@@ -0,0 +1,173 @@
+# ============================
+# ANALYTICS: ATTENDANCE MATRIX
+# ============================
+# Matriz diputados x sesiones de un período con el código de asistencia de
+# cada celda, para heatmaps. Se arma con un solo scan (yield_per) sobre las
+# particiones de attendances del rango y se entrega codificada:
+#   nibble  4 bits por celda, dos celdas por byte (la primera en el nibble alto)
+#   rle     corridas (código uint8, largo uint32 little-endian)
+# ambas en orden fila-mayor (diputado, sesión) y en base64.
+# Código 0 = sin registro; 1..n = tipos de asistencia (ver legend).
+
+import base64
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time as dtime
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Attendance, AttendanceType, LegislativeSession
+
+NO_RECORD = 0
+ENCODINGS = ("nibble", "rle")
+MAX_NIBBLE_CODE = 15
+
+# ------------------------------------------------------------
+# Matriz de un Período
+# ------------------------------------------------------------
+@dataclass
+class AttendanceMatrix:
+    member_ids: np.ndarray      # (m,) int64, ordenado
+    session_ids: np.ndarray     # (s,) int64, por fecha de inicio
+    session_dates: np.ndarray   # (s,) datetime64[s]
+    type_ids: np.ndarray        # (n,) int64, código i + 1 = type_ids[i]
+    codes: np.ndarray           # (m, s) uint8
+    encoded: Dict[str, str] = field(default_factory=dict)
+
+    def encode(self, encoding: str) -> str:
+        data = self.encoded.get(encoding)
+        if data is None:
+            if encoding == "nibble" and self.type_ids.size > MAX_NIBBLE_CODE:
+                raise ValueError("Too many attendance types for 4-bit codes")
+            raw = encode_nibbles(self.codes) if encoding == "nibble" else encode_rle(self.codes)
+            data = self.encoded[encoding] = base64.b64encode(raw).decode("ascii")
+        return data
+
+
+def encode_nibbles(codes: np.ndarray) -> bytes:
+    flat = codes.ravel()
+    if flat.size % 2:
+        flat = np.append(flat, np.uint8(NO_RECORD))
+    return ((flat[0::2] << 4) | flat[1::2]).astype(np.uint8).tobytes()
+
+
+def encode_rle(codes: np.ndarray) -> bytes:
+    flat = codes.ravel()
+    if not flat.size:
+        return b""
+    starts = np.flatnonzero(np.concatenate([[True], flat[1:] != flat[:-1]]))
+    lengths = np.diff(np.append(starts, flat.size))
+    runs = np.empty(starts.size, dtype=[("code", "u1"), ("length", "<u4")])
+    runs["code"] = flat[starts]
+    runs["length"] = lengths
+    return runs.tobytes()
+
+
+def build_attendance_matrix(db: Session, date_from: Optional[date], date_to: Optional[date]) -> AttendanceMatrix:
+    session_filters, attendance_filters = [], []
+    if date_from:
+        start = datetime.combine(date_from, dtime.min)
+        session_filters.append(LegislativeSession.start_date >= start)
+        attendance_filters.append(Attendance.session_date >= start)
+    if date_to:
+        end = datetime.combine(date_to, dtime.max)
+        session_filters.append(LegislativeSession.start_date <= end)
+        attendance_filters.append(Attendance.session_date <= end)
+
+    sessions = db.execute(
+        select(LegislativeSession.id, LegislativeSession.start_date)
+        .where(*session_filters)
+        .order_by(LegislativeSession.start_date.asc(), LegislativeSession.id.asc())
+    ).all()
+    session_ids = np.fromiter((s[0] for s in sessions), dtype=np.int64, count=len(sessions))
+    session_dates = np.array([s[1] for s in sessions], dtype="datetime64[s]")
+
+    type_ids = np.array(sorted(db.execute(select(AttendanceType.id)).scalars()), dtype=np.int64)
+
+    # Un scan por las particiones del rango (session_date = clave de partición)
+    result = db.execute(
+        select(Attendance.session_id, Attendance.parliament_member_id, Attendance.attendance_type_id)
+        .where(*attendance_filters)
+        .execution_options(yield_per=50_000)
+    )
+    chunks = [np.asarray(part, dtype=np.int64).reshape(-1, 3) for part in result.partitions()]
+    rows = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+
+    # Columna por session_id; se descartan filas de sesiones fuera del rango
+    sorter = np.argsort(session_ids)
+    if session_ids.size:
+        pos = sorter[np.minimum(np.searchsorted(session_ids, rows[:, 0], sorter=sorter), session_ids.size - 1)]
+        keep = session_ids[pos] == rows[:, 0]
+    else:
+        pos, keep = np.zeros(rows.shape[0], dtype=np.int64), np.zeros(rows.shape[0], dtype=bool)
+    rows, cols = rows[keep], pos[keep]
+
+    # attendance_type_id -> código con una tabla de consulta
+    lut = np.zeros(int(type_ids.max(initial=0)) + 1, dtype=np.uint8)
+    lut[type_ids] = np.arange(1, type_ids.size + 1, dtype=np.uint8)
+    types = rows[:, 2]
+    type_codes = np.where(types < lut.size, lut[np.minimum(types, lut.size - 1)], NO_RECORD)
+
+    member_ids = np.unique(rows[:, 1])
+    codes = np.zeros((member_ids.size, session_ids.size), dtype=np.uint8)
+    codes[np.searchsorted(member_ids, rows[:, 1]), cols] = type_codes
+
+    return AttendanceMatrix(member_ids, session_ids, session_dates, type_ids, codes)
+
+# ------------------------------------------------------------
+# Caché por Período
+# ------------------------------------------------------------
+def _matrix_version(db: Session) -> tuple:
+    return db.execute(
+        select(
+            select(func.max(Attendance.change_seq)).scalar_subquery(),
+            select(func.count(Attendance.id)).scalar_subquery(),
+            select(func.max(LegislativeSession.change_seq)).scalar_subquery(),
+            select(func.count(LegislativeSession.id)).scalar_subquery(),
+        )
+    ).one()._tuple()
+
+
+class AttendanceMatrixCache:
+    def __init__(self, refresh_seconds: float = 30.0, max_results: int = 16):
+        self.refresh_seconds = refresh_seconds
+        self.max_results = max_results
+        self._version: Optional[tuple] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[tuple, AttendanceMatrix]" = OrderedDict()
+
+    def _refresh(self, db: Session) -> tuple:
+        if self._version is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return self._version
+        with self._lock:
+            if self._version is None or time.monotonic() - self._checked_at >= self.refresh_seconds:
+                version = _matrix_version(db)
+                if version != self._version:
+                    self._version = version
+                    self._results.clear()
+                self._checked_at = time.monotonic()
+        return self._version
+
+    def matrix(self, db: Session, date_from: Optional[date] = None, date_to: Optional[date] = None) -> AttendanceMatrix:
+        version = self._refresh(db)
+        key = (version, date_from, date_to)
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        result = build_attendance_matrix(db, date_from, date_to)
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+
+attendance_matrix_cache = AttendanceMatrixCache(refresh_seconds=settings.analytics_refresh_seconds)
@@ -0,0 +1,289 @@
+# ============================
+# ANALYTICS: CO-AUTHORSHIP GRAPH
+# ============================
+# Grafo de coautoría entre diputados a partir de law_project_authors.
+# La adyacencia es dispersa (lista de aristas src < dst con peso = proyectos
+# en común); grado, fuerza y centralidad de vector propio salen de sumas
+# vectorizadas sobre esa lista. Una arista es "entre partidos" cuando los
+# coautores militaban en partidos distintos a la fecha de ingreso del
+# proyecto. Las filas de autoría se mantienen en memoria y solo se
+# vuelven a leer las que cambiaron (change_seq, app/db/sql/008) o las de
+# proyectos modificados desde el cursor del feed (entry_date).
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.changefeed import START, Cursor, change_horizon, changed_since, feed_position
+from app.db.models import LawProject, LawProjectAuthor
+from app.services.memberships import MembershipIndex
+
+NO_PARTY = -1
+CENTRALITY_ITERATIONS = 200
+CENTRALITY_TOLERANCE = 1e-9
+
+# ------------------------------------------------------------
+# Filas de Autoría (en memoria, actualización incremental)
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class AuthorRows:
+    version: tuple
+    stamps: Mapping[int, int]   # law_project_authors.id -> change_seq
+    ids: np.ndarray             # (r,) int64
+    bills: np.ndarray           # (r,) int64
+    members: np.ndarray         # (r,) int64
+    dates: np.ndarray           # (r,) datetime64[D], ingreso del proyecto
+    project_cursor: Cursor = START
+    revision: int = 0
+
+
+EMPTY_ROWS = AuthorRows(
+    version=(),
+    stamps={},
+    ids=np.empty(0, dtype=np.int64),
+    bills=np.empty(0, dtype=np.int64),
+    members=np.empty(0, dtype=np.int64),
+    dates=np.empty(0, dtype="datetime64[D]"),
+)
+
+
+def _rows_version(db: Session) -> tuple:
+    return db.execute(
+        select(
+            select(func.max(LawProjectAuthor.change_seq)).scalar_subquery(),
+            select(func.count(LawProjectAuthor.id)).scalar_subquery(),
+        )
+    ).one()._tuple()
+
+
+def _changed_projects(db: Session, cursor: Cursor, horizon: int) -> Tuple[List[int], Cursor]:
+    t = LawProject.__table__
+    stmt = select(t.c.id, t.c.change_xid, t.c.change_seq).where(*changed_since(t, cursor, horizon))
+    rows = db.execute(stmt).all()
+    return [r[0] for r in rows], max(((r[1], r[2]) for r in rows), default=cursor)
+
+
+def _fetch(db: Session, ids=None):
+    stmt = (
+        select(
+            LawProjectAuthor.id,
+            LawProjectAuthor.law_project_id,
+            LawProjectAuthor.parliament_member_id,
+            LawProject.entry_date,
+        )
+        .join(LawProject, LawProject.id == LawProjectAuthor.law_project_id)
+    )
+    if ids is not None:
+        stmt = stmt.where(LawProjectAuthor.id.in_(ids))
+    rows = db.execute(stmt).all()
+    n = len(rows)
+    return (
+        np.fromiter((r[0] for r in rows), dtype=np.int64, count=n),
+        np.fromiter((r[1] for r in rows), dtype=np.int64, count=n),
+        np.fromiter((r[2] for r in rows), dtype=np.int64, count=n),
+        np.array([r[3] for r in rows], dtype="datetime64[D]"),
+    )
+
+
+def load_author_rows(db: Session, previous: AuthorRows, version: tuple, projects: List[int]) -> AuthorRows:
+    stamps = dict(db.execute(select(LawProjectAuthor.id, LawProjectAuthor.change_seq)).all())
+    if not previous.revision:
+        return AuthorRows(version, stamps, *_fetch(db), revision=previous.revision + 1)
+
+    # Filas nuevas o modificadas, más las de proyectos modificados (entry_date)
+    changed = {i for i, seq in stamps.items() if previous.stamps.get(i) != seq}
+    if projects:
+        changed.update(previous.ids[np.isin(previous.bills, projects)].tolist())
+    changed &= set(stamps)
+    removed = set(previous.stamps) - set(stamps) | changed
+    keep = ~np.isin(previous.ids, np.fromiter(removed, dtype=np.int64, count=len(removed)))
+    added = _fetch(db, sorted(changed)) if changed else (
+        np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, "datetime64[D]"))
+
+    return AuthorRows(
+        version,
+        stamps,
+        np.concatenate([previous.ids[keep], added[0]]),
+        np.concatenate([previous.bills[keep], added[1]]),
+        np.concatenate([previous.members[keep], added[2]]),
+        np.concatenate([previous.dates[keep], added[3]]),
+        revision=previous.revision + 1,
+    )
+
+
+def refresh_author_rows(db: Session, previous: AuthorRows) -> AuthorRows:
+    horizon = change_horizon(db)
+    version = _rows_version(db)
+    if not previous.revision:
+        cursor = feed_position(db, [LawProject.__table__], horizon)
+        return replace(load_author_rows(db, previous, version, []), project_cursor=cursor)
+
+    # Proyectos nuevos sin autores o cambios en otras columnas: solo avanza el cursor
+    projects, cursor = _changed_projects(db, previous.project_cursor, horizon)
+    projects = np.intersect1d(np.asarray(projects, dtype=np.int64), previous.bills).tolist()
+    if version == previous.version and not projects:
+        return previous if cursor == previous.project_cursor else replace(previous, project_cursor=cursor)
+    return replace(load_author_rows(db, previous, version, projects), project_cursor=cursor)
+
+# ------------------------------------------------------------
+# Grafo (lista de aristas dispersa)
+# ------------------------------------------------------------
+def _parties_at(memberships: MembershipIndex, members: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    parties = np.full(members.size, NO_PARTY, dtype=np.int64)
+    cache: Dict[tuple, int] = {}
+    for i, (m, d) in enumerate(zip(members.tolist(), dates.astype(datetime).tolist())):
+        key = (m, d)
+        if key not in cache:
+            record = memberships.member_party_at(m, datetime.combine(d, datetime.min.time()))
+            cache[key] = record.party_id if record else NO_PARTY
+        parties[i] = cache[key]
+    return parties
+
+
+def _pairs(bills: np.ndarray, codes: np.ndarray, parties: np.ndarray):
+    # Filas ordenadas por proyecto; cada tamaño de grupo k se expande de una vez
+    order = np.argsort(bills, kind="stable")
+    codes, parties = codes[order], parties[order]
+    _, starts, sizes = np.unique(bills[order], return_index=True, return_counts=True)
+
+    a, b, pa, pb = [], [], [], []
+    for k in np.unique(sizes[sizes > 1]).tolist():
+        idx = starts[sizes == k][:, None] + np.arange(k)
+        iu, ju = np.triu_indices(k, 1)
+        a.append(codes[idx[:, iu]].ravel())
+        b.append(codes[idx[:, ju]].ravel())
+        pa.append(parties[idx[:, iu]].ravel())
+        pb.append(parties[idx[:, ju]].ravel())
+    if not a:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    return np.concatenate(a), np.concatenate(b), np.concatenate(pa), np.concatenate(pb)
+
+
+def eigenvector_centrality(n: int, src: np.ndarray, dst: np.ndarray, weight: np.ndarray) -> np.ndarray:
+    if not n or not src.size:
+        return np.zeros(n)
+    x = np.full(n, 1.0 / n)
+    for _ in range(CENTRALITY_ITERATIONS):
+        # (I + A) x: el desplazamiento evita oscilar en componentes bipartitas
+        y = x + np.bincount(src, weight * x[dst], n) + np.bincount(dst, weight * x[src], n)
+        y /= np.linalg.norm(y)
+        if np.abs(y - x).max() < CENTRALITY_TOLERANCE:
+            x = y
+            break
+        x = y
+    return x / x.max()
+
+
+def build_coauthorship(rows: AuthorRows, memberships: MembershipIndex, mask: np.ndarray) -> Dict:
+    bills, members, dates = rows.bills[mask], rows.members[mask], rows.dates[mask]
+
+    # Un autor por proyecto una sola vez
+    if bills.size:
+        _, first = np.unique(np.stack([bills, members], axis=1), axis=0, return_index=True)
+        bills, members, dates = bills[first], members[first], dates[first]
+
+    member_ids = np.unique(members)
+    n = member_ids.size
+    codes = np.searchsorted(member_ids, members)
+    parties = _parties_at(memberships, members, dates)
+
+    a, b, pa, pb = _pairs(bills, codes, parties)
+    lo, hi = np.minimum(a, b), np.maximum(a, b)
+    cross = (pa != pb) & (pa != NO_PARTY) & (pb != NO_PARTY)
+
+    keys, inverse = np.unique(lo * max(n, 1) + hi, return_inverse=True)
+    src, dst = keys // max(n, 1), keys % max(n, 1)
+    weight = np.bincount(inverse, minlength=keys.size).astype(np.float64)
+    cross_weight = np.bincount(inverse, cross.astype(np.float64), keys.size)
+
+    degree = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+    strength = np.bincount(src, weight, n) + np.bincount(dst, weight, n)
+    cross_strength = np.bincount(src, cross_weight, n) + np.bincount(dst, cross_weight, n)
+
+    # Colaboración entre partidos (por proyecto, partido a la fecha)
+    known = (pa != NO_PARTY) & (pb != NO_PARTY)
+    party_pairs = np.stack([np.minimum(pa, pb)[known], np.maximum(pa, pb)[known]], axis=1)
+    if party_pairs.size:
+        party_keys, party_counts = np.unique(party_pairs, axis=0, return_counts=True)
+    else:
+        party_keys, party_counts = np.empty((0, 2), np.int64), np.empty(0, np.int64)
+
+    return {
+        "bills": int(np.unique(bills).size),
+        "member_ids": member_ids,
+        "authored": np.bincount(codes, minlength=n),
+        "degree": degree,
+        "strength": strength,
+        "cross_strength": cross_strength,
+        "centrality": eigenvector_centrality(n, src, dst, weight),
+        "src": member_ids[src] if n else src,
+        "dst": member_ids[dst] if n else dst,
+        "weight": weight,
+        "cross_weight": cross_weight,
+        "party_keys": party_keys,
+        "party_counts": party_counts,
+        "cross_party_share": float(cross.sum() / known.sum()) if known.any() else None,
+    }
+
+# ------------------------------------------------------------
+# Caché
+# ------------------------------------------------------------
+class CoauthorshipCache:
+    def __init__(self, refresh_seconds: float = 30.0, max_results: int = 16):
+        self.refresh_seconds = refresh_seconds
+        self.max_results = max_results
+        self._rows = EMPTY_ROWS
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[tuple, Dict]" = OrderedDict()
+
+    def rows(self, db: Session) -> AuthorRows:
+        if time.monotonic() - self._checked_at < self.refresh_seconds:
+            return self._rows
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.refresh_seconds:
+                rows = refresh_author_rows(db, self._rows)
+                if rows.revision != self._rows.revision:
+                    self._results.clear()
+                self._rows = rows
+                self._checked_at = time.monotonic()
+        return self._rows
+
+    def graph(
+        self,
+        db: Session,
+        memberships: MembershipIndex,
+        reference_version: int,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Dict:
+        rows = self.rows(db)
+        key = (rows.revision, reference_version, date_from, date_to)
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        mask = np.ones(rows.ids.size, dtype=bool)
+        if date_from:
+            mask &= rows.dates >= np.datetime64(date_from, "D")
+        if date_to:
+            mask &= rows.dates <= np.datetime64(date_to, "D")
+        result = build_coauthorship(rows, memberships, mask)
+
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+
+coauthorship_cache = CoauthorshipCache(refresh_seconds=settings.analytics_refresh_seconds)
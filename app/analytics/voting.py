@@ -0,0 +1,307 @@
+# ============================
+# ANALYTICS: VOTING MATRIX
+# ============================
+# Matriz diputados x votaciones (int8) para análisis de co-votación.
+# Se mantiene en memoria y se actualiza desde el feed de cambios
+# (app/db/sql/008): las votaciones con cabecera o detalles nuevos,
+# corregidos o borrados se releen columna a columna; las militancias, cuando
+# cambia la versión de referencia.
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import date, datetime, time as dtime
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.changefeed import START, Cursor, change_horizon, changed_since, feed_position, tombstones_since
+from app.db.models import LawProjectMatter, LawProjectVote, LawProjectVoteDetail, PartyMembership, VoteOption
+from app.services.reference import current_version
+
+# ------------------------------------------------------------
+# Códigos de Voto (vote_options.kind)
+# ------------------------------------------------------------
+ABSENT, YES, NO, ABSTENTION, OTHER = 0, 1, 2, 3, 4
+COUNTED = (YES, NO, ABSTENTION)
+
+# ------------------------------------------------------------
+# Matriz en Memoria
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class VoteMatrix:
+    member_ids: np.ndarray      # (m,) int64, ordenado
+    vote_ids: np.ndarray        # (v,) int64, ordenado
+    vote_dates: np.ndarray      # (v,) datetime64[s]
+    vote_projects: np.ndarray   # (v,) int64
+    codes: np.ndarray           # (m, v) int8
+    party_by_member: Dict[int, int]
+    cursor: Cursor = START      # feed de cambios de votaciones y detalles
+    reference_version: int = 0  # militancias de party_by_member
+    revision: int = 0
+
+
+EMPTY_MATRIX = VoteMatrix(
+    member_ids=np.empty(0, dtype=np.int64),
+    vote_ids=np.empty(0, dtype=np.int64),
+    vote_dates=np.empty(0, dtype="datetime64[s]"),
+    vote_projects=np.empty(0, dtype=np.int64),
+    codes=np.empty((0, 0), dtype=np.int8),
+    party_by_member={},
+)
+
+FEED_TABLES = (LawProjectVote.__table__, LawProjectVoteDetail.__table__)
+
+
+def _load_votes(db: Session, vote_ids: Optional[Set[int]] = None):
+    # Columnas completas de las votaciones pedidas (None: todas)
+    stmt = (
+        select(LawProjectVote.id, LawProjectVote.date, LawProjectVote.law_project_id)
+        .order_by(LawProjectVote.id.asc())
+    )
+    if vote_ids is not None:
+        stmt = stmt.where(LawProjectVote.id.in_(sorted(vote_ids)))
+    votes = db.execute(stmt).all()
+    if not votes:
+        return (np.empty(0, dtype=np.int64), np.empty(0, dtype="datetime64[s]"),
+                np.empty(0, dtype=np.int64), np.empty((0, 3), dtype=np.int64))
+
+    ids = np.fromiter((v[0] for v in votes), dtype=np.int64, count=len(votes))
+    vote_dates = np.array([v[1] for v in votes], dtype="datetime64[s]")
+    vote_projects = np.fromiter((v[2] for v in votes), dtype=np.int64, count=len(votes))
+
+    # vote_option_id -> kind con una tabla de consulta (sin strings en el camino)
+    kinds = db.execute(select(VoteOption.id, VoteOption.kind)).all()
+    lut = np.full(max((k[0] for k in kinds), default=0) + 1, OTHER, dtype=np.int8)
+    for option_id, kind in kinds:
+        lut[option_id] = kind
+
+    stmt = (
+        select(
+            LawProjectVoteDetail.vote_id,
+            LawProjectVoteDetail.parliament_member_id,
+            LawProjectVoteDetail.vote_option_id,
+        )
+        .where(LawProjectVoteDetail.parliament_member_id.isnot(None))
+        .execution_options(yield_per=50_000)
+    )
+    if vote_ids is not None:
+        # ix_law_project_vote_details_vote en cada partición
+        stmt = stmt.where(LawProjectVoteDetail.vote_id.in_(ids.tolist()))
+    result = db.execute(stmt)
+    chunks = [np.asarray(part, dtype=np.int64).reshape(-1, 3) for part in result.partitions()]
+    details = np.concatenate(chunks) if chunks else np.empty((0, 3), dtype=np.int64)
+    # Detalles de votaciones que no están en la lectura de cabeceras
+    details = details[np.isin(details[:, 0], ids)]
+    option_ids = details[:, 2]
+    details[:, 2] = np.where(option_ids < lut.size, lut[np.minimum(option_ids, lut.size - 1)], OTHER)
+    return ids, vote_dates, vote_projects, details
+
+
+def _changed_votes(db: Session, cursor: Cursor, horizon: int) -> Tuple[Set[int], bool, Cursor]:
+    # Votaciones con cabecera o detalles nuevos, corregidos o borrados desde
+    # el cursor; un detalle borrado no dice su votación: hay que reconstruir
+    touched: Set[int] = set()
+    rebuild = False
+    position = cursor
+
+    v = LawProjectVote.__table__
+    changed = select(v.c.id, v.c.change_xid, v.c.change_seq).where(*changed_since(v, cursor, horizon))
+    for vote_id, xid, seq in db.execute(changed):
+        touched.add(vote_id)
+        position = max(position, (xid, seq))
+
+    d = LawProjectVoteDetail.__table__
+    result = db.execute(
+        select(d.c.vote_id, d.c.change_xid, d.c.change_seq)
+        .where(*changed_since(d, cursor, horizon))
+        .execution_options(yield_per=50_000)
+    )
+    for vote_id, xid, seq in result:
+        if vote_id is not None:
+            touched.add(vote_id)
+        position = max(position, (xid, seq))
+
+    for table_name, row_id, xid, seq in db.execute(tombstones_since([t.name for t in FEED_TABLES], cursor, horizon)):
+        if table_name == v.name:
+            touched.add(row_id)
+        else:
+            rebuild = True
+        position = max(position, (xid, seq))
+    return touched, rebuild, position
+
+
+def _current_parties(db: Session) -> Dict[int, int]:
+    rows = db.execute(
+        select(PartyMembership.parliament_member_id, PartyMembership.party_id)
+        .where(PartyMembership.end_date.is_(None))
+        .order_by(PartyMembership.parliament_member_id.asc(), PartyMembership.start_date.asc())
+    ).all()
+    return {m: p for m, p in rows}
+
+
+def replace_columns(base: VoteMatrix, touched: Set[int], vote_ids, vote_dates, vote_projects, details) -> VoteMatrix:
+    # Quita las columnas tocadas (corregidas o borradas) y agrega las releídas
+    keep = ~np.isin(base.vote_ids, np.fromiter(touched, dtype=np.int64, count=len(touched)))
+    kept = int(keep.sum())
+
+    member_ids = np.union1d(base.member_ids, details[:, 1]) if details.size else base.member_ids
+    codes = np.zeros((member_ids.size, kept + vote_ids.size), dtype=np.int8)
+    if base.member_ids.size and kept:
+        codes[np.searchsorted(member_ids, base.member_ids), :kept] = base.codes[:, keep]
+    if details.size:
+        rows = np.searchsorted(member_ids, details[:, 1])
+        cols = kept + np.searchsorted(vote_ids, details[:, 0])
+        codes[rows, cols] = details[:, 2].astype(np.int8)
+
+    all_ids = np.concatenate([base.vote_ids[keep], vote_ids])
+    order = np.argsort(all_ids, kind="stable")
+    return replace(
+        base,
+        member_ids=member_ids,
+        vote_ids=all_ids[order],
+        vote_dates=np.concatenate([base.vote_dates[keep], vote_dates])[order],
+        vote_projects=np.concatenate([base.vote_projects[keep], vote_projects])[order],
+        codes=codes[:, order],
+    )
+
+
+def refresh_matrix(db: Session, base: VoteMatrix) -> VoteMatrix:
+    horizon = change_horizon(db)
+    matrix = base
+    touched, rebuild, cursor = (set(), True, START) if base.revision == 0 else _changed_votes(db, base.cursor, horizon)
+    if rebuild:
+        cursor = feed_position(db, FEED_TABLES, horizon)
+        matrix = replace_columns(EMPTY_MATRIX, set(), *_load_votes(db))
+    elif touched:
+        matrix = replace_columns(base, touched, *_load_votes(db, touched))
+
+    version = current_version(db)
+    parties = base.party_by_member
+    if rebuild or version != base.reference_version:
+        parties = _current_parties(db)
+
+    if matrix is base and cursor == base.cursor and parties is base.party_by_member:
+        return base
+    return replace(
+        matrix,
+        cursor=cursor,
+        reference_version=version,
+        party_by_member=parties,
+        revision=base.revision + 1,
+    )
+
+# ------------------------------------------------------------
+# Similitud y Cohesión (vectorizado)
+# ------------------------------------------------------------
+def agreement_matrix(codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    if not codes.size:
+        n = codes.shape[0]
+        return np.full((n, n), np.nan, dtype=np.float32), np.zeros((n, n), dtype=np.int32)
+
+    # Bloques one-hot [sí | no | abst]: un solo producto da las coincidencias
+    onehot = np.concatenate([(codes == k) for k in COUNTED], axis=1).astype(np.float32)
+    same = onehot @ onehot.T
+    voted = ((codes >= YES) & (codes <= ABSTENTION)).astype(np.float32)
+    shared = voted @ voted.T
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        agreement = np.where(shared > 0, same / shared, np.nan).astype(np.float32)
+    return agreement, shared.astype(np.int32)
+
+
+def party_agreement(agreement: np.ndarray, parties: np.ndarray) -> List[Dict]:
+    result = []
+    for party_id in np.unique(parties[parties > 0]):
+        idx = np.flatnonzero(parties == party_id)
+        n = idx.size
+        value = None
+        if n > 1:
+            sub = agreement[np.ix_(idx, idx)]
+            off = sub[~np.eye(n, dtype=bool)]
+            if np.isfinite(off).any():
+                value = round(float(np.nanmean(off)), 4)
+        result.append({"party_id": int(party_id), "members": int(n), "agreement": value})
+    return result
+
+# ------------------------------------------------------------
+# Caché
+# ------------------------------------------------------------
+class SimilarityCache:
+    def __init__(self, refresh_seconds: float = 30.0, max_results: int = 32):
+        self.refresh_seconds = refresh_seconds
+        self.max_results = max_results
+        self._matrix = EMPTY_MATRIX
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[tuple, Dict]" = OrderedDict()
+
+    def matrix(self, db: Session) -> VoteMatrix:
+        if time.monotonic() - self._checked_at < self.refresh_seconds:
+            return self._matrix
+        with self._lock:
+            if time.monotonic() - self._checked_at >= self.refresh_seconds:
+                matrix = refresh_matrix(db, self._matrix)
+                if matrix is not self._matrix:
+                    self._matrix = matrix
+                    self._results.clear()
+                self._checked_at = time.monotonic()
+        return self._matrix
+
+    def similarity(
+        self,
+        db: Session,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        matter_id: Optional[int] = None,
+        party_id: Optional[int] = None,
+    ) -> Dict:
+        matrix = self.matrix(db)
+        key = (matrix.revision, date_from, date_to, matter_id, party_id)
+        cached = self._results.get(key)
+        if cached is not None:
+            return cached
+
+        cols = np.ones(matrix.vote_ids.size, dtype=bool)
+        if date_from:
+            cols &= matrix.vote_dates >= np.datetime64(datetime.combine(date_from, dtime.min), "s")
+        if date_to:
+            cols &= matrix.vote_dates <= np.datetime64(datetime.combine(date_to, dtime.max), "s")
+        if matter_id is not None:
+            project_ids = db.execute(
+                select(LawProjectMatter.law_project_id).where(LawProjectMatter.matter_id == matter_id)
+            ).scalars().all()
+            cols &= np.isin(matrix.vote_projects, np.asarray(project_ids, dtype=np.int64))
+
+        parties = np.fromiter(
+            (matrix.party_by_member.get(int(m), 0) for m in matrix.member_ids),
+            dtype=np.int64, count=matrix.member_ids.size,
+        )
+        codes = matrix.codes[:, cols]
+        rows = ((codes >= YES) & (codes <= ABSTENTION)).any(axis=1)
+        if party_id is not None:
+            rows &= parties == party_id
+
+        codes = codes[rows]
+        agreement, _ = agreement_matrix(codes)
+        rounded = np.round(agreement.astype(np.float64), 4)
+
+        result = {
+            "member_ids": matrix.member_ids[rows].tolist(),
+            "votes": int(cols.sum()),
+            "agreement": np.where(np.isnan(rounded), None, rounded).tolist(),
+            "parties": party_agreement(agreement, parties[rows]),
+        }
+
+        with self._lock:
+            self._results[key] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return result
+
+
+similarity_cache = SimilarityCache(refresh_seconds=settings.analytics_refresh_seconds)
@@ -0,0 +1,47 @@
+# ============================
+# ADMIN API
+# ============================
+# Perfiles de request (app/core/profiling.py). Requiere X-Admin-Token;
+# sin ADMIN_TOKEN configurado los endpoints no existen (404).
+# El archivo se abre en https://www.speedscope.app
+
+import hmac
+import os
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.profiling import profile_store
+from app.schemas.schemas import RequestProfileSchema
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not settings.admin_token:
+        raise HTTPException(status_code=404, detail="Not found")
+    # Bytes: compare_digest no admite str con caracteres no ASCII (las cabeceras llegan en latin-1)
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode("latin-1"), settings.admin_token.encode()):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+# ------------------------------------------------------------
+# Perfiles de Request
+# ------------------------------------------------------------
+@router.get("/profiles", response_model=List[RequestProfileSchema])
+def list_profiles():
+    return profile_store.list()
+
+
+@router.get("/profiles/{id}")
+def get_profile(id: str):
+    profile = profile_store.get(id)
+    if profile is None or not os.path.exists(profile_store.path(id)):
+        raise HTTPException(status_code=404, detail="Not found")
+    return FileResponse(
+        profile_store.path(id),
+        media_type="application/json",
+        filename=f"{id}.speedscope.json",
+    )
@@ -0,0 +1,105 @@
+# ============================
+# ANALYTICS API
+# ============================
+
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db.base import get_db
+from app.services.reference import ReferenceSnapshot, get_reference
+from app.schemas.schemas import CoauthorshipSchema, SimilarityMatrixSchema
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+# ------------------------------------------------------------
+# Similitud de Votación entre Diputados
+# ------------------------------------------------------------
+@router.get("/similarity", response_model=SimilarityMatrixSchema)
+def get_vote_similarity(
+    db: Session = Depends(get_db),
+    date_from: Optional[date] = Query(None, alias="from", description="Desde (fecha de votación)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Hasta (fecha de votación)"),
+    matter_id: Optional[int] = Query(None, description="Solo proyectos de esta materia"),
+    party_id: Optional[int] = Query(None, description="Solo diputados de este partido"),
+):
+    # Import diferido: el módulo se carga con el warm-up o la primera request
+    from app.analytics.voting import similarity_cache
+
+    return similarity_cache.similarity(
+        db,
+        date_from=date_from,
+        date_to=date_to,
+        matter_id=matter_id,
+        party_id=party_id,
+    )
+
+# ------------------------------------------------------------
+# Red de Coautoría
+# ------------------------------------------------------------
+@router.get("/coauthorship", response_model=CoauthorshipSchema)
+def get_coauthorship(
+    db: Session = Depends(get_db),
+    ref: ReferenceSnapshot = Depends(get_reference),
+    date_from: Optional[date] = Query(None, alias="from", description="Desde (ingreso del proyecto)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Hasta (ingreso del proyecto)"),
+    party_id: Optional[int] = Query(None, description="Solo diputados con militancia actual en este partido"),
+    limit: int = Query(50, ge=1, le=500, description="Diputados, por centralidad"),
+    edges: int = Query(100, ge=0, le=5000, description="Aristas de mayor peso entre los diputados devueltos"),
+):
+    from app.analytics.coauthorship import coauthorship_cache
+
+    g = coauthorship_cache.graph(db, ref.memberships, ref.version, date_from, date_to)
+    member_ids = g["member_ids"]
+
+    current = {}
+    for m in member_ids.tolist():
+        record = ref.memberships.current(m)
+        current[m] = record.party_id if record and record.end_date is None else None
+
+    rows = np.argsort(-g["centrality"], kind="stable")
+    if party_id is not None:
+        rows = rows[[current[m] == party_id for m in member_ids[rows].tolist()]]
+    rows = rows[:limit]
+
+    members = [
+        {
+            "member_id": int(member_ids[i]),
+            "party_id": current[int(member_ids[i])],
+            "bills": int(g["authored"][i]),
+            "degree": int(g["degree"][i]),
+            "strength": int(g["strength"][i]),
+            "centrality": round(float(g["centrality"][i]), 6),
+            "cross_party_share": round(float(g["cross_strength"][i] / g["strength"][i]), 4)
+            if g["strength"][i] else None,
+        }
+        for i in rows.tolist()
+    ]
+
+    shown = member_ids[rows]
+    within = np.isin(g["src"], shown) & np.isin(g["dst"], shown)
+    top = np.flatnonzero(within)[np.argsort(-g["weight"][within], kind="stable")][:edges]
+
+    return {
+        "bills": g["bills"],
+        "members_total": int(member_ids.size),
+        "edges_total": int(g["weight"].size),
+        "cross_party_share": round(g["cross_party_share"], 4) if g["cross_party_share"] is not None else None,
+        "members": members,
+        "edges": [
+            {
+                "source": int(g["src"][e]),
+                "target": int(g["dst"][e]),
+                "weight": int(g["weight"][e]),
+                "cross_party_weight": int(g["cross_weight"][e]),
+            }
+            for e in top.tolist()
+        ],
+        "party_pairs": [
+            {"party_a": int(a), "party_b": int(b), "weight": int(n)}
+            for (a, b), n in sorted(zip(g["party_keys"].tolist(), g["party_counts"].tolist()), key=lambda x: -x[1])
+        ],
+    }
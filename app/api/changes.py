@@ -0,0 +1,141 @@
+# ============================
+# CHANGES API
+# ============================
+# Feed incremental para clientes y espejos (app/db/sql/008).
+# Cursor opaco "<change_xid>.<change_seq>"; sin since se entrega todo desde el inicio.
+
+from typing import Dict, List, Optional, Set, Tuple
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app.db.base import get_db
+from app.db.changefeed import change_horizon
+from app.db.models import (
+    ParliamentMember, Party, PartyMembership, Attendance, LegislativeSession, District, Commune, DistrictCommune,
+    LawProject, LawProjectVote, LawProjectVoteDetail, VoteOption, AttendanceType, LawProjectMinistry,
+    LawProjectMatter, LawProjectAuthor, Ministry, Matter, ChangeTombstone)
+from app.schemas.schemas import ChangeFeedSchema
+
+router = APIRouter(prefix="/changes", tags=["changes"])
+
+TRACKED_TABLES = {
+    m.__tablename__: m.__table__
+    for m in (
+        ParliamentMember, Party, PartyMembership, Attendance, LegislativeSession, District, Commune,
+        DistrictCommune, LawProject, LawProjectVote, LawProjectVoteDetail, VoteOption, AttendanceType,
+        LawProjectMinistry, LawProjectMatter, LawProjectAuthor, Ministry, Matter,
+    )
+}
+CURSOR_COLUMNS = ("change_xid", "change_seq")
+
+
+def _parse_cursor(token: Optional[str]) -> Tuple[int, int]:
+    if not token:
+        return (0, 0)
+    try:
+        xid, seq = token.split(".")
+        return (int(xid), int(seq))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _format_cursor(cursor: Tuple[int, int]) -> str:
+    return f"{cursor[0]}.{cursor[1]}"
+
+# ------------------------------------------------------------
+# Claves del Feed (un índice (change_xid, change_seq) por tabla)
+# ------------------------------------------------------------
+def _change_keys(db: Session, tables: List[str], cursor: Tuple[int, int], horizon: int, limit: int):
+    parts = []
+    for name in tables:
+        t = TRACKED_TABLES[name]
+        parts.append(
+            select(
+                literal(name).label("table_name"),
+                t.c.id.label("row_id"),
+                t.c.change_xid,
+                t.c.change_seq,
+                literal(False).label("deleted"),
+            )
+            .where(tuple_(t.c.change_xid, t.c.change_seq) > cursor, t.c.change_xid < horizon)
+            .order_by(t.c.change_xid, t.c.change_seq)
+            .limit(limit)
+        )
+    ts = ChangeTombstone
+    parts.append(
+        select(
+            ts.table_name,
+            ts.row_id,
+            ts.change_xid,
+            ts.change_seq,
+            literal(True).label("deleted"),
+        )
+        .where(
+            tuple_(ts.change_xid, ts.change_seq) > cursor,
+            ts.change_xid < horizon,
+            ts.table_name.in_(tables),
+        )
+        .order_by(ts.change_xid, ts.change_seq)
+        .limit(limit)
+    )
+
+    u = union_all(*[p.subquery().select() for p in parts]).subquery("changes")
+    return db.execute(
+        select(u).order_by(u.c.change_xid, u.c.change_seq).limit(limit)
+    ).all()
+
+
+def _load_rows(db: Session, ids_by_table: Dict[str, Set[int]]) -> Dict[Tuple[str, int], Dict]:
+    rows: Dict[Tuple[str, int], Dict] = {}
+    for name, ids in ids_by_table.items():
+        t = TRACKED_TABLES[name]
+        cols = [c for c in t.c if c.computed is None and c.name not in CURSOR_COLUMNS]
+        for r in db.execute(select(*cols).where(t.c.id.in_(ids))):
+            rows[(name, r.id)] = dict(r._mapping)
+    return rows
+
+# ------------------------------------------------------------
+# Cambios desde un Cursor
+# ------------------------------------------------------------
+@router.get("/", response_model=ChangeFeedSchema)
+def list_changes(
+    db: Session = Depends(get_db),
+    since: Optional[str] = Query(None, description="Cursor devuelto en 'next' (vacío: desde el inicio)"),
+    tables: Optional[str] = Query(None, description="Tablas separadas por coma (por defecto, todas)"),
+    limit: int = Query(500, ge=1, le=5000, description="Máximo de cambios por página"),
+):
+    cursor = _parse_cursor(since)
+
+    names = list(TRACKED_TABLES)
+    if tables:
+        names = [t.strip() for t in tables.split(",") if t.strip()]
+        unknown = [t for t in names if t not in TRACKED_TABLES]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(unknown)}")
+
+    keys = _change_keys(db, names, cursor, change_horizon(db), limit + 1)
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+
+    ids_by_table: Dict[str, Set[int]] = {}
+    for k in keys:
+        if not k.deleted:
+            ids_by_table.setdefault(k.table_name, set()).add(k.row_id)
+    rows = _load_rows(db, ids_by_table)
+
+    changes = []
+    for k in keys:
+        if k.deleted:
+            changes.append({"table": k.table_name, "op": "delete", "id": k.row_id})
+            continue
+        row = rows.get((k.table_name, k.row_id))
+        # Borrada entre ambas lecturas: su tombstone llega en una página posterior
+        if row is not None:
+            changes.append({"table": k.table_name, "op": "upsert", "id": k.row_id, "row": row})
+
+    if keys:
+        cursor = (keys[-1].change_xid, keys[-1].change_seq)
+
+    return {"changes": changes, "next": _format_cursor(cursor), "has_more": has_more}
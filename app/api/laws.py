@@ -4,39 +4,116 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import func, or_
-from typing import Dict, Any, List, Optional
+from sqlalchemy import and_, func, or_, select, union
+from datetime import date
+from typing import Dict, Any, List, Optional, Union
 
-from app.db.base import get_db
+from app.core.config import settings
+from app.db.base import SessionLocal, get_db
+from app.db.pipeline import execute_batch
+from app.db.projections import optional_model, prefixed, projection, schema_columns, to_model, to_models
+from app.services.coalescing import SingleFlight
+from app.services.law_facets import FACETS, LawFilters, law_facet_cache
+from app.services.reference import ReferenceSnapshot, get_reference
 from app.db.models import (
     LawProject, LawProjectVote, LawProjectVoteDetail, LawProjectAuthor, LawProjectMatter, LawProjectMinistry,
-    ParliamentMember, PartyMembership, Party, Ministry, Matter)
-from app.schemas.schemas import ( LawProjectWithVotesSchema, LawProjectDetailSchema, PaginatedLawProjectsSchema)
+    LawProjectSummary, ParliamentMember, PartyMembership, Party, Ministry, Matter)
+from app.schemas.schemas import (
+    LawProjectSchema, LawProjectWithVotesSchema, LawProjectDetailSchema, PaginatedLawProjectsSchema,
+    LawProjectSummarySchema, LawProjectWithSummarySchema, PaginatedLawProjectsWithSummarySchema,
+    LawProjectVoteSchema, LawProjectVoteWithDetailSchema, PaginatedLawProjectVotesSchema)
 
 router = APIRouter(prefix="/laws", tags=["laws"])
 
+# Ráfagas sobre el mismo proyecto (p. ej. al cerrar una votación) comparten una ejecución
+law_detail_flight = SingleFlight(
+    "law_detail",
+    fresh_seconds=settings.coalesce_fresh_seconds,
+    stale_seconds=settings.coalesce_stale_seconds,
+    lock_dir=settings.coalesce_lock_dir,
+)
+
+def _full_name(*parts: Optional[str]) -> str:
+    return " ".join(filter(None, [(p or "").strip() for p in parts])).strip() or "N/D"
+
+
+def _facet_values(name: str, values, counts, ref: ReferenceSnapshot) -> List[Dict[str, Any]]:
+    labels = {"matters": ref.matters_by_id, "ministries": ref.ministries_by_id}.get(name)
+    out = []
+    for v, n in zip(values.tolist(), counts.tolist()):
+        if not n:
+            continue
+        item = labels.get(v) if labels is not None else None
+        out.append({"value": v, "label": item.name if item else None, "count": n})
+    if name == "years":
+        return sorted(out, key=lambda x: x["value"], reverse=True)
+    return sorted(out, key=lambda x: (-x["count"], str(x["value"])))
+
 # ------------------------------------------------------------
 # Proyecto + Lista
 # ------------------------------------------------------------
-@router.get("/", response_model=PaginatedLawProjectsSchema)
+@router.get("/", response_model=Union[PaginatedLawProjectsWithSummarySchema, PaginatedLawProjectsSchema])
 def list_law_projects(
     db: Session = Depends(get_db),
     page: int = Query(1, ge=1, description="Página (1-based)"),
     size: int = Query(20, ge=1, le=100, description="Ítems por página"),
+    expand: Optional[str] = Query(None, pattern="^summary$", description="summary: incluye el resumen de votaciones"),
+    ref: ReferenceSnapshot = Depends(get_reference),
+    matter_id: List[int] = Query([], description="Materias (cualquiera)"),
+    ministry_id: List[int] = Query([], description="Ministerios (cualquiera)"),
+    initiative_type: List[str] = Query([], description="Tipos de iniciativa (cualquiera)"),
+    origin_chamber: List[str] = Query([], description="Cámaras de origen (cualquiera)"),
+    year: List[int] = Query([], description="Años de ingreso (cualquiera)"),
+    admissible: Optional[bool] = Query(None),
+    date_from: Optional[date] = Query(None, alias="from", description="Ingreso desde"),
+    date_to: Optional[date] = Query(None, alias="to", description="Ingreso hasta"),
+    facets: bool = Query(False, description="Incluye conteos por materia, ministerio, tipo de iniciativa y año"),
 ):
+    offset = (page - 1) * size
+    filters = LawFilters(
+        matter_ids=matter_id,
+        ministry_ids=ministry_id,
+        initiative_types=initiative_type,
+        origin_chambers=origin_chamber,
+        years=year,
+        admissible=admissible,
+        date_from=date_from,
+        date_to=date_to,
+    )
 
-    total = db.query(func.count(LawProject.id)).scalar() or 0
+    facet_counts = None
+    page_ids: Optional[List[int]] = None
+    if filters.any() or facets:
+        # Filtros y facetas desde el índice en memoria; la DB solo trae la página
+        page_ids, total, counts = law_facet_cache.index(db).search(filters, offset, size, facets)
+        if counts is not None:
+            facet_counts = {name: _facet_values(name, *counts[name], ref) for name in FACETS}
+    else:
+        total = db.query(func.count(LawProject.id)).scalar() or 0
 
     pages = (total + size - 1) // size if total else 0
-    offset = (page - 1) * size
 
-    items = (
-        db.query(LawProject)
-        .order_by(LawProject.entry_date.desc(), LawProject.id.desc())
-        .limit(size)
-        .offset(offset)
-        .all()
-    )
+    order = (LawProject.entry_date.desc(), LawProject.id.desc())
+    if expand == "summary":
+        stmt = (
+            projection(
+                LawProjectSchema, LawProject,
+                LawProjectSummary.law_project_id.label("summary_law_project_id"),
+                *prefixed(LawProjectSummarySchema, LawProjectSummary, "summary_"),
+            )
+            .outerjoin(LawProjectSummary, LawProjectSummary.law_project_id == LawProject.id)
+            .order_by(*order)
+        )
+        items = [
+            LawProjectWithSummarySchema(
+                **to_model(LawProjectSchema, r).model_dump(),
+                summary=optional_model(LawProjectSummarySchema, r, "summary_", "law_project_id"),
+            )
+            for r in _page(db, stmt, page_ids, size, offset)
+        ]
+    else:
+        stmt = projection(LawProjectSchema, LawProject).order_by(*order)
+        items = to_models(LawProjectSchema, _page(db, stmt, page_ids, size, offset))
 
     return {
         "items": items,
@@ -44,33 +121,112 @@ def list_law_projects(
         "page": page,
         "size": size,
         "pages": pages,
+        "facets": facet_counts,
     }
 
+
+def _page(db: Session, stmt, page_ids: Optional[List[int]], size: int, offset: int):
+    if page_ids is None:
+        return db.execute(stmt.limit(size).offset(offset)).all()
+    if not page_ids:
+        return []
+    return db.execute(stmt.where(LawProject.id.in_(page_ids))).all()
+
 # ------------------------------------------------------------
 # Proyecto + Votos
 # ------------------------------------------------------------
 @router.get("/{id}/detail")
-def get_law_project_detail(id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
-    proj: Optional[LawProject] = (
-        db.query(LawProject)
-        .filter(LawProject.id == id)
-        .first()
-    )
-    if not proj:
-        raise HTTPException(status_code=404, detail="Law project not found")
+async def get_law_project_detail(
+    id: int,
+    ref: ReferenceSnapshot = Depends(get_reference),
+) -> Dict[str, Any]:
+    return await law_detail_flight.get((id, ref.version), lambda: _load_law_project_detail(id, ref))
+
+
+def _load_law_project_detail(id: int, ref: ReferenceSnapshot) -> Dict[str, Any]:
+    db = SessionLocal()
+    try:
+        return build_law_project_detail(db, id, ref)
+    finally:
+        db.close()
+
 
-    vote: Optional[LawProjectVote] = (
-        db.query(LawProjectVote)
-        .filter(LawProjectVote.law_project_id == id)
+def build_law_project_detail(db: Session, id: int, ref: ReferenceSnapshot) -> Dict[str, Any]:
+    # Las consultas solo dependen de id: salen juntas (pipeline con psycopg 3)
+    latest = (
+        select(LawProjectVote.id, LawProjectVote.date)
+        .where(LawProjectVote.law_project_id == id)
         .order_by(LawProjectVote.date.desc(), LawProjectVote.id.desc())
-        .first()
+        .limit(1)
+        .subquery()
     )
+    on_latest = and_(LawProjectVoteDetail.vote_id == latest.c.id, LawProjectVoteDetail.vote_date == latest.c.date)
+    voter_ids = select(LawProjectVoteDetail.parliament_member_id).join(latest, on_latest)
+    author_ids = select(LawProjectAuthor.parliament_member_id).where(LawProjectAuthor.law_project_id == id)
+
+    proj_rows, vote_rows, detail_rows, members, pm_rows, author_rows, ministries, matters = execute_batch(db, [
+        select(LawProject.id).where(LawProject.id == id),
+        select(LawProjectVote.__table__)
+        .where(LawProjectVote.law_project_id == id)
+        .order_by(LawProjectVote.date.desc(), LawProjectVote.id.desc())
+        .limit(1),
+        select(LawProjectVoteDetail.id, LawProjectVoteDetail.parliament_member_id, LawProjectVoteDetail.vote_option_id)
+        .join(latest, on_latest)
+        .order_by(LawProjectVoteDetail.id.asc()),
+        select(
+            ParliamentMember.id,
+            ParliamentMember.first_name,
+            ParliamentMember.middle_name,
+            ParliamentMember.last_name,
+            ParliamentMember.second_last_name,
+        )
+        .where(ParliamentMember.id.in_(voter_ids)),
+        select(PartyMembership.parliament_member_id, Party.abbreviation, Party.name)
+        .join(Party, Party.id == PartyMembership.party_id)
+        .where(PartyMembership.parliament_member_id.in_(union(voter_ids, author_ids)))
+        .order_by(
+            PartyMembership.parliament_member_id.asc(),
+            PartyMembership.end_date.isnot(None),
+            PartyMembership.start_date.desc(),
+        ),
+        select(
+            ParliamentMember.id,
+            ParliamentMember.parlid,
+            ParliamentMember.role,
+            ParliamentMember.first_name,
+            ParliamentMember.middle_name,
+            ParliamentMember.last_name,
+            ParliamentMember.second_last_name,
+            ParliamentMember.birth_date,
+            ParliamentMember.gender,
+            ParliamentMember.region,
+            ParliamentMember.constituency,
+            ParliamentMember.phone,
+            ParliamentMember.email,
+            ParliamentMember.curriculum,
+        )
+        .join(LawProjectAuthor, LawProjectAuthor.parliament_member_id == ParliamentMember.id)
+        .where(LawProjectAuthor.law_project_id == id)
+        .order_by(LawProjectAuthor.id.asc()),
+        select(Ministry.id, Ministry.name)
+        .join(LawProjectMinistry, LawProjectMinistry.ministry_id == Ministry.id)
+        .where(LawProjectMinistry.law_project_id == id)
+        .order_by(Ministry.name.asc()),
+        select(Matter.id, Matter.name)
+        .join(LawProjectMatter, LawProjectMatter.matter_id == Matter.id)
+        .where(LawProjectMatter.law_project_id == id)
+        .order_by(Matter.name.asc()),
+    ])
+    if not proj_rows:
+        raise HTTPException(status_code=404, detail="Law project not found")
+
+    vote = vote_rows[0] if vote_rows else None
     if not vote:
         return {
             "proyecto": {
                 "detail": {
                     "id": None,
-                    "law_project_id": proj.id,
+                    "law_project_id": id,
                     "description": None,
                     "date": None,
                     "total_yes": 0,
@@ -94,48 +250,17 @@ def get_law_project_detail(id: int, db: Session = Depends(get_db)) -> Dict[str,
             }
         }
 
-    detail_rows: List[LawProjectVoteDetail] = (
-        db.query(LawProjectVoteDetail)
-        .filter(LawProjectVoteDetail.vote_id == vote.id)
-        .order_by(LawProjectVoteDetail.id.asc())
-        .all()
-    )
-    member_ids = [d.parliament_member_id for d in detail_rows if d.parliament_member_id]
-    members_by_id: Dict[int, ParliamentMember] = {}
+    members_by_id = {m.id: m for m in members}
     party_by_member: Dict[int, Optional[str]] = {}
-
-    if member_ids:
-        members = db.query(ParliamentMember).filter(ParliamentMember.id.in_(member_ids)).all()
-        members_by_id = {m.id: m for m in members}
-
-        pm_rows = (
-            db.query(PartyMembership, Party)
-            .join(Party, Party.id == PartyMembership.party_id)
-            .filter(PartyMembership.parliament_member_id.in_(member_ids))
-            .order_by(
-                PartyMembership.parliament_member_id.asc(),
-                PartyMembership.end_date.isnot(None),
-                PartyMembership.start_date.desc(),
-            )
-            .all()
-        )
-        seen = set()
-        for pm, p in pm_rows:
-            if pm.parliament_member_id in seen:
-                continue
-            party_by_member[pm.parliament_member_id] = p.abbreviation or p.name
-            seen.add(pm.parliament_member_id)
+    for pm in pm_rows:
+        if pm.parliament_member_id not in party_by_member:
+            party_by_member[pm.parliament_member_id] = pm.abbreviation or pm.name
 
     detalle_votacion = []
     for d in detail_rows:
         m = members_by_id.get(d.parliament_member_id) if d.parliament_member_id else None
         if m:
-            full_name = " ".join(filter(None, [
-                (m.first_name or "").strip(),
-                (m.middle_name or "").strip(),
-                (m.last_name or "").strip(),
-                (m.second_last_name or "").strip(),
-            ])).strip() or "N/D"
+            full_name = _full_name(m.first_name, m.middle_name, m.last_name, m.second_last_name)
             party_name = party_by_member.get(m.id)
         else:
             full_name = "N/D"
@@ -145,40 +270,11 @@ def get_law_project_detail(id: int, db: Session = Depends(get_db)) -> Dict[str,
             "id": d.id,
             "name": full_name,
             "party": party_name,
-            "vote": d.vote_option,
+            "vote": ref.vote_label(d.vote_option_id),
         })
 
-    author_rows = (
-        db.query(LawProjectAuthor, ParliamentMember)
-        .join(ParliamentMember, ParliamentMember.id == LawProjectAuthor.parliament_member_id)
-        .filter(LawProjectAuthor.law_project_id == id)
-        .order_by(LawProjectAuthor.id.asc())
-        .all()
-    )
-
-    author_ids = [pm.id for _, pm in author_rows]
-    author_party: Dict[int, Optional[str]] = {}
-    if author_ids:
-        apm_rows = (
-            db.query(PartyMembership, Party)
-            .join(Party, Party.id == PartyMembership.party_id)
-            .filter(PartyMembership.parliament_member_id.in_(author_ids))
-            .order_by(
-                PartyMembership.parliament_member_id.asc(),
-                PartyMembership.end_date.isnot(None),
-                PartyMembership.start_date.desc(),
-            )
-            .all()
-        )
-        seen = set()
-        for pm, p in apm_rows:
-            if pm.parliament_member_id in seen:
-                continue
-            author_party[pm.parliament_member_id] = p.abbreviation or p.name
-            seen.add(pm.parliament_member_id)
-
     authors_detail = []
-    for _, pm in author_rows:
+    for pm in author_rows:
         authors_detail.append({
             "id": pm.id,
             "parlid": pm.parlid,
@@ -191,27 +287,12 @@ def get_law_project_detail(id: int, db: Session = Depends(get_db)) -> Dict[str,
             "gender": pm.gender,
             "region": pm.region,
             "constituency": pm.constituency,
-            "party": author_party.get(pm.id),
+            "party": party_by_member.get(pm.id),
             "phone": pm.phone,
             "email": pm.email,
             "curriculum": pm.curriculum,
         })
 
-    ministries = (
-        db.query(Ministry)
-        .join(LawProjectMinistry, LawProjectMinistry.ministry_id == Ministry.id)
-        .filter(LawProjectMinistry.law_project_id == proj.id)
-        .order_by(Ministry.name.asc())
-        .all()
-    )
-    matters = (
-        db.query(Matter)
-        .join(LawProjectMatter, LawProjectMatter.matter_id == Matter.id)
-        .filter(LawProjectMatter.law_project_id == proj.id)
-        .order_by(Matter.name.asc())
-        .all()
-    )
-
     return {
         "proyecto": {
             "detail": {
@@ -238,4 +319,107 @@ def get_law_project_detail(id: int, db: Session = Depends(get_db)) -> Dict[str,
                 },
             }
         }
-    }
\ No newline at end of file
+    }
+
+# ------------------------------------------------------------
+# Línea de Tiempo de Votaciones (solo totales)
+# ------------------------------------------------------------
+@router.get("/{id}/votes", response_model=PaginatedLawProjectVotesSchema)
+def list_law_project_votes(
+    id: int,
+    db: Session = Depends(get_db),
+    page: int = Query(1, ge=1, description="Página (1-based)"),
+    size: int = Query(50, ge=1, le=200, description="Ítems por página"),
+):
+    offset = (page - 1) * size
+
+    rows = db.execute(
+        projection(LawProjectVoteSchema, LawProjectVote, func.count().over().label("total"))
+        .where(LawProjectVote.law_project_id == id)
+        .order_by(LawProjectVote.date.asc(), LawProjectVote.id.asc())
+        .limit(size)
+        .offset(offset)
+    ).all()
+
+    if rows:
+        total = rows[0].total
+    else:
+        if not db.query(LawProject.id).filter(LawProject.id == id).first():
+            raise HTTPException(status_code=404, detail="Law project not found")
+        total = (
+            db.query(func.count(LawProjectVote.id))
+            .filter(LawProjectVote.law_project_id == id)
+            .scalar() or 0
+        )
+
+    return {
+        "items": to_models(LawProjectVoteSchema, rows),
+        "total": total,
+        "page": page,
+        "size": size,
+        "pages": (total + size - 1) // size if total else 0,
+    }
+
+# ------------------------------------------------------------
+# Detalle de una Votación (voto por diputado)
+# ------------------------------------------------------------
+@router.get("/{id}/votes/{vote_id}", response_model=LawProjectVoteWithDetailSchema)
+def get_law_project_vote(
+    id: int,
+    vote_id: int,
+    db: Session = Depends(get_db),
+    ref: ReferenceSnapshot = Depends(get_reference),
+):
+    current_party = (
+        select(func.coalesce(Party.abbreviation, Party.name))
+        .join(PartyMembership, PartyMembership.party_id == Party.id)
+        .where(PartyMembership.parliament_member_id == ParliamentMember.id)
+        .order_by(PartyMembership.end_date.isnot(None), PartyMembership.start_date.desc())
+        .limit(1)
+        .correlate(ParliamentMember)
+        .scalar_subquery()
+    )
+
+    rows = (
+        db.query(
+            *schema_columns(LawProjectVoteSchema, LawProjectVote),
+            LawProjectVoteDetail.id.label("detail_id"),
+            LawProjectVoteDetail.vote_option_id,
+            ParliamentMember.first_name,
+            ParliamentMember.middle_name,
+            ParliamentMember.last_name,
+            ParliamentMember.second_last_name,
+            current_party.label("party"),
+        )
+        .outerjoin(
+            LawProjectVoteDetail,
+            and_(
+                LawProjectVoteDetail.vote_id == LawProjectVote.id,
+                # Poda de particiones en ejecución (una sola partición por votación)
+                LawProjectVoteDetail.vote_date == LawProjectVote.date,
+            ),
+        )
+        .outerjoin(ParliamentMember, ParliamentMember.id == LawProjectVoteDetail.parliament_member_id)
+        .filter(LawProjectVote.id == vote_id, LawProjectVote.law_project_id == id)
+        .order_by(LawProjectVoteDetail.id.asc())
+        .all()
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="Vote not found")
+
+    vote = to_model(LawProjectVoteSchema, rows[0])
+    votacion = [
+        {
+            "id": r.detail_id,
+            "name": _full_name(r.first_name, r.middle_name, r.last_name, r.second_last_name),
+            "party": r.party,
+            "vote": ref.vote_label(r.vote_option_id),
+        }
+        for r in rows
+        if r.detail_id is not None
+    ]
+
+    return LawProjectVoteWithDetailSchema(
+        **vote.model_dump(),
+        votacion=votacion,
+    )
@@ -0,0 +1,65 @@
+# ============================
+# LIVE API (SSE)
+# ============================
+# Reemplaza el polling de /laws/{id}/detail y /sessions/{id}/attendances
+# durante las sesiones: un evento por cambio ingerido (app/services/live.py).
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.db.models import LawProjectVote, Attendance
+from app.db.projections import projection, to_model
+from app.services.live import live_broker
+from app.services.reference import current_reference
+from app.schemas.schemas import AttendanceSchema, LawProjectVoteSchema
+
+router = APIRouter(prefix="/live", tags=["live"])
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# ------------------------------------------------------------
+# Eventos (se arman una vez por cambio, no por suscriptor)
+# ------------------------------------------------------------
+@live_broker.resolver("vote")
+def _vote_event(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    vote = db.execute(projection(LawProjectVoteSchema, LawProjectVote).where(LawProjectVote.id == payload["id"])).first()
+    if not vote:
+        return None
+    return to_model(LawProjectVoteSchema, vote).model_dump(mode="json")
+
+
+@live_broker.resolver("attendance")
+def _attendance_event(db: Session, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    ref = current_reference()
+    if ref is None:
+        return None
+    rows = db.execute(
+        projection(AttendanceSchema, Attendance, Attendance.attendance_type_id)
+        .where(
+            Attendance.session_id == payload["session_id"],
+            Attendance.session_date == datetime.fromisoformat(payload["session_date"]),
+        )
+        .order_by(Attendance.id.asc())
+    ).all()
+    return {
+        "session_id": payload["session_id"],
+        "attendances": [ref.attendance(a).model_dump(mode="json") for a in rows],
+    }
+
+# ------------------------------------------------------------
+# Votaciones de un Proyecto
+# ------------------------------------------------------------
+@router.get("/laws/{id}")
+async def stream_law_votes(id: int):
+    return StreamingResponse(live_broker.stream(f"law:{id}"), media_type="text/event-stream", headers=SSE_HEADERS)
+
+# ------------------------------------------------------------
+# Asistencia de una Sesión
+# ------------------------------------------------------------
+@router.get("/sessions/{id}")
+async def stream_session_attendances(id: int):
+    return StreamingResponse(live_broker.stream(f"session:{id}"), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -2,13 +2,24 @@
 # PARLIAMENT API
 # ============================
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Optional
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import and_, func, select
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 
-from app.db.base import get_db
-from app.db.models import ParliamentMember, Party, PartyMembership, Attendance
+from app.core.admission import db_admission
+from app.core.config import settings
+from app.core.streaming import stream_list
+from app.db.base import SessionLocal, get_db
+from app.db.pipeline import execute_batch, pipeline_enabled
+from app.db.projections import projection
+from app.db.models import Attendance, LawProject, LawProjectAuthor, LawProjectVote, LawProjectVoteDetail
+from app.services.coalescing import SingleFlight
+from app.services.memberships import MembershipRecord
+from app.services.reference import ReferenceSnapshot, get_reference
 from app.schemas.schemas import (
     ParliamentMemberSchema,
     PartyWithMembershipSchema,
@@ -17,98 +28,90 @@ from app.schemas.schemas import (
     MembershipSchema,
     AttendanceSchema,
     MemberAttendanceResponseSchema,
+    LawProjectSchema,
+    MemberProfileSchema,
+    PaginatedLawProjectsSchema,
 )
 
 router = APIRouter(prefix="/parliament", tags=["parliament"])
 
+profile_flight = SingleFlight(
+    "member_profile",
+    fresh_seconds=settings.profile_cache_seconds,
+    stale_seconds=settings.profile_stale_seconds,
+    lock_dir=settings.coalesce_lock_dir,
+)
+# Acota las conexiones que puede tomar un perfil (cada sub-consulta usa su sesión)
+_profile_pool = ThreadPoolExecutor(max_workers=settings.profile_pool_size, thread_name_prefix="profile")
+
+
+def _member_or_404(ref: ReferenceSnapshot, id: int) -> ParliamentMemberSchema:
+    m = ref.members_by_id.get(id)
+    if not m:
+        raise HTTPException(status_code=404, detail="Not found")
+    return m
+
+
+def _party_with_membership(ref: ReferenceSnapshot, pm: MembershipRecord) -> Optional[PartyWithMembershipSchema]:
+    party = ref.parties_by_id.get(pm.party_id)
+    if not party:
+        return None
+    return PartyWithMembershipSchema(
+        **party.model_dump(),
+        membership=MembershipSchema(start_date=pm.start_date, end_date=pm.end_date),
+    )
+
+
+def _attendance_resume(total_sessions: int, present: int) -> Dict[str, Any]:
+    return {
+        "total_sessions": total_sessions,
+        "attendance": present,
+        "absence": max(total_sessions - present, 0),
+        "attendance_percentage": round((present / total_sessions) * 100, 2) if total_sessions else 0.0,
+    }
+
 # ------------------------------------------------------------
 # Lista de Diputados
 # ------------------------------------------------------------
 @router.get("/", response_model=List[ParliamentMemberSchema])
-async def list_members(db: Session = Depends(get_db)):
-    rows = db.query(ParliamentMember).all()
-    return rows
+async def list_members(ref: ReferenceSnapshot = Depends(get_reference)):
+    return stream_list(ref.members, ParliamentMemberSchema)
 
 # ------------------------------------------------------------
 # Detalle por ID
 # ------------------------------------------------------------
 @router.get("/{id}", response_model=ParliamentMemberSchema)
-async def get_member_by_id(id: int, db: Session = Depends(get_db)):
-    m = db.query(ParliamentMember).filter(ParliamentMember.id == id).first()
-    if not m:
-        raise HTTPException(status_code=404, detail="Not found")
-    return m
+async def get_member_by_id(id: int, ref: ReferenceSnapshot = Depends(get_reference)):
+    return _member_or_404(ref, id)
 
 # ------------------------------------------------------------
 # Diputado + Partido Actual
 # ------------------------------------------------------------
 @router.get("/{id}/party", response_model=MemberWithCurrentPartySchema)
-async def get_member_with_current_party(id: int, db: Session = Depends(get_db)):
-    member: Optional[ParliamentMember] = (
-        db.query(ParliamentMember).filter(ParliamentMember.id == id).first()
-    )
-    if not member:
-        raise HTTPException(status_code=404, detail="Not found")
-
-    current_membership: Optional[PartyMembership] = (
-        db.query(PartyMembership)
-        .filter(
-            and_(
-                PartyMembership.parliament_member_id == id,
-                PartyMembership.end_date.is_(None),
-            )
-        )
-        .order_by(PartyMembership.start_date.desc())
-        .first()
-    ) or (
-        db.query(PartyMembership)
-        .filter(PartyMembership.parliament_member_id == id)
-        .order_by(PartyMembership.start_date.desc())
-        .first()
-    )
-
-    result = {"member": member, "party": None}
+async def get_member_with_current_party(
+    id: int,
+    ref: ReferenceSnapshot = Depends(get_reference),
+    as_of: Optional[datetime] = Query(None, description="Partido a esta fecha (por defecto, el actual)"),
+):
+    member = _member_or_404(ref, id)
 
-    if current_membership:
-        party = db.query(Party).filter(Party.id == current_membership.party_id).first()
-        if party:
-            result["party"] = PartyWithMembershipSchema(
-                **party.__dict__,
-                membership=MembershipSchema(
-                    start_date=current_membership.start_date,
-                    end_date=current_membership.end_date,
-                ),
-            )
+    if as_of is not None:
+        current_membership = ref.memberships.member_party_at(id, as_of)
+    else:
+        current_membership = ref.memberships.current(id)
 
-    return result
+    party = _party_with_membership(ref, current_membership) if current_membership else None
+    return {"member": member, "party": party}
 
 # ------------------------------------------------------------
 # Diputado + Historial de Partidos
 # ------------------------------------------------------------
 @router.get("/{id}/parties", response_model=MemberWithAllPartiesSchema)
-async def get_member_with_all_parties(id: int, db: Session = Depends(get_db)):
-    member: Optional[ParliamentMember] = (
-        db.query(ParliamentMember).filter(ParliamentMember.id == id).first()
-    )
-    if not member:
-        raise HTTPException(status_code=404, detail="Not found")
-
-    rows = (
-        db.query(PartyMembership, Party)
-        .join(Party, Party.id == PartyMembership.party_id)
-        .filter(PartyMembership.parliament_member_id == id)
-        .order_by(PartyMembership.start_date.asc())
-        .all()
-    )
+async def get_member_with_all_parties(id: int, ref: ReferenceSnapshot = Depends(get_reference)):
+    member = _member_or_404(ref, id)
 
     parties = [
-        PartyWithMembershipSchema(
-            **p.__dict__,
-            membership=MembershipSchema(
-                start_date=pm.start_date, end_date=pm.end_date
-            ),
-        )
-        for pm, p in rows
+        p for p in (_party_with_membership(ref, pm) for pm in ref.memberships.history(id)) if p
     ]
 
     return {"member": member, "parties": parties}
@@ -116,38 +119,217 @@ async def get_member_with_all_parties(id: int, db: Session = Depends(get_db)):
 # ------------------------------------------------------------
 # Asistencia de un Diputado
 # ------------------------------------------------------------
-@router.get("/{id}/attendances", response_model=MemberAttendanceResponseSchema)
-async def get_member_attendance(id: int, db: Session = Depends(get_db)):
+@router.get("/{id}/attendances", response_model=MemberAttendanceResponseSchema, dependencies=[Depends(db_admission)])
+def get_member_attendance(
+    id: int,
+    db: Session = Depends(get_db),
+    ref: ReferenceSnapshot = Depends(get_reference),
+    date_from: Optional[date] = Query(None, alias="from", description="Desde (fecha de sesión)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Hasta (fecha de sesión)"),
+):
+    member = _member_or_404(ref, id)
 
-    member = db.query(ParliamentMember).filter(ParliamentMember.id == id).first()
-    if not member:
-        raise HTTPException(status_code=404, detail="Not found")
+    # El rango de fechas acota las particiones de attendances que se leen
+    stmt = (
+        projection(AttendanceSchema, Attendance, Attendance.attendance_type_id)
+        .where(Attendance.parliament_member_id == id)
+    )
+    if date_from:
+        stmt = stmt.where(Attendance.session_date >= datetime.combine(date_from, time.min))
+    if date_to:
+        stmt = stmt.where(Attendance.session_date <= datetime.combine(date_to, time.max))
+    detail = db.execute(stmt.order_by(Attendance.id.asc())).all()
+
+    present = sum(1 for a in detail if ref.is_present(a.attendance_type_id))
+
+    return {
+        "member": member,
+        "resume": _attendance_resume(len(detail), present),
+        "detail": [ref.attendance(a) for a in detail],
+    }
 
-    detail: List[Attendance] = (
-        db.query(Attendance)
-        .filter(Attendance.parliament_member_id == id)
-        .order_by(Attendance.id.asc())
-        .all()
+# ------------------------------------------------------------
+# Perfil Completo (una sola petición)
+# ------------------------------------------------------------
+def _attendance_stmt(id: int):
+    return (
+        select(Attendance.attendance_type_id, func.count())
+        .where(Attendance.parliament_member_id == id)
+        .group_by(Attendance.attendance_type_id)
     )
 
-    PRESENT_ALIASES = {"asiste"}
-    total_sessions = len(detail)
-    present = 0
-    for a in detail:
-        t = (a.attendance_type or "").strip().lower()
-        if t in PRESENT_ALIASES:
-            present += 1
 
-    absent = max(total_sessions - present, 0)
-    present_pct = round((present / total_sessions) * 100, 2) if total_sessions else 0.0
+def _attendance_from_rows(rows, ref: ReferenceSnapshot) -> Dict[str, Any]:
+    total = sum(n for _, n in rows)
+    present = sum(n for type_id, n in rows if ref.is_present(type_id))
+    return _attendance_resume(total, present)
+
+
+def _profile_attendance(db: Session, id: int, ref: ReferenceSnapshot) -> Dict[str, Any]:
+    return _attendance_from_rows(db.execute(_attendance_stmt(id)).all(), ref)
+
 
+def _authored_stmt(id: int, limit: int, offset: int = 0):
+    return (
+        select(*LawProject.__table__.c, func.count().over().label("total"))
+        .join(LawProjectAuthor, LawProjectAuthor.law_project_id == LawProject.id)
+        .where(LawProjectAuthor.parliament_member_id == id)
+        .order_by(LawProject.entry_date.desc(), LawProject.id.desc())
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+def _authored_from_rows(rows, total: int) -> Dict[str, Any]:
     return {
-        "member": member,
-        "resume": {
-            "total_sessions": total_sessions,
-            "attendance": present,
-            "absence": absent,
-            "attendance_percentage": present_pct,
-        },
-        "detail": detail,
-    }
\ No newline at end of file
+        "authored": [LawProjectSchema.model_validate(r).model_dump(mode="json") for r in rows],
+        "authored_total": total,
+    }
+
+
+def _profile_authored(db: Session, id: int, limit: int, offset: int = 0) -> Dict[str, Any]:
+    rows = db.execute(_authored_stmt(id, limit, offset)).all()
+    if not rows and offset:
+        total = db.query(func.count()).filter(LawProjectAuthor.parliament_member_id == id).scalar() or 0
+    else:
+        total = rows[0].total if rows else 0
+    return _authored_from_rows(rows, total)
+
+
+def _votes_stmt(id: int, limit: int):
+    return (
+        select(
+            LawProjectVoteDetail.vote_option_id,
+            LawProjectVote.id,
+            LawProjectVote.date,
+            LawProjectVote.description,
+            LawProjectVote.result,
+            LawProject.id.label("law_project_id"),
+            LawProject.bulletin_number,
+            LawProject.name,
+        )
+        .join(
+            LawProjectVote,
+            and_(
+                LawProjectVote.id == LawProjectVoteDetail.vote_id,
+                LawProjectVote.date == LawProjectVoteDetail.vote_date,
+            ),
+        )
+        .join(LawProject, LawProject.id == LawProjectVote.law_project_id)
+        .where(LawProjectVoteDetail.parliament_member_id == id)
+        .order_by(LawProjectVoteDetail.vote_date.desc(), LawProjectVoteDetail.vote_id.desc())
+        .limit(limit)
+    )
+
+
+def _votes_from_rows(rows, ref: ReferenceSnapshot) -> List[Dict[str, Any]]:
+    return [
+        {
+            "vote_id": r.id,
+            "law_project_id": r.law_project_id,
+            "bulletin_number": r.bulletin_number,
+            "project_name": r.name,
+            "date": r.date.isoformat(),
+            "description": r.description,
+            "result": r.result,
+            "vote": ref.vote_label(r.vote_option_id),
+        }
+        for r in rows
+    ]
+
+
+def _profile_votes(db: Session, id: int, limit: int, ref: ReferenceSnapshot) -> List[Dict[str, Any]]:
+    return _votes_from_rows(db.execute(_votes_stmt(id, limit)).all(), ref)
+
+
+def _profile_pipelined(db: Session, id: int, votes: int, authored: int, ref: ReferenceSnapshot) -> Dict[str, Any]:
+    # Una conexión y un viaje al servidor para las tres consultas
+    attendance, authored_rows, vote_rows = execute_batch(
+        db, [_attendance_stmt(id), _authored_stmt(id, authored), _votes_stmt(id, votes)])
+    return {
+        "attendance": _attendance_from_rows(attendance, ref),
+        **_authored_from_rows(authored_rows, authored_rows[0].total if authored_rows else 0),
+        "recent_votes": _votes_from_rows(vote_rows, ref),
+    }
+
+
+def _in_session(fn: Callable, *args):
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def _profile_queries(ref: ReferenceSnapshot, id: int, votes: int, authored: int) -> Dict[str, Any]:
+    # psycopg 3: una conexión y un viaje; si no, una sesión por consulta en paralelo
+    db = SessionLocal()
+    try:
+        if pipeline_enabled(db):
+            return _profile_pipelined(db, id, votes, authored, ref)
+    finally:
+        db.close()
+
+    # Cada tarea con una copia del contexto: el deadline del request
+    # (statement_timeout) también rige en los hilos del pool
+    def submit(fn, *args):
+        return _profile_pool.submit(contextvars.copy_context().run, _in_session, fn, *args)
+
+    attendance = submit(_profile_attendance, id, ref)
+    authored_projects = submit(_profile_authored, id, authored)
+    recent_votes = submit(_profile_votes, id, votes, ref)
+    return {
+        "attendance": attendance.result(),
+        **authored_projects.result(),
+        "recent_votes": recent_votes.result(),
+    }
+
+
+def _build_member_profile(ref: ReferenceSnapshot, id: int, votes: int, authored: int) -> Dict[str, Any]:
+    # Militancias desde el snapshot
+    current_membership = ref.memberships.current(id)
+    party = _party_with_membership(ref, current_membership) if current_membership else None
+    parties = [p for p in (_party_with_membership(ref, pm) for pm in ref.memberships.history(id)) if p]
+
+    return {
+        "member": ref.members_by_id[id].model_dump(mode="json"),
+        "party": party.model_dump(mode="json") if party else None,
+        "parties": [p.model_dump(mode="json") for p in parties],
+        **_profile_queries(ref, id, votes, authored),
+    }
+
+
+@router.get("/{id}/profile", response_model=MemberProfileSchema, dependencies=[Depends(db_admission)])
+async def get_member_profile(
+    id: int,
+    ref: ReferenceSnapshot = Depends(get_reference),
+    votes: int = Query(10, ge=1, le=50, description="Últimas N votaciones"),
+    authored: int = Query(20, ge=1, le=100, description="Proyectos de autoría (más recientes)"),
+):
+    _member_or_404(ref, id)
+    return await profile_flight.get(
+        (id, votes, authored, ref.version),
+        lambda: _build_member_profile(ref, id, votes, authored),
+    )
+
+# ------------------------------------------------------------
+# Proyectos de Autoría (paginado)
+# ------------------------------------------------------------
+@router.get("/{id}/authored", response_model=PaginatedLawProjectsSchema, dependencies=[Depends(db_admission)])
+def get_member_authored(
+    id: int,
+    db: Session = Depends(get_db),
+    ref: ReferenceSnapshot = Depends(get_reference),
+    page: int = Query(1, ge=1),
+    size: int = Query(20, ge=1, le=100),
+):
+    _member_or_404(ref, id)
+    result = _profile_authored(db, id, size, (page - 1) * size)
+    total = result["authored_total"]
+    return {
+        "items": result["authored"],
+        "total": total,
+        "page": page,
+        "size": size,
+        "pages": (total + size - 1) // size if total else 0,
+    }
@@ -2,53 +2,54 @@
 # PARTIES API
 # ============================
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, datetime, time, timezone
+from typing import List, Optional, Sequence
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy import func, select
+import numpy as np
 
+from app.core.admission import db_admission
+from app.core.streaming import stream_list
 from app.db.base import get_db
-from app.db.models import Party, ParliamentMember, PartyMembership
+from app.db.pipeline import execute_batch
+from app.db.models import PartyVoteCohesion
+from app.services.memberships import MembershipRecord
+from app.services.reference import ReferenceSnapshot, get_reference
 from app.schemas.schemas import (
     PartySchema,
     PartyWithMembersSchema,
     MemberWithMembershipSchema,
     MembershipSchema,
+    PartyCohesionSchema,
+    ChamberCompositionSchema,
 )
 
 router = APIRouter(prefix="/parties", tags=["parties"])
 
-# ------------------------------------------------------------
-# Lista de Partidos
-# ------------------------------------------------------------
-@router.get("/", response_model=List[PartySchema])
-def list_parties(db: Session = Depends(get_db)):
-    return db.query(Party).all()
+MAX_COMPOSITION_POINTS = 5000
+_STEP_UNITS = {"month": "M", "year": "Y"}
 
-# ------------------------------------------------------------
-# Partido + Diputados Actuales
-# ------------------------------------------------------------ 
-@router.get("/{id}", response_model=PartyWithMembersSchema)
-def get_party_with_current_members(id: int, db: Session = Depends(get_db)):
-    party = db.query(Party).filter(Party.id == id).first()
+
+def _party_or_404(ref: ReferenceSnapshot, id: int) -> PartySchema:
+    party = ref.parties_by_id.get(id)
     if not party:
         raise HTTPException(status_code=404, detail="Not found")
+    return party
 
-    now = func.now()
-    rows = (
-        db.query(ParliamentMember, PartyMembership)
-        .join(PartyMembership, PartyMembership.parliament_member_id == ParliamentMember.id)
-        .filter(
-            PartyMembership.party_id == id,
-            or_(PartyMembership.end_date.is_(None), PartyMembership.end_date > now),
-        )
-        .order_by(ParliamentMember.last_name.asc(), ParliamentMember.first_name.asc())
-        .all()
-    )
 
-    members = [
+def _members_with_membership(
+    ref: ReferenceSnapshot, records: Sequence[MembershipRecord]
+) -> List[MemberWithMembershipSchema]:
+    rows = [
+        (ref.members_by_id[pm.parliament_member_id], pm)
+        for pm in records
+        if pm.parliament_member_id in ref.members_by_id
+    ]
+    rows.sort(key=lambda r: (r[0].last_name or "", r[0].first_name or ""))
+    return [
         MemberWithMembershipSchema(
-            **m.__dict__,
+            **m.model_dump(),
             membership=MembershipSchema(
                 start_date=pm.start_date, end_date=pm.end_date
             ),
@@ -56,35 +57,146 @@ def get_party_with_current_members(id: int, db: Session = Depends(get_db)):
         for m, pm in rows
     ]
 
-    return PartyWithMembersSchema(**party.__dict__, members=members)
+# ------------------------------------------------------------
+# Lista de Partidos
+# ------------------------------------------------------------
+@router.get("/", response_model=List[PartySchema])
+async def list_parties(ref: ReferenceSnapshot = Depends(get_reference)):
+    return stream_list(ref.parties, PartySchema)
+
+# ------------------------------------------------------------
+# Composición de la Cámara en el Tiempo
+# ------------------------------------------------------------
+@router.get("/composition", response_model=ChamberCompositionSchema)
+async def get_chamber_composition(
+    ref: ReferenceSnapshot = Depends(get_reference),
+    date_from: Optional[date] = Query(None, alias="from", description="Desde (por defecto, primera militancia)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Hasta (por defecto, hoy)"),
+    step: str = Query("month", pattern="^(day|week|month|year)$"),
+):
+    timeline = ref.memberships.timeline
+    if date_from is None:
+        first = timeline.first
+        date_from = first.date() if first else date.today()
+    if date_to is None:
+        date_to = date.today()
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+
+    # Cada día / semana desde 'from'; cada mes / año desde su primer día
+    first_day, last_day = np.datetime64(date_from, "D"), np.datetime64(date_to, "D")
+    if step in ("day", "week"):
+        points = np.arange(first_day, last_day + 1, 7 if step == "week" else 1)
+    else:
+        unit = _STEP_UNITS[step]
+        start = np.datetime64(date_from, unit)
+        if start.astype("datetime64[D]") < first_day:
+            start += 1
+        points = np.arange(start, np.datetime64(date_to, unit) + 1).astype("datetime64[D]")
+    if points.size > MAX_COMPOSITION_POINTS:
+        raise HTTPException(status_code=400, detail=f"Too many points (max {MAX_COMPOSITION_POINTS})")
+
+    seats = timeline.at(points)
+    parties = []
+    for col, party_id in enumerate(timeline.party_ids.tolist()):
+        series = seats[:, col]
+        if not series.any():
+            continue
+        party = ref.parties_by_id.get(party_id)
+        parties.append({
+            "party_id": party_id,
+            "name": party.name if party else None,
+            "abbreviation": party.abbreviation if party else None,
+            "seats": series.tolist(),
+        })
+    parties.sort(key=lambda p: (-p["seats"][-1], p["party_id"]))
+
+    return {
+        "step": step,
+        "dates": points.astype(date).tolist(),
+        "total": seats.sum(axis=1).tolist(),
+        "parties": parties,
+    }
+
+# ------------------------------------------------------------
+# Partido + Diputados Actuales
+# ------------------------------------------------------------ 
+@router.get("/{id}", response_model=PartyWithMembersSchema)
+async def get_party_with_current_members(id: int, ref: ReferenceSnapshot = Depends(get_reference)):
+    party = _party_or_404(ref, id)
+
+    records = ref.memberships.party_current(id, datetime.now(timezone.utc))
+    members = _members_with_membership(ref, records)
+
+    return PartyWithMembersSchema(**party.model_dump(), members=members)
 
 # ------------------------------------------------------------
 # Lista de Diputados Actuales de un Partido
 # ------------------------------------------------------------
 @router.get("/{id}/members", response_model=List[MemberWithMembershipSchema])
-def get_party_current_members(id: int, db: Session = Depends(get_db)):
-    party = db.query(Party).filter(Party.id == id).first()
-    if not party:
-        raise HTTPException(status_code=404, detail="Not found")
+async def get_party_current_members(
+    id: int,
+    ref: ReferenceSnapshot = Depends(get_reference),
+    as_of: Optional[datetime] = Query(None, description="Militantes a esta fecha (por defecto, actuales)"),
+):
+    _party_or_404(ref, id)
 
-    now = func.now()
-    rows = (
-        db.query(ParliamentMember, PartyMembership)
-        .join(PartyMembership, PartyMembership.parliament_member_id == ParliamentMember.id)
-        .filter(
-            PartyMembership.party_id == id,
-            or_(PartyMembership.end_date.is_(None), PartyMembership.end_date > now),
-        )
-        .order_by(ParliamentMember.last_name.asc(), ParliamentMember.first_name.asc())
-        .all()
-    )
+    if as_of is not None:
+        records = ref.memberships.party_members_at(id, as_of)
+    else:
+        records = ref.memberships.party_current(id, datetime.now(timezone.utc))
 
-    return [
-        MemberWithMembershipSchema(
-            **m.__dict__,
-            membership=MembershipSchema(
-                start_date=pm.start_date, end_date=pm.end_date
-            ),
+    return _members_with_membership(ref, records)
+
+# ------------------------------------------------------------
+# Cohesión del Partido (por votación y por mes)
+# ------------------------------------------------------------
+@router.get("/{id}/cohesion", response_model=PartyCohesionSchema, dependencies=[Depends(db_admission)])
+def get_party_cohesion(
+    id: int,
+    db: Session = Depends(get_db),
+    date_from: Optional[date] = Query(None, alias="from", description="Desde (fecha de votación)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Hasta (fecha de votación)"),
+    include_votes: bool = Query(False, description="Incluye el detalle por votación"),
+    ref: ReferenceSnapshot = Depends(get_reference),
+):
+    _party_or_404(ref, id)
+
+    filters = [PartyVoteCohesion.party_id == id]
+    if date_from:
+        filters.append(PartyVoteCohesion.vote_date >= datetime.combine(date_from, time.min))
+    if date_to:
+        filters.append(PartyVoteCohesion.vote_date <= datetime.combine(date_to, time.max))
+
+    month = func.date_trunc("month", PartyVoteCohesion.vote_date)
+    statements = [
+        select(
+            month.label("month"),
+            func.count().label("votes"),
+            func.avg(PartyVoteCohesion.rice_index).label("rice_index"),
+            func.avg(PartyVoteCohesion.majority_share).label("majority_share"),
         )
-        for m, pm in rows
-    ]
\ No newline at end of file
+        .where(*filters)
+        .group_by(month)
+        .order_by(month.asc())
+    ]
+    if include_votes:
+        statements.append(
+            select(PartyVoteCohesion.__table__)
+            .where(*filters)
+            .order_by(PartyVoteCohesion.vote_date.asc(), PartyVoteCohesion.vote_id.asc())
+        )
+    month_rows, *vote_rows = execute_batch(db, statements)
+
+    months = [
+        {
+            "month": r.month.date(),
+            "votes": r.votes,
+            "rice_index": round(r.rice_index, 4) if r.rice_index is not None else None,
+            "majority_share": round(r.majority_share, 4) if r.majority_share is not None else None,
+        }
+        for r in month_rows
+    ]
+    votes = vote_rows[0] if vote_rows else []
+
+    return {"party_id": id, "months": months, "votes": votes}
@@ -0,0 +1,43 @@
+# ============================
+# SEARCH API
+# ============================
+# Autocompletar sobre el snapshot de referencia: sin consultas a la DB.
+
+from typing import List
+
+from fastapi import APIRouter, Depends, Query
+
+from app.services.reference import ReferenceSnapshot, get_reference
+from app.schemas.schemas import ParliamentMemberSchema, CommuneSearchResultSchema
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+# ------------------------------------------------------------
+# Diputados por Nombre
+# ------------------------------------------------------------
+@router.get("/members", response_model=List[ParliamentMemberSchema])
+async def search_members(
+    q: str = Query(..., min_length=1, max_length=100, description="Nombre o apellidos (sin importar tildes)"),
+    limit: int = Query(10, ge=1, le=50),
+    ref: ReferenceSnapshot = Depends(get_reference),
+):
+    return ref.member_search.search(q, limit)
+
+# ------------------------------------------------------------
+# Comunas -> Distrito + Diputados
+# ------------------------------------------------------------
+@router.get("/communes", response_model=List[CommuneSearchResultSchema])
+async def search_communes(
+    q: str = Query(..., min_length=1, max_length=100, description="Nombre de la comuna (sin importar tildes)"),
+    limit: int = Query(10, ge=1, le=50),
+    ref: ReferenceSnapshot = Depends(get_reference),
+):
+    results = []
+    for commune in ref.commune_search.search(q, limit):
+        districts = ref.districts_by_commune.get(commune.id, ())
+        results.append({
+            "commune": commune,
+            "districts": [d.district for d in districts],
+            "members": [m for d in districts for m in d.members],
+        })
+    return results
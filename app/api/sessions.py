@@ -2,18 +2,24 @@
 # SESSIONS API
 # ============================
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date
+from typing import List, Literal, Optional
+from sqlalchemy.orm import Session
 
+from app.analytics.attendance import NO_RECORD, attendance_matrix_cache
+from app.core.streaming import stream_query
 from app.db.base import get_db
-from app.db.models import LegislativeSession, Attendance
+from app.db.models import LegislativeSession, Attendance, ParliamentMember
+from app.db.projections import prefixed, projection, to_model
+from app.services.reference import ReferenceSnapshot, get_reference
 from app.schemas.schemas import (
     LegislativeSessionSchema,
-    AttendanceSchema,
     AttendanceWithMemberSchema,
     SessionWithAttendancesAndMembersSchema,
     ParliamentMemberSchema,
+    AttendanceMatrixSchema,
+    AttendanceSchema,
 )
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
@@ -22,49 +28,94 @@ router = APIRouter(prefix="/sessions", tags=["sessions"])
 # Lista de Sesiones
 # ------------------------------------------------------------
 @router.get("/", response_model=List[LegislativeSessionSchema])
-def list_sessions(db: Session = Depends(get_db)):
-    rows = (
-        db.query(LegislativeSession)
-        .order_by(LegislativeSession.start_date.desc(), LegislativeSession.id.desc())
-        .all()
+def list_sessions():
+    return stream_query(
+        projection(LegislativeSessionSchema, LegislativeSession)
+        .order_by(LegislativeSession.start_date.desc(), LegislativeSession.id.desc()),
+        LegislativeSessionSchema,
     )
-    return rows
+
+# ------------------------------------------------------------
+# Matriz de Asistencia del Período (antes de /{id})
+# ------------------------------------------------------------
+@router.get("/attendance-matrix", response_model=AttendanceMatrixSchema)
+def get_attendance_matrix(
+    db: Session = Depends(get_db),
+    ref: ReferenceSnapshot = Depends(get_reference),
+    date_from: Optional[date] = Query(None, alias="from", description="Desde (fecha de sesión)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Hasta (fecha de sesión)"),
+    encoding: Literal["nibble", "rle"] = Query("nibble", description="nibble: 4 bits por celda; rle: corridas"),
+):
+    if date_from and date_to and date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+
+    matrix = attendance_matrix_cache.matrix(db, date_from, date_to)
+    try:
+        data = matrix.encode(encoding)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    legend = []
+    for code, type_id in enumerate(matrix.type_ids.tolist(), start=NO_RECORD + 1):
+        t = ref.attendance_types.get(type_id)
+        legend.append({
+            "code": code,
+            "attendance_type_id": type_id,
+            "label": t.label if t else "",
+            "is_present": bool(t and t.is_present),
+        })
+
+    return {
+        "member_ids": matrix.member_ids.tolist(),
+        "session_ids": matrix.session_ids.tolist(),
+        "session_dates": matrix.session_dates.astype(object).tolist(),
+        "shape": list(matrix.codes.shape),
+        "encoding": encoding,
+        "legend": legend,
+        "data": data,
+    }
 
 # ------------------------------------------------------------
 # Detalle de una Sesión
 # ------------------------------------------------------------
 @router.get("/{id}", response_model=LegislativeSessionSchema)
 def get_session(id: int, db: Session = Depends(get_db)):
-    s = db.query(LegislativeSession).filter(LegislativeSession.id == id).first()
+    s = db.execute(projection(LegislativeSessionSchema, LegislativeSession).where(LegislativeSession.id == id)).first()
     if not s:
         raise HTTPException(status_code=404, detail="Not found")
-    return s
+    return to_model(LegislativeSessionSchema, s)
 
 # ------------------------------------------------------------
 # Asistencias de una Sesión + Datos del Diputado
 # ------------------------------------------------------------
 @router.get("/{id}/attendances", response_model=SessionWithAttendancesAndMembersSchema)
-def get_session_attendances(id: int, db: Session = Depends(get_db)):
-    s = db.query(LegislativeSession).filter(LegislativeSession.id == id).first()
+def get_session_attendances(
+    id: int,
+    db: Session = Depends(get_db),
+    ref: ReferenceSnapshot = Depends(get_reference),
+):
+    s = db.execute(projection(LegislativeSessionSchema, LegislativeSession).where(LegislativeSession.id == id)).first()
     if not s:
         raise HTTPException(status_code=404, detail="Not found")
 
-    rows = (
-        db.query(Attendance)
-        .options(joinedload(Attendance.member))
-        .filter(Attendance.session_id == id)
+    rows = db.execute(
+        projection(
+            AttendanceSchema, Attendance, Attendance.attendance_type_id,
+            *prefixed(ParliamentMemberSchema, ParliamentMember, "member_"),
+        )
+        .join(ParliamentMember, ParliamentMember.id == Attendance.parliament_member_id)
+        .where(Attendance.session_id == id, Attendance.session_date == s.start_date)
         .order_by(Attendance.id.asc())
-        .all()
-    )
+    ).all()
 
     result = []
     for a in rows:
-        base_att = AttendanceSchema.model_validate(a, from_attributes=True).model_dump()
+        base_att = ref.attendance(a).model_dump()
         result.append(
             AttendanceWithMemberSchema(
                 **base_att,
-                member=ParliamentMemberSchema.model_validate(a.member, from_attributes=True),
+                member=to_model(ParliamentMemberSchema, a, "member_"),
             )
         )
 
-    return {"session": s, "attendances": result}
\ No newline at end of file
+    return {"session": to_model(LegislativeSessionSchema, s), "attendances": result}
\ No newline at end of file
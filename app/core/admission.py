@@ -0,0 +1,193 @@
+# ============================
+# ADMISSION CONTROL & DEADLINES
+# ============================
+# Cada request a una ruta con DB recibe un presupuesto de tiempo
+# (REQUEST_DEADLINE_SECONDS o ROUTE_DEADLINES por ruta). El presupuesto:
+#   - limita la espera en la cola de admisión (ADMISSION_LIMIT en curso,
+#     ADMISSION_QUEUE en espera; con la cola llena -> 503 inmediato),
+#   - se traduce en SET LOCAL statement_timeout al abrir cada transacción.
+# El cupo se libera al salir de la dependencia, antes de enviar el cuerpo;
+# una respuesta en streaming con conexión propia lo retiene (take_slot).
+# Rechazos y timeouts se cuentan en /metrics.
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.exc import DBAPIError
+
+from app.core.config import settings
+from app.db.base import SessionLocal
+
+# SQLSTATE query_canceled (statement_timeout)
+QUERY_CANCELED = "57014"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+# [True] mientras db_admission es dueña del cupo de la request
+_slot: ContextVar[Optional[List[bool]]] = ContextVar("admission_slot", default=None)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _retry_headers() -> Dict[str, str]:
+    return {"Retry-After": str(settings.admission_retry_after)}
+
+# ------------------------------------------------------------
+# Métricas (por proceso)
+# ------------------------------------------------------------
+class AdmissionMetrics:
+    def __init__(self):
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0, "deadline": 0}
+        self.statement_timeouts = 0
+        self.queue_seconds = 0.0
+
+    def render(self, controller: "AdmissionController") -> str:
+        lines = [
+            "# TYPE votabien_admission_admitted_total counter",
+            f"votabien_admission_admitted_total {self.admitted}",
+            "# TYPE votabien_admission_rejected_total counter",
+            *(f'votabien_admission_rejected_total{{reason="{r}"}} {n}' for r, n in self.rejected.items()),
+            "# TYPE votabien_admission_queue_seconds_total counter",
+            f"votabien_admission_queue_seconds_total {self.queue_seconds:.6f}",
+            "# TYPE votabien_statement_timeouts_total counter",
+            f"votabien_statement_timeouts_total {self.statement_timeouts}",
+            "# TYPE votabien_admission_inflight gauge",
+            f"votabien_admission_inflight {controller.inflight}",
+            "# TYPE votabien_admission_waiting gauge",
+            f"votabien_admission_waiting {controller.waiting}",
+            "# TYPE votabien_admission_limit gauge",
+            f"votabien_admission_limit {controller.limit}",
+        ]
+        return "\n".join(lines) + "\n"
+
+# ------------------------------------------------------------
+# Limitador de Concurrencia (event loop)
+# ------------------------------------------------------------
+class AdmissionController:
+    def __init__(self, limit: int, queue: int):
+        self.limit = limit
+        self.queue = queue
+        self.inflight = 0
+        self.waiting = 0
+        self.metrics = AdmissionMetrics()
+        self._sem = asyncio.Semaphore(limit)
+
+    def _reject(self, reason: str) -> HTTPException:
+        self.metrics.rejected[reason] += 1
+        return HTTPException(status_code=503, detail="Server busy, retry later", headers=_retry_headers())
+
+    async def acquire(self, timeout: float) -> None:
+        if not self._sem.locked():
+            await self._sem.acquire()
+        elif self.waiting >= self.queue:
+            raise self._reject("queue_full")
+        else:
+            self.waiting += 1
+            started = time.monotonic()
+            try:
+                await asyncio.wait_for(self._sem.acquire(), max(timeout, 0.0))
+            except asyncio.TimeoutError:
+                raise self._reject("queue_timeout")
+            finally:
+                self.waiting -= 1
+                self.metrics.queue_seconds += time.monotonic() - started
+        self.inflight += 1
+        self.metrics.admitted += 1
+
+    def release(self) -> None:
+        self.inflight -= 1
+        self._sem.release()
+
+
+admission = AdmissionController(settings.admission_limit, settings.admission_queue)
+
+# ------------------------------------------------------------
+# Dependencia para Routers con DB
+# ------------------------------------------------------------
+def route_budget(request: Request) -> float:
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    if path.startswith(settings.api_prefix):
+        path = path[len(settings.api_prefix):]
+    return settings.route_deadlines.get(path, settings.request_deadline_seconds)
+
+
+async def db_admission(request: Request):
+    budget = route_budget(request)
+    # Async: el contextvar queda visible para el handler y su threadpool
+    _deadline.set(time.monotonic() + budget)
+    await admission.acquire(budget)
+    slot = [True]
+    _slot.set(slot)
+    try:
+        yield
+    finally:
+        # Una respuesta en streaming pudo quedarse con el cupo (take_slot)
+        if slot[0]:
+            admission.release()
+
+
+def take_slot() -> bool:
+    # Traspasa el cupo de la request al llamador, que lo libera con admission.release() en el loop
+    slot = _slot.get()
+    if not slot or not slot[0]:
+        return False
+    slot[0] = False
+    return True
+
+# ------------------------------------------------------------
+# Trabajo con DB fuera de un Request (hilos propios, p. ej. /live)
+# ------------------------------------------------------------
+@contextmanager
+def thread_admission(loop: asyncio.AbstractEventLoop, budget: float):
+    # El cupo se pide al loop de la app; el deadline vale para este hilo
+    token = _deadline.set(time.monotonic() + budget)
+    try:
+        asyncio.run_coroutine_threadsafe(admission.acquire(budget), loop).result()
+        try:
+            yield
+        finally:
+            loop.call_soon_threadsafe(admission.release)
+    finally:
+        _deadline.reset(token)
+
+# ------------------------------------------------------------
+# statement_timeout por Transacción
+# ------------------------------------------------------------
+@event.listens_for(SessionLocal, "after_begin")
+def _apply_statement_timeout(session, transaction, connection) -> None:
+    left = remaining()
+    if left is None or connection.dialect.name != "postgresql":
+        return
+    if left <= 0:
+        raise DeadlineExceeded()
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(left * 1000), 1)}")
+
+# ------------------------------------------------------------
+# Handlers de Excepción
+# ------------------------------------------------------------
+async def deadline_exceeded_handler(request: Request, exc: DeadlineExceeded):
+    admission.metrics.rejected["deadline"] += 1
+    return JSONResponse({"detail": "Deadline exceeded"}, status_code=503, headers=_retry_headers())
+
+
+async def statement_timeout_handler(request: Request, exc: DBAPIError):
+    orig = exc.orig
+    code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+    if code != QUERY_CANCELED:
+        raise exc
+    admission.metrics.statement_timeouts += 1
+    return JSONResponse({"detail": "Query timed out"}, status_code=503, headers=_retry_headers())
@@ -0,0 +1,282 @@
+# ============================
+# COMPRESSION MIDDLEWARE
+# ============================
+# Compresión negociada (zstd > br > gzip según Accept-Encoding) para
+# respuestas sobre un umbral. Las respuestas GET 200 completas llevan un
+# ETag débil (hash del cuerpo) y sus versiones comprimidas se guardan en
+# un LRU por (ETag, codificación): un payload caliente se comprime una
+# vez por versión de datos y If-None-Match responde 304.
+# Las respuestas en streaming se comprimen por trozos, sin caché;
+# text/event-stream (/live) pasa sin tocar.
+# brotli y zstandard son opcionales; sin ellos solo se ofrece gzip.
+
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Collection, Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+ZSTD_LEVEL = 3
+# Cuerpos más grandes se comprimen fuera del event loop
+THREADPOOL_SIZE = 64 * 1024
+
+SKIP_TYPES = ("text/event-stream", "image/", "video/", "audio/", "application/zip", "application/gzip")
+
+# ------------------------------------------------------------
+# Codificadores
+# ------------------------------------------------------------
+class _Gzip:
+    @staticmethod
+    def compress(data: bytes) -> bytes:
+        return zlib.compress(data, GZIP_LEVEL, wbits=31)
+
+    def __init__(self):
+        self._z = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._z.compress(data) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._z.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    @staticmethod
+    def compress(data: bytes) -> bytes:
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+
+    def __init__(self):
+        self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.process(data) + self._c.flush()
+
+    def finish(self) -> bytes:
+        return self._c.finish()
+
+
+class _Zstd:
+    @staticmethod
+    def compress(data: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+    def __init__(self):
+        self._c = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._c.compress(data) + self._c.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._c.flush()
+
+
+ENCODERS: Dict[str, Callable] = {"gzip": _Gzip}
+if brotli is not None:
+    ENCODERS["br"] = _Brotli
+if zstandard is not None:
+    ENCODERS["zstd"] = _Zstd
+
+ORDER = ("zstd", "br", "gzip")
+PREFERENCE = [e for e in ORDER if e in ENCODERS]
+
+
+def negotiate(accept_encoding: str, available: Optional[Collection[str]] = None) -> Optional[str]:
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for name in PREFERENCE if available is None else [e for e in ORDER if e in available]:
+        q = accepted.get(name, wildcard)
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+# ------------------------------------------------------------
+# Caché de Cuerpos Comprimidos (LRU por bytes)
+# ------------------------------------------------------------
+class CompressedCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[bytes]:
+        with self._lock:
+            body = self._items.get(key)
+            if body is not None:
+                self._items.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple[str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._items[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+# ------------------------------------------------------------
+# Middleware (ASGI puro: no envuelve StreamingResponse)
+# ------------------------------------------------------------
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, cache_bytes: int = 64 * 1024 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = CompressedCache(cache_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "POST"):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        responder = _Responder(
+            self, send,
+            encoding=negotiate(headers.get("accept-encoding", "")),
+            if_none_match=headers.get("if-none-match"),
+            cacheable=scope["method"] == "GET",
+        )
+        await self.app(scope, receive, responder)
+
+
+class _Responder:
+    def __init__(self, mw: CompressionMiddleware, send: Send, encoding: Optional[str],
+                 if_none_match: Optional[str], cacheable: bool):
+        self.mw = mw
+        self.send = send
+        self.encoding = encoding
+        self.if_none_match = if_none_match
+        self.cacheable = cacheable
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.encoder = None
+
+    async def __call__(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if (
+                "content-encoding" in headers
+                or content_type.startswith(SKIP_TYPES)
+                or "no-transform" in headers.get("cache-control", "")
+            ):
+                self.passthrough = True
+                await self.send(message)
+                return
+            self.start = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more = message.get("more_body", False)
+
+        if self.encoder is None and more:
+            # Streaming: sin caché ni ETag, se comprime por trozos
+            if self.encoding is None:
+                self.passthrough = True
+                await self.send(self.start)
+                await self.send(message)
+                return
+            await self._begin_stream()
+        if self.encoder is not None:
+            await self._stream(body, more)
+            return
+        await self._complete(body)
+
+    async def _begin_stream(self) -> None:
+        self.encoder = ENCODERS[self.encoding]()
+        headers = MutableHeaders(raw=self.start["headers"])
+        del headers["content-length"]
+        headers["content-encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        await self.send(self.start)
+
+    async def _stream(self, body: bytes, more: bool) -> None:
+        data = self.encoder.chunk(body) if body else b""
+        if not more:
+            data += self.encoder.finish()
+        if data or not more:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more})
+
+    async def _complete(self, body: bytes) -> None:
+        start = self.start
+        headers = MutableHeaders(raw=start["headers"])
+        status = start["status"]
+
+        etag = None
+        if self.cacheable and status == 200 and "no-store" not in headers.get("cache-control", ""):
+            etag = headers.get("etag") or 'W/"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+            headers["etag"] = etag
+            headers.add_vary_header("Accept-Encoding")
+            if self.if_none_match and etag in [t.strip() for t in self.if_none_match.split(",")]:
+                del headers["content-length"]
+                del headers["content-type"]
+                start["status"] = 304
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": b""})
+                return
+
+        if self.encoding is not None and len(body) >= self.mw.minimum_size:
+            body = await self._compress(body, etag)
+            headers["content-encoding"] = self.encoding
+            headers["content-length"] = str(len(body))
+            if etag is None:
+                headers.add_vary_header("Accept-Encoding")
+
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": body})
+
+    async def _compress(self, body: bytes, etag: Optional[str]) -> bytes:
+        key = (etag, self.encoding)
+        if etag is not None:
+            cached = self.mw.cache.get(key)
+            if cached is not None:
+                return cached
+
+        compress = ENCODERS[self.encoding].compress
+        if len(body) > THREADPOOL_SIZE:
+            compressed = await run_in_threadpool(compress, body)
+        else:
+            compressed = compress(body)
+
+        if etag is not None:
+            self.mw.cache.put(key, compressed)
+        return compressed
@@ -3,28 +3,102 @@
 # ============================
 
 import os
-from dotenv import load_dotenv
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import List
+from typing import Dict, List, Optional
 
-# Carga variables desde .env en la raíz del proyecto
-load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '../../.env'))
+# .env en la raíz del proyecto (lo lee pydantic-settings; no se toca os.environ)
+ENV_FILE = os.path.join(os.path.dirname(__file__), '../../.env')
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
-        env_file=".env",
+        env_file=(ENV_FILE, ".env"),
         case_sensitive=False,
         extra="ignore",
     )
 
     # ---------- DB ----------
     db_url: str = Field(default="", alias="DB_URL")
+    pgsql_hostname: str = Field(default="localhost", alias="PGSQL_HOSTNAME")
+    pgsql_port: str = Field(default="5432", alias="PGSQL_PORT")
+    pgsql_username: str = Field(default="postgres", alias="PGSQL_USERNAME")
+    pgsql_password: str = Field(default="postgres_password", alias="PGSQL_PASSWORD")
+    pgsql_dbname: str = Field(default="vota_bien", alias="PGSQL_DBNAME")
+    # psycopg2 (por defecto) | psycopg (psycopg 3: sentencias preparadas + pipeline)
+    db_driver: str = Field(default="psycopg2", alias="DB_DRIVER")
+    # psycopg 3: ejecuciones antes de preparar en el servidor; negativo desactiva
+    # (necesario tras pgbouncer en modo transacción)
+    db_prepare_threshold: int = Field(default=5, alias="DB_PREPARE_THRESHOLD")
+    db_pipeline: bool = Field(default=True, alias="DB_PIPELINE")
 
     # ---------- API/CORS ----------
     api_prefix: str = Field(default="/api", alias="API_PREFIX")
     cors_origins: str = Field(default="http://localhost:5173", alias="CORS_ORIGINS")
 
+    # ---------- Analytics ----------
+    analytics_refresh_seconds: float = Field(default=30.0, alias="ANALYTICS_REFRESH_SECONDS")
+    law_facets_refresh_seconds: float = Field(default=30.0, alias="LAW_FACETS_REFRESH_SECONDS")
+
+    # ---------- Snapshot de Referencia ----------
+    reference_poll_seconds: float = Field(default=10.0, alias="REFERENCE_POLL_SECONDS")
+
+    # ---------- Coalescing (single-flight) ----------
+    coalesce_fresh_seconds: float = Field(default=1.0, alias="COALESCE_FRESH_SECONDS")
+    coalesce_stale_seconds: float = Field(default=5.0, alias="COALESCE_STALE_SECONDS")
+    coalesce_lock_dir: Optional[str] = Field(default=None, alias="COALESCE_LOCK_DIR")
+
+    # ---------- Perfil de Diputado ----------
+    profile_cache_seconds: float = Field(default=30.0, alias="PROFILE_CACHE_SECONDS")
+    profile_stale_seconds: float = Field(default=60.0, alias="PROFILE_STALE_SECONDS")
+    profile_pool_size: int = Field(default=8, alias="PROFILE_POOL_SIZE")
+
+    # ---------- Live (SSE) ----------
+    live_enabled: bool = Field(default=True, alias="LIVE_ENABLED")
+    live_queue_size: int = Field(default=64, alias="LIVE_QUEUE_SIZE")
+    live_keepalive_seconds: float = Field(default=15.0, alias="LIVE_KEEPALIVE_SECONDS")
+    # Presupuesto (admisión + statement_timeout) para armar cada lote de eventos
+    live_deadline_seconds: float = Field(default=5.0, alias="LIVE_DEADLINE_SECONDS")
+
+    # ---------- Compresión ----------
+    compression_min_size: int = Field(default=1024, alias="COMPRESSION_MIN_SIZE")
+    compression_cache_mb: int = Field(default=64, alias="COMPRESSION_CACHE_MB")
+
+    # ---------- Streaming JSON (listas grandes) ----------
+    stream_chunk_rows: int = Field(default=500, alias="STREAM_CHUNK_ROWS")
+
+    # ---------- Snapshot Estático (CDN) ----------
+    static_snapshot_dir: Optional[str] = Field(default=None, alias="STATIC_SNAPSHOT_DIR")
+    static_snapshot_mode: str = Field(default="fallback", alias="STATIC_SNAPSHOT_MODE")
+    static_snapshot_base_url: Optional[str] = Field(default=None, alias="STATIC_SNAPSHOT_BASE_URL")
+
+    # ---------- Admisión y Deadlines ----------
+    request_deadline_seconds: float = Field(default=10.0, alias="REQUEST_DEADLINE_SECONDS")
+    # JSON, ruta sin API_PREFIX -> segundos: {"/laws/": 3, "/laws/{id}/detail": 5}
+    route_deadlines: Dict[str, float] = Field(default_factory=dict, alias="ROUTE_DEADLINES")
+    admission_limit: int = Field(default=16, alias="ADMISSION_LIMIT")
+    admission_queue: int = Field(default=32, alias="ADMISSION_QUEUE")
+    admission_retry_after: int = Field(default=1, alias="ADMISSION_RETRY_AFTER")
+
+    # ---------- Arranque (warm-up) ----------
+    # Tareas en segundo plano tras el arranque: pool, law_facets, similarity, coauthorship
+    warmup_tasks: str = Field(default="pool,law_facets", alias="WARMUP_TASKS")
+    warmup_pool_connections: int = Field(default=4, alias="WARMUP_POOL_CONNECTIONS")
+
+    # ---------- Profiling (bajo demanda) ----------
+    # Sin secreto ni muestreo el middleware no se instala
+    profile_secret: Optional[str] = Field(default=None, alias="PROFILE_SECRET")
+    profile_sample_rate: float = Field(default=0.0, alias="PROFILE_SAMPLE_RATE")
+    profile_interval_ms: float = Field(default=2.0, alias="PROFILE_INTERVAL_MS")
+    profile_max_seconds: float = Field(default=30.0, alias="PROFILE_MAX_SECONDS")
+    profile_dir: Optional[str] = Field(default=None, alias="PROFILE_DIR")
+    profile_keep: int = Field(default=100, alias="PROFILE_KEEP")
+    # Token para /admin/*; sin token los endpoints responden 404
+    admin_token: Optional[str] = Field(default=None, alias="ADMIN_TOKEN")
+
+    @property
+    def warmup_tasks_list(self) -> List[str]:
+        return [t.strip() for t in self.warmup_tasks.split(",") if t.strip()]
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [o.strip() for o in self.cors_origins.split(",") if o.strip()]
@@ -33,13 +107,7 @@ settings = Settings()
 
 # DB_URL, Construirla desde Variables PGSQL_
 if not settings.db_url:
-    PGSQL_HOSTNAME = os.getenv("PGSQL_HOSTNAME", "localhost")
-    PGSQL_PORT     = os.getenv("PGSQL_PORT", "5432")
-    PGSQL_USERNAME = os.getenv("PGSQL_USERNAME", "postgres")
-    PGSQL_PASSWORD = os.getenv("PGSQL_PASSWORD", "postgres_password")
-    PGSQL_DBNAME   = os.getenv("PGSQL_DBNAME", "vota_bien")
-
     settings.db_url = (
-        f"postgresql://{PGSQL_USERNAME}:{PGSQL_PASSWORD}"
-        f"@{PGSQL_HOSTNAME}:{PGSQL_PORT}/{PGSQL_DBNAME}"
+        f"postgresql://{settings.pgsql_username}:{settings.pgsql_password}"
+        f"@{settings.pgsql_hostname}:{settings.pgsql_port}/{settings.pgsql_dbname}"
     )
\ No newline at end of file
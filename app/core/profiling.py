@@ -0,0 +1,346 @@
+# ============================
+# REQUEST PROFILING
+# ============================
+# Perfil bajo demanda de una request: muestreo estadístico de pilas
+# (sys._current_frames) + línea de tiempo de SQL, guardado como archivo
+# speedscope (https://www.speedscope.app) y servido por /admin/profiles.
+# Se activa con un header firmado (X-Profile: <ts>:<hmac>) o con
+# PROFILE_SAMPLE_RATE. Sin PROFILE_SECRET ni muestreo el middleware no
+# se instala (costo cero).
+# El muestreo abarca todos los hilos del proceso mientras dura la
+# request; bajo carga concurrente puede incluir trabajo de otras requests.
+# La línea de tiempo de SQL sí es exacta (contextvar por request).
+
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+SIGNATURE_TTL_SECONDS = 300
+SQL_PREVIEW = 120
+
+# Hojas de pila de hilos ociosos (no se cuentan)
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("_worker.py", "run"),
+}
+
+# Categoría por módulo de la hoja: dónde se va el tiempo
+CATEGORIES = (
+    ("psycopg", "sql"),
+    ("sqlalchemy/engine", "sql"),
+    ("sqlalchemy/orm", "orm"),
+    ("pydantic", "pydantic"),
+    ("fastapi/encoders", "json"),
+    ("json/", "json"),
+    ("/app/", "app"),
+)
+
+_active: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+def sign(method: str, path: str, ts: int, secret: str) -> str:
+    return hmac.new(secret.encode(), f"{ts}:{method}:{path}".encode(), hashlib.sha256).hexdigest()
+
+
+def verify(header: str, method: str, path: str, secret: str) -> bool:
+    ts, _, signature = header.partition(":")
+    try:
+        ts_int = int(ts)
+    except ValueError:
+        return False
+    if abs(time.time() - ts_int) > SIGNATURE_TTL_SECONDS:
+        return False
+    # Bytes: compare_digest no admite str con caracteres no ASCII (las cabeceras llegan en latin-1)
+    return hmac.compare_digest(signature.encode("latin-1"), sign(method, path, ts_int, secret).encode())
+
+# ------------------------------------------------------------
+# Perfil de una Request
+# ------------------------------------------------------------
+class RequestProfile:
+    def __init__(self, method: str, path: str, interval: float, max_seconds: float):
+        self.id = uuid.uuid4().hex[:16]
+        self.method = method
+        self.path = path
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.status: Optional[int] = None
+        self.started = time.perf_counter()
+        self.ended: Optional[float] = None
+        self.frames: Dict[Tuple[str, str, int], int] = {}
+        self.samples: Dict[int, List[Tuple[float, List[int]]]] = {}  # hilo -> (peso s, pila)
+        self.sql: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.ended = time.perf_counter()
+        self._stop.set()
+        self._thread.join()
+
+    def _frame(self, code) -> int:
+        key = (code.co_name, code.co_filename, code.co_firstlineno)
+        idx = self.frames.get(key)
+        if idx is None:
+            idx = self.frames[key] = len(self.frames)
+        return idx
+
+    def _sample(self) -> None:
+        me = threading.get_ident()
+        deadline = self.started + self.max_seconds
+        previous = self.started
+        while not self._stop.wait(self.interval):
+            # Con el GIL ocupado el intervalo real es mayor: se pondera por el tiempo transcurrido
+            now = time.perf_counter()
+            if now > deadline:
+                return
+            weight, previous = now - previous, now
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                leaf = frame.f_code
+                if (os.path.basename(leaf.co_filename), leaf.co_name) in IDLE_LEAVES:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._frame(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples.setdefault(ident, []).append((weight, stack))
+
+    # --------------------------------------------------------
+    # Resumen y Formato speedscope
+    # --------------------------------------------------------
+    @property
+    def duration(self) -> float:
+        return (self.ended or time.perf_counter()) - self.started
+
+    def summary(self) -> Dict[str, Any]:
+        files = {idx: key[1].replace("\\", "/") for key, idx in self.frames.items()}
+        categories: Dict[str, float] = {}
+        total, weights = 0, 0.0
+        for samples in self.samples.values():
+            for weight, stack in samples:
+                leaf = files[stack[-1]] if stack else ""
+                category = next((c for pattern, c in CATEGORIES if pattern in leaf), "other")
+                categories[category] = categories.get(category, 0.0) + weight
+                total += 1
+                weights += weight
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": total,
+            "categories": {c: round(w / weights, 4) for c, w in categories.items()} if weights else {},
+            "sql_count": len(self.sql),
+            "sql_ms": round(sum(q["end"] - q["start"] for q in self.sql) * 1000, 3),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    def speedscope(self) -> Dict[str, Any]:
+        frames = [None] * len(self.frames)
+        for (name, file, line), idx in self.frames.items():
+            frames[idx] = {"name": name, "file": file, "line": line}
+
+        end = self.duration * 1000
+        profiles = []
+        for ident, samples in self.samples.items():
+            profiles.append({
+                "type": "sampled",
+                "name": f"thread {ident}",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": end,
+                "samples": [stack for _, stack in samples],
+                "weights": [weight * 1000 for weight, _ in samples],
+            })
+
+        # SQL como perfil "evented": un frame por sentencia
+        events = []
+        for q in self.sql:
+            idx = len(frames)
+            frames.append({"name": f"SQL: {q['statement']}", "file": "sql", "line": 0})
+            events.append({"type": "O", "frame": idx, "at": q["start"] * 1000})
+            events.append({"type": "C", "frame": idx, "at": q["end"] * 1000})
+        profiles.append({
+            "type": "evented",
+            "name": "SQL timeline",
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": end,
+            "events": events,
+        })
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "votabien-api",
+            "shared": {"frames": frames},
+            "profiles": profiles,
+        }
+
+# ------------------------------------------------------------
+# Línea de Tiempo de SQL (solo con perfil activo en el contexto)
+# ------------------------------------------------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _sql_start(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _active.get()
+    if profile is not None:
+        conn.info.setdefault("request_profile_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _sql_end(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _active.get()
+    if profile is None:
+        return
+    started = conn.info.get("request_profile_started")
+    if not started:
+        return
+    start = started.pop()
+    profile.sql.append({
+        "start": start - profile.started,
+        "end": time.perf_counter() - profile.started,
+        "statement": " ".join(statement.split())[:SQL_PREVIEW],
+        "rows": cursor.rowcount,
+    })
+
+# ------------------------------------------------------------
+# Almacén (archivos en disco, compartido entre workers)
+# ------------------------------------------------------------
+# Por perfil: <id>.speedscope.json y <id>.summary.json. El resumen se
+# escribe al final, así listar o pedir un perfil nunca ve uno a medias.
+PROFILE_ID = re.compile(r"^[0-9a-f]{16}$")
+SUMMARY_SUFFIX = ".summary.json"
+
+
+class ProfileStore:
+    def __init__(self, directory: Optional[str], keep: int):
+        self.directory = directory or os.path.join(tempfile.gettempdir(), "votabien-profiles")
+        self.keep = keep
+
+    def path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.speedscope.json")
+
+    def _summary_path(self, profile_id: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}{SUMMARY_SUFFIX}")
+
+    def _write(self, path: str, data: Dict[str, Any]) -> None:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def _summaries(self) -> List[str]:
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(SUMMARY_SUFFIX)]
+        except FileNotFoundError:
+            return []
+        paths = [os.path.join(self.directory, n) for n in names]
+
+        def mtime(path: str) -> float:
+            try:
+                return os.path.getmtime(path)
+            except FileNotFoundError:
+                return 0.0
+        return sorted(paths, key=mtime, reverse=True)
+
+    def save(self, profile: RequestProfile) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._write(self.path(profile.id), profile.speedscope())
+        self._write(self._summary_path(profile.id), profile.summary())
+
+        # Los más antiguos fuera (cualquier worker puede podar)
+        for old in self._summaries()[self.keep:]:
+            profile_id = os.path.basename(old)[:-len(SUMMARY_SUFFIX)]
+            for path in (old, self.path(profile_id)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _load(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [s for s in (self._load(p) for p in self._summaries()[:self.keep]) if s is not None]
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        if not PROFILE_ID.match(profile_id):
+            return None
+        return self._load(self._summary_path(profile_id))
+
+
+profile_store = ProfileStore(settings.profile_dir, settings.profile_keep)
+
+# ------------------------------------------------------------
+# Middleware
+# ------------------------------------------------------------
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, secret: Optional[str] = None, sample_rate: float = 0.0,
+                 interval_ms: float = 2.0, max_seconds: float = 30.0):
+        self.app = app
+        self.secret = secret
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.max_seconds = max_seconds
+
+    def _wanted(self, scope: Scope) -> bool:
+        if self.secret:
+            header = Headers(scope=scope).get("x-profile")
+            if header and verify(header, scope["method"], scope["path"], self.secret):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"], self.interval, self.max_seconds)
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message.setdefault("headers", []).append((b"x-profile-id", profile.id.encode()))
+            await send(message)
+
+        token = _active.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.stop()
+            _active.reset(token)
+            # Serializar minutos de pilas no debe bloquear el event loop
+            await run_in_threadpool(profile_store.save, profile)
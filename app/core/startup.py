@@ -0,0 +1,77 @@
+# ============================
+# STARTUP PROFILE & WARM-UP
+# ============================
+# Tiempos de arranque (import, fases del lifespan, warm-ups) para medir
+# el tiempo hasta la primera request (ver app/jobs/startup_profile.py).
+# Los warm-ups corren en paralelo y en segundo plano: la app acepta
+# requests mientras se llenan el pool y las cachés.
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------
+# Perfil de Arranque
+# ------------------------------------------------------------
+class StartupProfile:
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+        self.warmups: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds))
+
+    @asynccontextmanager
+    async def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def report(self) -> Dict[str, object]:
+        return {
+            "phases": {name: round(s, 4) for name, s in self.phases},
+            "ready_seconds": round(sum(s for _, s in self.phases), 4),
+            "warmups": {name: round(s, 4) for name, s in self.warmups.items()},
+        }
+
+
+startup_profile = StartupProfile()
+
+# ------------------------------------------------------------
+# Warm-ups (registro + ejecución concurrente)
+# ------------------------------------------------------------
+WARMUPS: Dict[str, Callable[[], object]] = {}
+
+
+def warmup(name: str):
+    def register(fn: Callable[[], object]) -> Callable[[], object]:
+        WARMUPS[name] = fn
+        return fn
+    return register
+
+
+async def _run_one(name: str, profile: StartupProfile) -> None:
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(WARMUPS[name])
+    except Exception:
+        logger.exception("Warm-up %s failed", name)
+        return
+    profile.warmups[name] = time.perf_counter() - started
+
+
+async def run_warmups(names: Iterable[str], profile: StartupProfile = startup_profile) -> None:
+    names = list(names)
+    unknown = [n for n in names if n not in WARMUPS]
+    if unknown:
+        logger.warning("Unknown warm-up tasks: %s", ", ".join(unknown))
+    await asyncio.gather(*(_run_one(n, profile) for n in names if n in WARMUPS))
+    logger.info("Warm-up done: %s", profile.report()["warmups"])
@@ -0,0 +1,148 @@
+# ============================
+# STATIC SNAPSHOT MIDDLEWARE
+# ============================
+# Sirve documentos pre-renderizados por app/jobs/static_snapshot.py
+# (árbol de JSON + variantes comprimidas + manifest.json).
+# Modos (STATIC_SNAPSHOT_MODE):
+#   fallback: la API responde; si falla (excepción o 5xx) se sirve el snapshot
+#   serve:    el snapshot responde si tiene el documento; si no, la API
+#   redirect: 307 al CDN (STATIC_SNAPSHOT_BASE_URL) si tiene el documento
+# Solo GET sin query string: los documentos no llevan parámetros.
+
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.compression import negotiate
+
+MANIFEST = "manifest.json"
+MODES = ("fallback", "serve", "redirect")
+# Marca en el scope para que el generador renderice sin pasar por el snapshot
+BYPASS_SCOPE_KEY = "static_snapshot.bypass"
+MANIFEST_CHECK_SECONDS = 1.0
+
+
+def snapshot_file(path: str) -> str:
+    # /api/parties/ -> api/parties.json ; /api/parties/1 -> api/parties/1.json
+    return path.strip("/") + ".json"
+
+
+def load_manifest(root: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(root, MANIFEST), "rb") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"documents": {}}
+
+# ------------------------------------------------------------
+# Middleware
+# ------------------------------------------------------------
+class StaticSnapshotMiddleware:
+    def __init__(self, app: ASGIApp, root: str, mode: str = "fallback", base_url: Optional[str] = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown static snapshot mode: {mode}")
+        if mode == "redirect" and not base_url:
+            raise ValueError("redirect mode needs STATIC_SNAPSHOT_BASE_URL")
+        self.app = app
+        self.root = root
+        self.mode = mode
+        self.base_url = (base_url or "").rstrip("/")
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._mtime = 0.0
+        self._checked_at = 0.0
+
+    def _document(self, path: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        if now - self._checked_at >= MANIFEST_CHECK_SECONDS:
+            self._checked_at = now
+            try:
+                mtime = os.stat(os.path.join(self.root, MANIFEST)).st_mtime
+            except FileNotFoundError:
+                mtime = 0.0
+            if mtime != self._mtime:
+                self._documents = load_manifest(self.root).get("documents", {})
+                self._mtime = mtime
+        return self._documents.get(path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "GET"
+            or scope.get("query_string")
+            or scope.get(BYPASS_SCOPE_KEY)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        doc = self._document(scope["path"])
+        if doc is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.mode == "redirect":
+            location = f"{self.base_url}/{doc['file']}"
+            await send({"type": "http.response.start", "status": 307,
+                        "headers": [(b"location", location.encode()), (b"content-length", b"0")]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if self.mode == "serve":
+            await self._serve(scope, send, doc)
+            return
+
+        await self._fallback(scope, receive, send, doc)
+
+    async def _fallback(self, scope: Scope, receive: Receive, send: Send, doc: Dict[str, Any]) -> None:
+        state = {"started": False, "failed": False}
+
+        async def guarded(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                if message["status"] >= 500:
+                    state["failed"] = True
+                    return
+                state["started"] = True
+            if not state["failed"]:
+                await send(message)
+
+        try:
+            await self.app(scope, receive, guarded)
+        except Exception:
+            if state["started"]:
+                raise
+            state["failed"] = True
+        if state["failed"]:
+            await self._serve(scope, send, doc)
+
+    async def _serve(self, scope: Scope, send: Send, doc: Dict[str, Any]) -> None:
+        headers = Headers(scope=scope)
+        etag = doc["etag"]
+        response_headers = [
+            (b"content-type", b"application/json"),
+            (b"etag", etag.encode()),
+            (b"vary", b"Accept-Encoding"),
+            (b"x-static-snapshot", doc["version"].encode()),
+        ]
+        if etag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+            await send({"type": "http.response.start", "status": 304, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        encoding, file = self._variant(doc, headers.get("accept-encoding", ""))
+        with open(os.path.join(self.root, file), "rb") as f:
+            body = f.read()
+        if encoding is not None:
+            response_headers.append((b"content-encoding", encoding.encode()))
+        response_headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": response_headers})
+        await send({"type": "http.response.body", "body": body})
+
+    def _variant(self, doc: Dict[str, Any], accept_encoding: str) -> Tuple[Optional[str], str]:
+        variants = doc.get("encodings", {})
+        encoding = negotiate(accept_encoding, variants)
+        if encoding is None:
+            return None, doc["file"]
+        return encoding, variants[encoding]
@@ -0,0 +1,102 @@
+# ============================
+# STREAMING JSON LISTS
+# ============================
+# Listas JSON codificadas por bloques de STREAM_CHUNK_ROWS filas: cada
+# bloque se valida y serializa con pydantic (dump_json) y se envía
+# enseguida; la memoria pico es la de un bloque y el primer byte sale sin
+# esperar al resto.
+# Si la lista cabe en un bloque se envía completa (Response normal), así
+# conserva ETag/304 y la caché de compresión (app/core/compression.py).
+# Las consultas usan su propia sesión con yield_per (cursor del servidor
+# en Postgres): la sesión de get_db se cierra antes de enviar el cuerpo.
+# Esa conexión sigue contando en la admisión: la respuesta retiene el cupo
+# de la request hasta terminar el cuerpo.
+
+import itertools
+from typing import Any, Iterable, Iterator, Optional, Sequence, Type
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.sql import Select
+
+from app.core.admission import admission, take_slot
+from app.core.config import settings
+from app.db.base import SessionLocal
+from app.db.projections import list_adapter
+
+MEDIA_TYPE = "application/json"
+
+
+def _encode(adapter: TypeAdapter, rows: Sequence[Any]) -> bytes:
+    # Filas de la DB (RowMapping) o modelos ya validados
+    items = list(rows) if not rows or isinstance(rows[0], BaseModel) else adapter.validate_python(rows)
+    return adapter.dump_json(items)
+
+
+def _chunks(adapter: TypeAdapter, blocks: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    for block in blocks:
+        if not block:
+            continue
+        # "[a,b]" -> "a,b"
+        body = _encode(adapter, block)[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+
+def _blocks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+# ------------------------------------------------------------
+# Listas en Memoria (snapshot de referencia)
+# ------------------------------------------------------------
+def stream_list(items: Sequence[Any], schema: Type[BaseModel], chunk_rows: Optional[int] = None) -> Response:
+    size = chunk_rows or settings.stream_chunk_rows
+    adapter = list_adapter(schema)
+    if len(items) <= size:
+        return Response(_encode(adapter, items), media_type=MEDIA_TYPE)
+    return StreamingResponse(_chunks(adapter, _blocks(items, size)), media_type=MEDIA_TYPE)
+
+# ------------------------------------------------------------
+# Consultas (cursor del servidor + sesión propia)
+# ------------------------------------------------------------
+class _AdmittedStream(StreamingResponse):
+    # Libera el cupo de admisión al terminar (o cortarse) el envío
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            admission.release()
+
+
+def stream_query(stmt: Select, schema: Type[BaseModel], chunk_rows: Optional[int] = None) -> Response:
+    size = chunk_rows or settings.stream_chunk_rows
+    adapter = list_adapter(schema)
+
+    # La consulta se abre aquí: los errores salen antes del primer byte
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=size)).mappings()
+        parts = result.partitions()
+        head = list(itertools.islice(parts, 2))
+    except Exception:
+        db.close()
+        raise
+
+    if len(head) < 2:
+        db.close()
+        return Response(_encode(adapter, head[0] if head else []), media_type=MEDIA_TYPE)
+
+    def blocks() -> Iterator[Sequence[Any]]:
+        try:
+            yield from head
+            yield from parts
+        finally:
+            db.close()
+
+    response_cls = _AdmittedStream if take_slot() else StreamingResponse
+    return response_cls(_chunks(adapter, blocks()), media_type=MEDIA_TYPE)
@@ -1,19 +1,67 @@
 # ============================
 # BASE & SESSION
 # ============================
+# El engine (y el driver de Postgres) se crea al primer uso o en el
+# lifespan de la app, no al importar el módulo.
+
+import threading
+from typing import Optional
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.core.config import settings
 
 
-engine = create_engine(
-    settings.db_url,   
-    pool_pre_ping=True,
-)
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def engine_args(driver: Optional[str] = None):
+    url = make_url(settings.db_url)
+    connect_args = {}
+    # DB_DRIVER=psycopg: psycopg 3 con sentencias preparadas en el servidor
+    if (driver or settings.db_driver) == "psycopg" and url.get_backend_name() == "postgresql":
+        url = url.set(drivername="postgresql+psycopg")
+        threshold = settings.db_prepare_threshold
+        connect_args["prepare_threshold"] = threshold if threshold >= 0 else None
+    return url, connect_args
+
+
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url, connect_args = engine_args()
+                engine = create_engine(
+                    url,
+                    pool_pre_ping=True,
+                    connect_args=connect_args,
+                )
+                SessionLocal.configure(bind=engine)
+                _engine = engine
+    return _engine
+
+
+def prefill_pool(connections: int) -> int:
+    # Abre las conexiones de una vez y las devuelve al pool
+    engine = get_engine()
+    size = getattr(engine.pool, "size", lambda: connections)()
+    opened = [engine.connect() for _ in range(min(connections, size))]
+    for conn in opened:
+        conn.close()
+    return len(opened)
+
+
+class _LazySessionMaker(sessionmaker):
+    def __call__(self, **local_kw):
+        if _engine is None:
+            get_engine()
+        return super().__call__(**local_kw)
+
 
-SessionLocal = sessionmaker(
-    bind=engine,
+SessionLocal = _LazySessionMaker(
     autocommit=False,
     autoflush=False,
 )
@@ -25,4 +73,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
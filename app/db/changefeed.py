@@ -0,0 +1,52 @@
+# ============================
+# CHANGE FEED CURSOR
+# ============================
+# Posición en el feed de cambios (app/db/sql/008): (change_xid, change_seq).
+# Solo se avanza hasta el horizonte (pg_snapshot_xmin): una transacción que
+# confirma tarde nunca queda detrás de un cursor ya entregado.
+# Lo usan GET /changes y las cachés que se actualizan por delta.
+
+from typing import Iterable, Tuple
+
+from sqlalchemy import BigInteger, Text, cast, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.db.models import ChangeTombstone
+
+Cursor = Tuple[int, int]
+START: Cursor = (0, 0)
+
+
+def change_horizon(db: Session) -> int:
+    # Transacciones < xmin ya terminaron: nada nuevo aparecerá antes de este punto
+    return db.execute(
+        select(cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger))
+    ).scalar()
+
+
+def changed_since(table, cursor: Cursor, horizon: int) -> tuple:
+    # Filtro del rango (cursor, horizonte) sobre el índice (change_xid, change_seq)
+    return (tuple_(table.c.change_xid, table.c.change_seq) > cursor, table.c.change_xid < horizon)
+
+
+def tombstones_since(tables: Iterable[str], cursor: Cursor, horizon: int):
+    ts = ChangeTombstone
+    return (
+        select(ts.table_name, ts.row_id, ts.change_xid, ts.change_seq)
+        .where(*changed_since(ts.__table__, cursor, horizon), ts.table_name.in_(list(tables)))
+    )
+
+
+def feed_position(db: Session, tables, horizon: int) -> Cursor:
+    # Último cambio (filas o tombstones) confirmado antes del horizonte
+    names = [t.name for t in tables]
+    candidates = [
+        select(t.c.change_xid, t.c.change_seq)
+        .where(t.c.change_xid < horizon)
+        .order_by(t.c.change_xid.desc(), t.c.change_seq.desc())
+        .limit(1)
+        for t in [*tables, ChangeTombstone.__table__]
+    ]
+    candidates[-1] = candidates[-1].where(ChangeTombstone.table_name.in_(names))
+    rows = [db.execute(stmt).first() for stmt in candidates]
+    return max(((int(r[0]), int(r[1])) for r in rows if r is not None), default=START)
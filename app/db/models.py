@@ -2,12 +2,22 @@
 # MODELS
 # ============================
 
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Text, DateTime, Boolean, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    Column, Integer, SmallInteger, BigInteger, String, Date, ForeignKey, Text, DateTime, Boolean, Float, Index,
+    Computed, func)
+from sqlalchemy.dialects.postgresql import ARRAY, TSTZRANGE
+from sqlalchemy.orm import relationship, deferred
 from app.db.base import Base
 
 
-class ParliamentMember(Base):
+class ChangeTracked:
+    # Mantenidas por trigger; cursor del feed de cambios (app/db/sql/008)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+    change_xid = Column(BigInteger, nullable=False, server_default="0")
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+
+
+class ParliamentMember(ChangeTracked, Base):
     __tablename__ = "parliament_member"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -33,7 +43,7 @@ class ParliamentMember(Base):
     parties = relationship("Party", secondary="party_membership", back_populates="members")
     
 
-class Party(Base):
+class Party(ChangeTracked, Base):
     __tablename__ = "party"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -47,7 +57,7 @@ class Party(Base):
     members = relationship("ParliamentMember", secondary="party_membership", back_populates="parties")
 
 
-class PartyMembership(Base):
+class PartyMembership(ChangeTracked, Base):
     __tablename__ = "party_membership"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -57,25 +67,34 @@ class PartyMembership(Base):
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=True)
 
+    # [start_date, end_date) en UTC; GiST + exclusión (app/db/sql/004)
+    period = deferred(Column(
+        TSTZRANGE,
+        Computed("tstzrange(start_date AT TIME ZONE 'UTC', end_date AT TIME ZONE 'UTC', '[)')", persisted=True),
+    ))
+
 
-class Attendance(Base):
+class Attendance(ChangeTracked, Base):
     __tablename__ = "attendances"
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("legislative_sessions.id", ondelete="NO ACTION"), nullable=False)
     parliament_member_id = Column(Integer, ForeignKey("parliament_member.id", ondelete="NO ACTION"), nullable=False)
 
-    attendance_type = Column(String(50), nullable=False)
+    attendance_type_id = Column(SmallInteger, ForeignKey("public.attendance_types.id"), nullable=False)
     justification = Column(String(255), nullable=True)
 
     reduces_attendance = Column(Boolean, nullable=True)
     reduces_quorum = Column(Boolean, nullable=True)
 
+    # Clave de partición (= legislative_sessions.start_date); PK real (id, session_date), ver app/db/sql/007
+    session_date = Column(DateTime, nullable=False)
+
     member = relationship("ParliamentMember", backref="attendances")
     session = relationship("LegislativeSession", backref="attendances")
 
 
-class LegislativeSession(Base):
+class LegislativeSession(ChangeTracked, Base):
     __tablename__ = "legislative_sessions"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -88,21 +107,21 @@ class LegislativeSession(Base):
     session_status = Column(String(50), nullable=False)
 
 
-class District(Base):
+class District(ChangeTracked, Base):
     __tablename__ = "districts"
 
     id = Column(Integer, primary_key=True, index=True)
     number = Column(Integer, nullable=False, unique=True)
 
 
-class Commune(Base):
+class Commune(ChangeTracked, Base):
     __tablename__ = "communes"
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, unique=True)
 
 
-class DistrictCommune(Base):
+class DistrictCommune(ChangeTracked, Base):
     __tablename__ = "district_communes"
     __table_args__ = {"schema": "public"}
     
@@ -111,7 +130,7 @@ class DistrictCommune(Base):
     commune_id = Column(Integer, ForeignKey("communes.id"), nullable=False)
 
 
-class LawProject(Base):
+class LawProject(ChangeTracked, Base):
     __tablename__ = "law_projects"
     __table_args__ = {"schema": "public"}
     
@@ -142,7 +161,7 @@ class LawProject(Base):
     ministries = relationship("LawProjectMinistry", back_populates="project", lazy="selectin")
 
 
-class LawProjectVote(Base):
+class LawProjectVote(ChangeTracked, Base):
     __tablename__ = "law_project_votes"
     __table_args__ = {"schema": "public"}
 
@@ -169,7 +188,7 @@ class LawProjectVote(Base):
     details = relationship("LawProjectVoteDetail", back_populates="vote", lazy="selectin")
 
 
-class LawProjectVoteDetail(Base):
+class LawProjectVoteDetail(ChangeTracked, Base):
     __tablename__ = "law_project_vote_details"
     __table_args__ = {"schema": "public"}
 
@@ -177,12 +196,34 @@ class LawProjectVoteDetail(Base):
     vote_id = Column(Integer, ForeignKey("public.law_project_votes.id"), nullable=True)
     
     parliament_member_id = Column(Integer, ForeignKey("public.parliament_member.id"), nullable=True)
-    vote_option = Column(String, nullable=False)
+    vote_option_id = Column(SmallInteger, ForeignKey("public.vote_options.id"), nullable=False)
+
+    # Clave de partición (= law_project_votes.date); PK real (id, vote_date), ver app/db/sql/007
+    vote_date = Column(DateTime, nullable=False)
 
     vote = relationship("LawProjectVote", back_populates="details")
 
 
-class LawProjectMinistry(Base):
+class VoteOption(ChangeTracked, Base):
+    __tablename__ = "vote_options"
+    __table_args__ = {"schema": "public"}
+
+    id = Column(SmallInteger, primary_key=True)
+    label = Column(String(100), nullable=False, unique=True)
+    # 1 sí, 2 no, 3 abstención, 4 otro (ver app.analytics.voting)
+    kind = Column(SmallInteger, nullable=False)
+
+
+class AttendanceType(ChangeTracked, Base):
+    __tablename__ = "attendance_types"
+    __table_args__ = {"schema": "public"}
+
+    id = Column(SmallInteger, primary_key=True)
+    label = Column(String(50), nullable=False, unique=True)
+    is_present = Column(Boolean, nullable=False, default=False)
+
+
+class LawProjectMinistry(ChangeTracked, Base):
     __tablename__ = "law_project_ministries"
     __table_args__ = {"schema": "public"}
 
@@ -193,7 +234,7 @@ class LawProjectMinistry(Base):
     project = relationship("LawProject", back_populates="ministries")
 
 
-class LawProjectMatter(Base):
+class LawProjectMatter(ChangeTracked, Base):
     __tablename__ = "law_project_matters"
     __table_args__ = {"schema": "public"}
 
@@ -204,7 +245,7 @@ class LawProjectMatter(Base):
     project = relationship("LawProject", back_populates="matters")
 
 
-class LawProjectAuthor(Base):
+class LawProjectAuthor(ChangeTracked, Base):
     __tablename__ = "law_project_authors"
     __table_args__ = {"schema": "public"}
 
@@ -215,7 +256,7 @@ class LawProjectAuthor(Base):
     project = relationship("LawProject", back_populates="authors")
 
 
-class Ministry(Base):
+class Ministry(ChangeTracked, Base):
     __tablename__ = "ministries"
     __table_args__ = {"schema": "public"}
 
@@ -224,10 +265,99 @@ class Ministry(Base):
     name = Column(String(255), nullable=False)
 
 
-class Matter(Base):
+class Matter(ChangeTracked, Base):
     __tablename__ = "matters"
     __table_args__ = {"schema": "public"}
 
     id = Column(Integer, primary_key=True, index=True)
     matter_id = Column(Integer, nullable=False, unique=True)
-    name = Column(String(255), nullable=True)
\ No newline at end of file
+    name = Column(String(255), nullable=True)
+
+
+class LawProjectSummary(Base):
+    __tablename__ = "law_project_summary"
+    __table_args__ = (
+        Index("ix_law_project_summary_entry_date", "entry_date", "law_project_id"),
+        {"schema": "public"},
+    )
+
+    law_project_id = Column(Integer, ForeignKey("public.law_projects.id", ondelete="CASCADE"), primary_key=True)
+    entry_date = Column(Date, nullable=False)
+
+    latest_vote_id = Column(Integer, nullable=True)
+    latest_vote_date = Column(DateTime, nullable=True)
+    latest_vote_result = Column(String, nullable=True)
+
+    total_yes = Column(Integer, nullable=False, default=0)
+    total_no = Column(Integer, nullable=False, default=0)
+    total_abstention = Column(Integer, nullable=False, default=0)
+    total_excused = Column(Integer, nullable=False, default=0)
+
+    votes_count = Column(Integer, nullable=False, default=0)
+    authors_count = Column(Integer, nullable=False, default=0)
+    matter_ids = Column(ARRAY(Integer), nullable=False, default=list)
+    ministry_ids = Column(ARRAY(Integer), nullable=False, default=list)
+
+    refreshed_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+
+class LawProjectSummaryDirty(Base):
+    # Marcado por trigger (app/db/sql/011)
+    __tablename__ = "law_project_summary_dirty"
+    __table_args__ = {"schema": "public"}
+
+    law_project_id = Column(Integer, primary_key=True)
+    marked_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class PartyVoteCohesion(Base):
+    __tablename__ = "party_vote_cohesion"
+    __table_args__ = (
+        Index("ix_party_vote_cohesion_party_date", "party_id", "vote_date"),
+        {"schema": "public"},
+    )
+
+    party_id = Column(Integer, ForeignKey("party.id"), primary_key=True)
+    vote_id = Column(Integer, ForeignKey("public.law_project_votes.id", ondelete="CASCADE"), primary_key=True)
+    vote_date = Column(DateTime, nullable=False)
+
+    members = Column(Integer, nullable=False)
+    yes = Column(Integer, nullable=False)
+    no = Column(Integer, nullable=False)
+    abstention = Column(Integer, nullable=False)
+
+    rice_index = Column(Float, nullable=True)
+    majority_share = Column(Float, nullable=True)
+
+
+class PartyVoteCohesionDirty(Base):
+    # Marcado por trigger (app/db/sql/014)
+    __tablename__ = "party_vote_cohesion_dirty"
+    __table_args__ = {"schema": "public"}
+
+    vote_id = Column(Integer, primary_key=True)
+    marked_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class ReferenceDataVersion(Base):
+    __tablename__ = "reference_data_version"
+    __table_args__ = {"schema": "public"}
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class ChangeTombstone(Base):
+    __tablename__ = "change_tombstones"
+    __table_args__ = (
+        Index("ix_change_tombstones_cursor", "change_xid", "change_seq"),
+        {"schema": "public"},
+    )
+
+    change_seq = Column(BigInteger, primary_key=True)
+    change_xid = Column(BigInteger, nullable=False)
+
+    table_name = Column(String(63), nullable=False)
+    row_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, server_default=func.now())
@@ -0,0 +1,84 @@
+# ============================
+# PIPELINED EXECUTION
+# ============================
+# Ejecuta en un solo viaje al servidor las consultas independientes de una
+# request (modo pipeline de psycopg 3, DB_DRIVER=psycopg). Con psycopg 3 las
+# sentencias que se repiten se preparan en el servidor tras
+# DB_PREPARE_THRESHOLD ejecuciones (ver app/db/base.py).
+# Con otro driver (o libpq sin pipeline) se ejecutan una tras otra en la
+# misma sesión: el resultado es el mismo.
+# Solo para selects de columnas (Core): las filas no pasan por el ORM.
+
+from collections import namedtuple
+from functools import lru_cache
+from typing import Any, List, Sequence
+
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def _pipeline_supported() -> bool:
+    try:
+        import psycopg
+    except ImportError:
+        return False
+    return psycopg.Pipeline.is_supported()
+
+
+def pipeline_enabled(db: Session) -> bool:
+    return settings.db_pipeline and db.get_bind().dialect.driver == "psycopg" and _pipeline_supported()
+
+
+@lru_cache(maxsize=256)
+def _row_type(keys: tuple):
+    return namedtuple("Row", keys, rename=True)
+
+
+def _rows(stmt: Select, dialect, description, raw_rows) -> List[Any]:
+    # type_code (OID) de cada columna, como en CursorResult
+    processors = [
+        c.type.dialect_impl(dialect).result_processor(dialect, d[1])
+        for c, d in zip(stmt.selected_columns, description)
+    ]
+    row = _row_type(tuple(stmt.selected_columns.keys()))
+    if not any(processors):
+        return [row(*r) for r in raw_rows]
+    return [
+        row(*(p(v) if p else v for p, v in zip(processors, r)))
+        for r in raw_rows
+    ]
+
+
+def execute_batch(db: Session, statements: Sequence[Select]) -> List[List[Any]]:
+    if not pipeline_enabled(db):
+        return [db.execute(stmt).all() for stmt in statements]
+
+    conn = db.connection()
+    dialect = conn.dialect
+    raw = conn.connection.driver_connection
+    compiled = [s.compile(dialect=dialect, compile_kwargs={"render_postcompile": True}) for s in statements]
+
+    # Los cursores crudos no pasan por Connection.execute: before/after_cursor_execute
+    # (línea de tiempo SQL del profiler) se emiten aquí. Cada consulta termina
+    # cuando llegan sus filas.
+    events = conn.dispatch
+
+    # Todas las sentencias salen juntas; el servidor responde tras el sync final
+    cursors = []
+    with raw.pipeline():
+        for c in compiled:
+            cur = raw.cursor()
+            events.before_cursor_execute(conn, cur, c.string, c.params, None, False)
+            cur.execute(c.string, c.params)
+            cursors.append(cur)
+
+    results = []
+    for stmt, c, cur in zip(statements, compiled, cursors):
+        raw_rows = cur.fetchall()
+        events.after_cursor_execute(conn, cur, c.string, c.params, None, False)
+        results.append(_rows(stmt, dialect, cur.description, raw_rows))
+        cur.close()
+    return results
@@ -0,0 +1,54 @@
+# ============================
+# CORE PROJECTIONS
+# ============================
+# Lectura sin ORM para rutas de solo lectura: se seleccionan con Core solo
+# las columnas que pide el schema de respuesta y cada fila se valida desde
+# su mapping, sin instancias ORM ni identity map de por medio.
+# Las columnas salen de los nombres de campo del schema (los modelos no
+# renombran columnas); los sub-objetos de un join van con prefijo.
+
+from functools import lru_cache
+from typing import Any, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Column, select
+from sqlalchemy.sql import Select
+
+S = TypeVar("S", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def schema_columns(schema: Type[BaseModel], model) -> Tuple[Column, ...]:
+    table = model.__table__
+    return tuple(table.c[name] for name in schema.model_fields if name in table.c)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(List[schema])
+
+
+def projection(schema: Type[BaseModel], model, *extra) -> Select:
+    return select(*schema_columns(schema, model), *extra)
+
+
+def prefixed(schema: Type[BaseModel], model, prefix: str) -> List:
+    return [c.label(f"{prefix}{c.name}") for c in schema_columns(schema, model)]
+
+# ------------------------------------------------------------
+# Filas -> Modelos de Respuesta
+# ------------------------------------------------------------
+def to_models(schema: Type[S], rows: Iterable[Any]) -> List[S]:
+    return list_adapter(schema).validate_python([r._mapping for r in rows])
+
+
+def to_model(schema: Type[S], row: Any, prefix: str = "") -> S:
+    if not prefix:
+        return schema.model_validate(row._mapping)
+    n = len(prefix)
+    return schema.model_validate({k[n:]: v for k, v in row._mapping.items() if k.startswith(prefix)})
+
+
+def optional_model(schema: Type[S], row: Any, prefix: str, key: str) -> Optional[S]:
+    # Outer join: sin fila relacionada todas sus columnas vienen en NULL
+    return to_model(schema, row, prefix) if row._mapping[f"{prefix}{key}"] is not None else None
@@ -0,0 +1,43 @@
+-- ============================
+-- LAW PROJECT SUMMARY
+-- ============================
+-- Read model para tarjetas y listados de proyectos de ley.
+-- Se mantiene con: python -m app.jobs.law_summary
+
+CREATE TABLE IF NOT EXISTS public.law_project_summary (
+    law_project_id      INTEGER PRIMARY KEY REFERENCES public.law_projects (id) ON DELETE CASCADE,
+    entry_date          DATE NOT NULL,
+
+    latest_vote_id      INTEGER,
+    latest_vote_date    TIMESTAMP,
+    latest_vote_result  VARCHAR,
+
+    total_yes           INTEGER NOT NULL DEFAULT 0,
+    total_no            INTEGER NOT NULL DEFAULT 0,
+    total_abstention    INTEGER NOT NULL DEFAULT 0,
+    total_excused       INTEGER NOT NULL DEFAULT 0,
+
+    votes_count         INTEGER NOT NULL DEFAULT 0,
+    authors_count       INTEGER NOT NULL DEFAULT 0,
+    matter_ids          INTEGER[] NOT NULL DEFAULT '{}',
+    ministry_ids        INTEGER[] NOT NULL DEFAULT '{}',
+
+    refreshed_at        TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_law_project_summary_entry_date
+    ON public.law_project_summary (entry_date, law_project_id);
+
+-- Orden del listado (entry_date DESC, id DESC)
+CREATE INDEX IF NOT EXISTS ix_law_projects_entry_date
+    ON public.law_projects (entry_date, id);
+
+-- Soporte para el refresco incremental
+CREATE INDEX IF NOT EXISTS ix_law_project_votes_project_date
+    ON public.law_project_votes (law_project_id, date, id);
+CREATE INDEX IF NOT EXISTS ix_law_project_authors_project
+    ON public.law_project_authors (law_project_id);
+CREATE INDEX IF NOT EXISTS ix_law_project_matters_project
+    ON public.law_project_matters (law_project_id);
+CREATE INDEX IF NOT EXISTS ix_law_project_ministries_project
+    ON public.law_project_ministries (law_project_id);
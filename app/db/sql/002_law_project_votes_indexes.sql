@@ -0,0 +1,11 @@
+-- ============================
+-- LAW PROJECT VOTES: ÍNDICES
+-- ============================
+-- GET /laws/{id}/votes          -> ix_law_project_votes_project_date (001)
+-- GET /laws/{id}/votes/{vote_id} -> ix_law_project_vote_details_vote
+
+CREATE INDEX IF NOT EXISTS ix_law_project_vote_details_vote
+    ON public.law_project_vote_details (vote_id, id);
+
+CREATE INDEX IF NOT EXISTS ix_party_membership_member_start
+    ON public.party_membership (parliament_member_id, start_date);
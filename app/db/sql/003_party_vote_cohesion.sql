@@ -0,0 +1,28 @@
+-- ============================
+-- PARTY VOTE COHESION
+-- ============================
+-- Cohesión por partido y votación (índice de Rice y % con la mayoría).
+-- Se mantiene con: python -m app.jobs.party_cohesion (pendientes marcadas por 014)
+
+CREATE TABLE IF NOT EXISTS public.party_vote_cohesion (
+    party_id        INTEGER NOT NULL REFERENCES party (id),
+    vote_id         INTEGER NOT NULL REFERENCES public.law_project_votes (id) ON DELETE CASCADE,
+    vote_date       TIMESTAMP NOT NULL,
+
+    members         INTEGER NOT NULL,
+    yes             INTEGER NOT NULL,
+    no              INTEGER NOT NULL,
+    abstention      INTEGER NOT NULL,
+
+    rice_index      DOUBLE PRECISION,
+    majority_share  DOUBLE PRECISION,
+
+    PRIMARY KEY (party_id, vote_id)
+);
+
+CREATE INDEX IF NOT EXISTS ix_party_vote_cohesion_party_date
+    ON public.party_vote_cohesion (party_id, vote_date);
+
+-- Resolución histórica de militancia
+CREATE INDEX IF NOT EXISTS ix_party_membership_member_period
+    ON public.party_membership (parliament_member_id, start_date, end_date);
@@ -0,0 +1,31 @@
+-- ============================
+-- PARTY MEMBERSHIP: PERÍODO
+-- ============================
+-- Militancia como intervalo [start_date, end_date) para consultas históricas.
+-- Las fechas se guardan sin zona horaria y se interpretan como UTC.
+
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE party_membership
+    ADD COLUMN IF NOT EXISTS period tstzrange
+    GENERATED ALWAYS AS (
+        tstzrange(start_date AT TIME ZONE 'UTC', end_date AT TIME ZONE 'UTC', '[)')
+    ) STORED;
+
+-- "¿Quiénes militaban en el partido X en la fecha D?"
+CREATE INDEX IF NOT EXISTS ix_party_membership_party_period
+    ON party_membership USING gist (party_id, period);
+
+-- Un diputado no puede militar en dos partidos a la vez.
+-- El índice de la restricción resuelve "¿en qué partido estaba el diputado en la fecha D?".
+-- Antes de aplicarla, revisar solapes existentes:
+--   SELECT a.id, b.id FROM party_membership a JOIN party_membership b
+--     ON a.parliament_member_id = b.parliament_member_id AND a.id < b.id AND a.period && b.period;
+DO $$
+BEGIN
+    IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'party_membership_no_overlap') THEN
+        ALTER TABLE party_membership
+            ADD CONSTRAINT party_membership_no_overlap
+            EXCLUDE USING gist (parliament_member_id WITH =, period WITH &&);
+    END IF;
+END $$;
@@ -0,0 +1,46 @@
+-- ============================
+-- REFERENCE DATA VERSION
+-- ============================
+-- Versión de las tablas de referencia (diputados, partidos, militancias,
+-- territorio, ministerios y materias). La API mantiene un snapshot en
+-- memoria y lo reconstruye cuando esta versión cambia.
+
+CREATE TABLE IF NOT EXISTS public.reference_data_version (
+    id          INTEGER PRIMARY KEY,
+    version     INTEGER NOT NULL DEFAULT 0,
+    updated_at  TIMESTAMP NOT NULL DEFAULT now()
+);
+
+INSERT INTO public.reference_data_version (id, version) VALUES (1, 1)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION public.bump_reference_data_version() RETURNS trigger AS $$
+DECLARE
+    v INTEGER;
+BEGIN
+    UPDATE public.reference_data_version
+       SET version = version + 1, updated_at = now()
+     WHERE id = 1
+    RETURNING version INTO v;
+    PERFORM pg_notify('votabien_reference', coalesce(v, 0)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'parliament_member', 'party', 'party_membership', 'districts', 'communes',
+        'district_communes', 'ministries', 'matters'
+    ] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_reference_version ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_reference_version '
+            'AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.%I '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.bump_reference_data_version()',
+            t, t
+        );
+    END LOOP;
+END $$;
@@ -0,0 +1,215 @@
+-- ============================
+-- VOTE OPTIONS & ATTENDANCE TYPES
+-- ============================
+-- Codifica law_project_vote_details.vote_option y attendances.attendance_type
+-- como smallint contra tablas de diccionario. La API traduce los códigos a
+-- etiquetas desde el snapshot de referencia.
+--
+-- Los loaders deberían escribir vote_option_id / attendance_type_id. Mientras
+-- tanto las columnas de texto siguen aceptando la etiqueta: un trigger
+-- BEFORE la traduce al código (la agrega al diccionario si es nueva) y deja
+-- el texto en NULL, así no ocupa espacio.
+-- Se puede volver a ejecutar (también después de 007, que conserva las
+-- columnas y los triggers). Tras el backfill, ejecutar VACUUM FULL (o la
+-- migración 007) para recuperar el espacio de las etiquetas.
+
+BEGIN;
+
+-- ------------------------------------------------------------
+-- Diccionarios
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS public.vote_options (
+    id      SMALLINT PRIMARY KEY,
+    label   VARCHAR(100) NOT NULL UNIQUE,
+    kind    SMALLINT NOT NULL          -- 1 sí, 2 no, 3 abstención, 4 otro
+);
+
+CREATE TABLE IF NOT EXISTS public.attendance_types (
+    id          SMALLINT PRIMARY KEY,
+    label       VARCHAR(50) NOT NULL UNIQUE,
+    is_present  BOOLEAN NOT NULL DEFAULT false
+);
+
+CREATE OR REPLACE FUNCTION public.vote_option_kind(label text) RETURNS smallint
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT CASE
+               WHEN lower(label) LIKE 'afirmativ%' OR lower(label) IN ('si', 'sí', 'a favor') THEN 1
+               WHEN lower(label) LIKE 'en contra%' OR lower(label) IN ('no', 'contra') THEN 2
+               WHEN lower(label) LIKE 'absten%' THEN 3
+               ELSE 4
+           END::smallint
+$$;
+
+-- Columnas de texto: se conservan (o se recrean vacías) para los loaders
+ALTER TABLE public.law_project_vote_details ADD COLUMN IF NOT EXISTS vote_option VARCHAR;
+ALTER TABLE public.law_project_vote_details ALTER COLUMN vote_option DROP NOT NULL;
+ALTER TABLE public.attendances ADD COLUMN IF NOT EXISTS attendance_type VARCHAR;
+ALTER TABLE public.attendances ALTER COLUMN attendance_type DROP NOT NULL;
+
+INSERT INTO public.vote_options (id, label, kind)
+SELECT (SELECT coalesce(max(id), 0) FROM public.vote_options) + row_number() OVER (ORDER BY label),
+       label,
+       public.vote_option_kind(label)
+  FROM (
+        SELECT DISTINCT btrim(vote_option) AS label
+          FROM public.law_project_vote_details
+         WHERE vote_option IS NOT NULL
+       ) s
+ WHERE label NOT IN (SELECT label FROM public.vote_options);
+
+INSERT INTO public.attendance_types (id, label, is_present)
+SELECT (SELECT coalesce(max(id), 0) FROM public.attendance_types) + row_number() OVER (ORDER BY label),
+       label,
+       lower(label) = 'asiste'
+  FROM (
+        SELECT min(btrim(attendance_type)) AS label
+          FROM public.attendances
+         WHERE attendance_type IS NOT NULL
+         GROUP BY lower(btrim(attendance_type))
+       ) s
+ WHERE lower(label) NOT IN (SELECT lower(label) FROM public.attendance_types);
+
+-- Códigos nuevos desde una secuencia: dos loaders que registran etiquetas
+-- distintas a la vez nunca calculan el mismo id
+CREATE SEQUENCE IF NOT EXISTS public.vote_options_id_seq AS SMALLINT OWNED BY public.vote_options.id;
+SELECT setval('public.vote_options_id_seq', coalesce(max(id), 1), max(id) IS NOT NULL) FROM public.vote_options;
+ALTER TABLE public.vote_options ALTER COLUMN id SET DEFAULT nextval('public.vote_options_id_seq');
+
+CREATE SEQUENCE IF NOT EXISTS public.attendance_types_id_seq AS SMALLINT OWNED BY public.attendance_types.id;
+SELECT setval('public.attendance_types_id_seq', coalesce(max(id), 1), max(id) IS NOT NULL) FROM public.attendance_types;
+ALTER TABLE public.attendance_types ALTER COLUMN id SET DEFAULT nextval('public.attendance_types_id_seq');
+
+-- ------------------------------------------------------------
+-- Backfill
+-- ------------------------------------------------------------
+-- Solo filas con etiqueta y sin código: en una segunda pasada no toca nada
+ALTER TABLE public.law_project_vote_details
+    ADD COLUMN IF NOT EXISTS vote_option_id SMALLINT REFERENCES public.vote_options (id);
+UPDATE public.law_project_vote_details d
+   SET vote_option_id = o.id, vote_option = NULL
+  FROM public.vote_options o
+ WHERE d.vote_option IS NOT NULL
+   AND d.vote_option_id IS NULL
+   AND o.label = btrim(d.vote_option);
+ALTER TABLE public.law_project_vote_details ALTER COLUMN vote_option_id SET NOT NULL;
+
+ALTER TABLE public.attendances
+    ADD COLUMN IF NOT EXISTS attendance_type_id SMALLINT REFERENCES public.attendance_types (id);
+UPDATE public.attendances a
+   SET attendance_type_id = t.id, attendance_type = NULL
+  FROM public.attendance_types t
+ WHERE a.attendance_type IS NOT NULL
+   AND a.attendance_type_id IS NULL
+   AND lower(t.label) = lower(btrim(a.attendance_type));
+ALTER TABLE public.attendances ALTER COLUMN attendance_type_id SET NOT NULL;
+
+-- ------------------------------------------------------------
+-- Etiqueta -> Código (loaders que aún escriben texto)
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.map_vote_option_label() RETURNS trigger AS $$
+DECLARE
+    lbl TEXT := btrim(NEW.vote_option);
+BEGIN
+    IF lbl IS NULL THEN
+        RETURN NEW;
+    END IF;
+    IF NEW.vote_option_id IS NULL THEN
+        SELECT id INTO NEW.vote_option_id FROM public.vote_options WHERE label = lbl;
+        IF NEW.vote_option_id IS NULL THEN
+            -- Misma etiqueta en otra transacción: se espera su commit y se relee
+            INSERT INTO public.vote_options (label, kind) VALUES (lbl, public.vote_option_kind(lbl))
+            ON CONFLICT (label) DO NOTHING;
+            SELECT id INTO NEW.vote_option_id FROM public.vote_options WHERE label = lbl;
+            IF NEW.vote_option_id IS NULL THEN
+                RAISE EXCEPTION 'vote option % could not be registered', lbl;
+            END IF;
+        END IF;
+    END IF;
+    NEW.vote_option := NULL;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.map_attendance_type_label() RETURNS trigger AS $$
+DECLARE
+    lbl TEXT := btrim(NEW.attendance_type);
+BEGIN
+    IF lbl IS NULL THEN
+        RETURN NEW;
+    END IF;
+    IF NEW.attendance_type_id IS NULL THEN
+        SELECT min(id) INTO NEW.attendance_type_id FROM public.attendance_types WHERE lower(label) = lower(lbl);
+        IF NEW.attendance_type_id IS NULL THEN
+            INSERT INTO public.attendance_types (label, is_present) VALUES (lbl, lower(lbl) = 'asiste')
+            ON CONFLICT (label) DO NOTHING;
+            SELECT min(id) INTO NEW.attendance_type_id FROM public.attendance_types WHERE lower(label) = lower(lbl);
+            IF NEW.attendance_type_id IS NULL THEN
+                RAISE EXCEPTION 'attendance type % could not be registered', lbl;
+            END IF;
+        END IF;
+    END IF;
+    NEW.attendance_type := NULL;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_law_project_vote_details_option_label ON public.law_project_vote_details;
+CREATE TRIGGER trg_law_project_vote_details_option_label
+    BEFORE INSERT OR UPDATE OF vote_option ON public.law_project_vote_details
+    FOR EACH ROW EXECUTE FUNCTION public.map_vote_option_label();
+
+DROP TRIGGER IF EXISTS trg_attendances_type_label ON public.attendances;
+CREATE TRIGGER trg_attendances_type_label
+    BEFORE INSERT OR UPDATE OF attendance_type ON public.attendances
+    FOR EACH ROW EXECUTE FUNCTION public.map_attendance_type_label();
+
+-- ------------------------------------------------------------
+-- Índices (conteos index-only por diputado)
+-- ------------------------------------------------------------
+CREATE INDEX IF NOT EXISTS ix_attendances_member_type
+    ON public.attendances (parliament_member_id, attendance_type_id);
+CREATE INDEX IF NOT EXISTS ix_law_project_vote_details_member_option
+    ON public.law_project_vote_details (parliament_member_id, vote_option_id);
+
+-- Parciales sobre los valores más frecuentes (asiste, sí, no)
+DO $$
+DECLARE
+    present_id SMALLINT;
+    yes_id SMALLINT;
+    no_id SMALLINT;
+BEGIN
+    SELECT min(id) INTO present_id FROM public.attendance_types WHERE is_present;
+    SELECT min(id) INTO yes_id FROM public.vote_options WHERE kind = 1;
+    SELECT min(id) INTO no_id FROM public.vote_options WHERE kind = 2;
+
+    IF present_id IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS ix_attendances_member_present '
+            'ON public.attendances (parliament_member_id, session_id) WHERE attendance_type_id = %s', present_id);
+    END IF;
+    IF yes_id IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS ix_law_project_vote_details_member_yes '
+            'ON public.law_project_vote_details (parliament_member_id, vote_id) WHERE vote_option_id = %s', yes_id);
+    END IF;
+    IF no_id IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS ix_law_project_vote_details_member_no '
+            'ON public.law_project_vote_details (parliament_member_id, vote_id) WHERE vote_option_id = %s', no_id);
+    END IF;
+END $$;
+
+-- ------------------------------------------------------------
+-- Los diccionarios forman parte del snapshot de referencia (005)
+-- ------------------------------------------------------------
+DROP TRIGGER IF EXISTS trg_vote_options_reference_version ON public.vote_options;
+CREATE TRIGGER trg_vote_options_reference_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.vote_options
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_reference_data_version();
+
+DROP TRIGGER IF EXISTS trg_attendance_types_reference_version ON public.attendance_types;
+CREATE TRIGGER trg_attendance_types_reference_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.attendance_types
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_reference_data_version();
+
+COMMIT;
@@ -0,0 +1,205 @@
+-- ============================
+-- PARTICIONES POR PERÍODO LEGISLATIVO
+-- ============================
+-- law_project_vote_details y attendances pasan a ser tablas particionadas
+-- por rango de fecha, una partición por período legislativo (4 años desde
+-- el 11 de marzo: 2018-2022, 2022-2026, ...).
+--
+--   law_project_vote_details  -> vote_date    (= law_project_votes.date)
+--   attendances               -> session_date (= legislative_sessions.start_date)
+-- (copias sincronizadas por trigger desde 012, verificadas desde 013)
+--
+-- Los loaders deben escribir la columna de fecha: Postgres enruta la fila
+-- antes de los triggers BEFORE, así que no se puede completar con un trigger.
+-- Las particiones futuras se crean con: python -m app.jobs.partitions
+-- (fuera de rango, las filas caen en la partición DEFAULT de 013)
+-- Un período antiguo se puede archivar con
+--   ALTER TABLE ... DETACH PARTITION ... / ALTER TABLE ... SET TABLESPACE ...
+-- sin tocar las particiones del período actual.
+
+BEGIN;
+
+-- ------------------------------------------------------------
+-- Períodos y Creación de Particiones
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.legislative_period_start(ts timestamp)
+RETURNS date
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT make_date(y - ((y - 1990) % 4 + 4) % 4, 3, 11)
+      FROM (
+            SELECT extract(year FROM ts)::int
+                   - CASE WHEN ts < make_date(extract(year FROM ts)::int, 3, 11) THEN 1 ELSE 0 END AS y
+           ) s
+$$;
+
+CREATE OR REPLACE FUNCTION public.ensure_legislative_partitions(parent text, since timestamp, upto timestamp)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    p_start date := public.legislative_period_start(since);
+    p_last  date := public.legislative_period_start(upto);
+    p_name  text;
+    created integer := 0;
+BEGIN
+    WHILE p_start <= p_last LOOP
+        p_name := format('%s_p%s', parent, extract(year FROM p_start)::int);
+        IF to_regclass(format('public.%I', p_name)) IS NULL THEN
+            EXECUTE format(
+                'CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+                p_name, parent, p_start, (p_start + interval '4 years')::date);
+            created := created + 1;
+        END IF;
+        p_start := (p_start + interval '4 years')::date;
+    END LOOP;
+    RETURN created;
+END $$;
+
+-- ------------------------------------------------------------
+-- Tablas actuales -> *_old (se libera el nombre de su PK)
+-- ------------------------------------------------------------
+ALTER TABLE public.law_project_vote_details RENAME TO law_project_vote_details_old;
+ALTER TABLE public.attendances RENAME TO attendances_old;
+
+DO $$
+DECLARE
+    t text;
+    pk text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['law_project_vote_details_old', 'attendances_old'] LOOP
+        SELECT conname INTO pk
+          FROM pg_constraint
+         WHERE conrelid = format('public.%I', t)::regclass AND contype = 'p';
+        IF pk IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE public.%I RENAME CONSTRAINT %I TO %I', t, pk, t || '_pkey');
+        END IF;
+    END LOOP;
+END $$;
+
+-- ------------------------------------------------------------
+-- law_project_vote_details
+-- ------------------------------------------------------------
+CREATE TABLE public.law_project_vote_details (
+    id                    INTEGER NOT NULL,
+    vote_id               INTEGER REFERENCES public.law_project_votes (id),
+    parliament_member_id  INTEGER REFERENCES public.parliament_member (id),
+    vote_option_id        SMALLINT NOT NULL REFERENCES public.vote_options (id),
+    vote_date             TIMESTAMP NOT NULL,
+    vote_option           VARCHAR,            -- solo entrada de loaders (006)
+    PRIMARY KEY (id, vote_date)
+) PARTITION BY RANGE (vote_date);
+
+SELECT public.ensure_legislative_partitions(
+    'law_project_vote_details',
+    coalesce((SELECT min(date) FROM public.law_project_votes), now()::timestamp),
+    now()::timestamp + interval '4 years');
+
+INSERT INTO public.law_project_vote_details (id, vote_id, parliament_member_id, vote_option_id, vote_date)
+SELECT d.id, d.vote_id, d.parliament_member_id, d.vote_option_id, v.date
+  FROM public.law_project_vote_details_old d
+  JOIN public.law_project_votes v ON v.id = d.vote_id;
+
+-- Filas sin votación (no visibles desde la API) se conservan aparte
+CREATE TABLE IF NOT EXISTS public.law_project_vote_details_orphans AS
+SELECT d.*
+  FROM public.law_project_vote_details_old d
+ WHERE NOT EXISTS (SELECT 1 FROM public.law_project_votes v WHERE v.id = d.vote_id);
+
+-- ------------------------------------------------------------
+-- attendances
+-- ------------------------------------------------------------
+CREATE TABLE public.attendances (
+    id                    INTEGER NOT NULL,
+    session_id            INTEGER NOT NULL REFERENCES public.legislative_sessions (id),
+    parliament_member_id  INTEGER NOT NULL REFERENCES public.parliament_member (id),
+    attendance_type_id    SMALLINT NOT NULL REFERENCES public.attendance_types (id),
+    justification         VARCHAR(255),
+    reduces_attendance    BOOLEAN,
+    reduces_quorum        BOOLEAN,
+    session_date          TIMESTAMP NOT NULL,
+    attendance_type       VARCHAR,            -- solo entrada de loaders (006)
+    PRIMARY KEY (id, session_date)
+) PARTITION BY RANGE (session_date);
+
+SELECT public.ensure_legislative_partitions(
+    'attendances',
+    coalesce((SELECT min(start_date) FROM public.legislative_sessions), now()::timestamp),
+    now()::timestamp + interval '4 years');
+
+INSERT INTO public.attendances (
+    id, session_id, parliament_member_id, attendance_type_id,
+    justification, reduces_attendance, reduces_quorum, session_date)
+SELECT a.id, a.session_id, a.parliament_member_id, a.attendance_type_id,
+       a.justification, a.reduces_attendance, a.reduces_quorum, s.start_date
+  FROM public.attendances_old a
+  JOIN public.legislative_sessions s ON s.id = a.session_id;
+
+-- ------------------------------------------------------------
+-- Secuencias: se traspasan a las tablas nuevas antes del DROP
+-- ------------------------------------------------------------
+DO $$
+DECLARE
+    t text;
+    seq text;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['law_project_vote_details', 'attendances'] LOOP
+        seq := pg_get_serial_sequence(format('public.%I', t || '_old'), 'id');
+        IF seq IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE public.%I ALTER COLUMN id SET DEFAULT nextval(%L)', t, seq);
+            EXECUTE format('ALTER SEQUENCE %s OWNED BY public.%I.id', seq, t);
+        END IF;
+    END LOOP;
+END $$;
+
+DROP TABLE public.law_project_vote_details_old;
+DROP TABLE public.attendances_old;
+
+-- Traducción etiqueta -> código de 006 (se pierde con las tablas *_old)
+CREATE TRIGGER trg_law_project_vote_details_option_label
+    BEFORE INSERT OR UPDATE OF vote_option ON public.law_project_vote_details
+    FOR EACH ROW EXECUTE FUNCTION public.map_vote_option_label();
+CREATE TRIGGER trg_attendances_type_label
+    BEFORE INSERT OR UPDATE OF attendance_type ON public.attendances
+    FOR EACH ROW EXECUTE FUNCTION public.map_attendance_type_label();
+
+-- ------------------------------------------------------------
+-- Índices (se propagan a cada partición)
+-- ------------------------------------------------------------
+CREATE INDEX ix_law_project_vote_details_vote
+    ON public.law_project_vote_details (vote_id, id);
+CREATE INDEX ix_law_project_vote_details_member_option
+    ON public.law_project_vote_details (parliament_member_id, vote_option_id);
+
+CREATE INDEX ix_attendances_session
+    ON public.attendances (session_id, id);
+CREATE INDEX ix_attendances_member_type
+    ON public.attendances (parliament_member_id, attendance_type_id);
+
+-- Parciales de 006, recreados sobre las tablas particionadas
+DO $$
+DECLARE
+    present_id SMALLINT;
+    yes_id SMALLINT;
+    no_id SMALLINT;
+BEGIN
+    SELECT min(id) INTO present_id FROM public.attendance_types WHERE is_present;
+    SELECT min(id) INTO yes_id FROM public.vote_options WHERE kind = 1;
+    SELECT min(id) INTO no_id FROM public.vote_options WHERE kind = 2;
+
+    IF present_id IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE INDEX ix_attendances_member_present '
+            'ON public.attendances (parliament_member_id, session_id) WHERE attendance_type_id = %s', present_id);
+    END IF;
+    IF yes_id IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE INDEX ix_law_project_vote_details_member_yes '
+            'ON public.law_project_vote_details (parliament_member_id, vote_id) WHERE vote_option_id = %s', yes_id);
+    END IF;
+    IF no_id IS NOT NULL THEN
+        EXECUTE format(
+            'CREATE INDEX ix_law_project_vote_details_member_no '
+            'ON public.law_project_vote_details (parliament_member_id, vote_id) WHERE vote_option_id = %s', no_id);
+    END IF;
+END $$;
+
+COMMIT;
@@ -0,0 +1,103 @@
+-- ============================
+-- CHANGE FEED (DELTA SYNC)
+-- ============================
+-- Cada fila de las tablas publicadas lleva:
+--   updated_at  último cambio
+--   change_xid  transacción que la escribió (pg_current_xact_id)
+--   change_seq  orden dentro del feed (secuencia global)
+-- y los DELETE dejan una fila en change_tombstones.
+--
+-- GET /changes pagina por (change_xid, change_seq) y solo entrega
+-- transacciones anteriores a la más antigua aún en curso
+-- (pg_snapshot_xmin), así el cursor nunca salta filas de una transacción
+-- que confirma tarde. Requiere PostgreSQL 13+.
+--
+-- El backfill de change_seq reescribe cada tabla una vez.
+
+BEGIN;
+
+CREATE SEQUENCE IF NOT EXISTS public.change_seq AS BIGINT;
+
+CREATE TABLE IF NOT EXISTS public.change_tombstones (
+    change_seq  BIGINT PRIMARY KEY DEFAULT nextval('public.change_seq'),
+    change_xid  BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint,
+    table_name  VARCHAR(63) NOT NULL,
+    row_id      INTEGER NOT NULL,
+    deleted_at  TIMESTAMP NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_change_tombstones_cursor
+    ON public.change_tombstones (change_xid, change_seq);
+
+-- ------------------------------------------------------------
+-- Triggers
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.touch_change() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    NEW.change_xid := pg_current_xact_id()::text::bigint;
+    NEW.change_seq := nextval('public.change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+-- TG_ARGV[0]: nombre de la tabla publicada (en tablas particionadas
+-- TG_TABLE_NAME sería el de la partición)
+CREATE OR REPLACE FUNCTION public.record_tombstone() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO public.change_tombstones (table_name, row_id) VALUES (TG_ARGV[0], OLD.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+    old_cols TEXT;
+    new_cols TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'parliament_member', 'party', 'party_membership', 'attendances', 'legislative_sessions',
+        'districts', 'communes', 'district_communes', 'law_projects', 'law_project_votes',
+        'law_project_vote_details', 'vote_options', 'attendance_types', 'law_project_ministries',
+        'law_project_matters', 'law_project_authors', 'ministries', 'matters'
+    ] LOOP
+        EXECUTE format('ALTER TABLE public.%I ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP NOT NULL DEFAULT now()', t);
+        EXECUTE format('ALTER TABLE public.%I ADD COLUMN IF NOT EXISTS change_xid BIGINT NOT NULL DEFAULT 0', t);
+        EXECUTE format('ALTER TABLE public.%I ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT 0', t);
+
+        -- Filas existentes: xid 0 y una posición propia en el feed
+        EXECUTE format('UPDATE public.%I SET change_seq = nextval(''public.change_seq'') WHERE change_seq = 0', t);
+
+        EXECUTE format(
+            'CREATE INDEX IF NOT EXISTS %I ON public.%I (change_xid, change_seq)',
+            'ix_' || t || '_change_cursor', t);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_change_insert ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_change_insert BEFORE INSERT ON public.%I '
+            'FOR EACH ROW EXECUTE FUNCTION public.touch_change()', t, t);
+
+        -- Upserts que no cambian nada no generan entradas en el feed. Se comparan
+        -- las columnas no generadas: OLD.* no se admite en un WHEN si la tabla
+        -- tiene columnas generadas (party_membership.period, 004)
+        SELECT string_agg('OLD.' || quote_ident(attname), ', ' ORDER BY attnum),
+               string_agg('NEW.' || quote_ident(attname), ', ' ORDER BY attnum)
+          INTO old_cols, new_cols
+          FROM pg_attribute
+         WHERE attrelid = format('public.%I', t)::regclass
+           AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_change_update ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_change_update BEFORE UPDATE ON public.%I '
+            'FOR EACH ROW WHEN (ROW(%s) IS DISTINCT FROM ROW(%s)) EXECUTE FUNCTION public.touch_change()',
+            t, t, old_cols, new_cols);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_change_delete ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_change_delete AFTER DELETE ON public.%I '
+            'FOR EACH ROW EXECUTE FUNCTION public.record_tombstone(%L)', t, t, t);
+    END LOOP;
+END $$;
+
+COMMIT;
@@ -0,0 +1,74 @@
+-- ============================
+-- LIVE: LISTEN/NOTIFY
+-- ============================
+-- Avisos en el canal 'votabien_live' para /live (SSE). Un aviso por
+-- votación o sesión afectada y por sentencia (no por fila); Postgres
+-- además descarta avisos idénticos dentro de la misma transacción.
+-- Payload: {"type": ..., "topic": ..., ...}
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION public.notify_live_votes() RETURNS trigger AS $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN SELECT DISTINCT law_project_id, id FROM new_rows LOOP
+        PERFORM pg_notify('votabien_live', json_build_object(
+            'type', 'vote', 'topic', 'law:' || r.law_project_id, 'id', r.id)::text);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.notify_live_vote_details() RETURNS trigger AS $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN
+        SELECT DISTINCT v.law_project_id, v.id
+          FROM new_rows d
+          JOIN public.law_project_votes v ON v.id = d.vote_id
+    LOOP
+        PERFORM pg_notify('votabien_live', json_build_object(
+            'type', 'vote', 'topic', 'law:' || r.law_project_id, 'id', r.id)::text);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.notify_live_attendances() RETURNS trigger AS $$
+DECLARE
+    r RECORD;
+BEGIN
+    FOR r IN SELECT DISTINCT session_id, session_date FROM new_rows LOOP
+        PERFORM pg_notify('votabien_live', json_build_object(
+            'type', 'attendance', 'topic', 'session:' || r.session_id,
+            'session_id', r.session_id, 'session_date', r.session_date)::text);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Las tablas de transición solo admiten un evento por trigger
+DO $$
+DECLARE
+    spec TEXT[];
+    ev TEXT;
+BEGIN
+    FOREACH spec SLICE 1 IN ARRAY ARRAY[
+        ARRAY['law_project_votes', 'notify_live_votes'],
+        ARRAY['law_project_vote_details', 'notify_live_vote_details'],
+        ARRAY['attendances', 'notify_live_attendances']
+    ] LOOP
+        FOREACH ev IN ARRAY ARRAY['insert', 'update'] LOOP
+            EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_live_%s ON public.%I', spec[1], ev, spec[1]);
+            EXECUTE format(
+                'CREATE TRIGGER trg_%s_live_%s AFTER %s ON public.%I '
+                'REFERENCING NEW TABLE AS new_rows '
+                'FOR EACH STATEMENT EXECUTE FUNCTION public.%I()',
+                spec[1], ev, upper(ev), spec[1], spec[2]);
+        END LOOP;
+    END LOOP;
+END $$;
+
+COMMIT;
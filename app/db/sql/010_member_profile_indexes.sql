@@ -0,0 +1,13 @@
+-- ============================
+-- PERFIL DE DIPUTADO: ÍNDICES
+-- ============================
+-- GET /parliament/{id}/profile
+--   últimas votaciones  -> ix_law_project_vote_details_member_date (por partición)
+--   proyectos de autoría -> ix_law_project_authors_member
+--   resumen de asistencia -> ix_attendances_member_type (007)
+
+CREATE INDEX IF NOT EXISTS ix_law_project_vote_details_member_date
+    ON public.law_project_vote_details (parliament_member_id, vote_date DESC, vote_id DESC);
+
+CREATE INDEX IF NOT EXISTS ix_law_project_authors_member
+    ON public.law_project_authors (parliament_member_id, law_project_id);
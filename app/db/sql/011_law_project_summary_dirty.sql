@@ -0,0 +1,78 @@
+-- ============================
+-- LAW PROJECT SUMMARY: PROYECTOS PENDIENTES
+-- ============================
+-- Cualquier cambio en las tablas de origen de law_project_summary
+-- (votaciones, autores, materias, ministerios y entry_date del proyecto)
+-- deja el proyecto en law_project_summary_dirty, en la misma transacción
+-- que el cambio. app/jobs/law_summary.py borra la marca y recalcula la
+-- fila en una sola transacción.
+-- Un trigger por sentencia y evento (tablas de transición).
+-- Tras aplicarla: python -m app.jobs.law_summary --all
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.law_project_summary_dirty (
+    law_project_id  INTEGER PRIMARY KEY,
+    marked_at       TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION public.mark_law_summary_dirty() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO public.law_project_summary_dirty (law_project_id)
+        SELECT DISTINCT law_project_id FROM new_rows WHERE law_project_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+    -- Filas que cambian de proyecto o se borran: también el proyecto anterior
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO public.law_project_summary_dirty (law_project_id)
+        SELECT DISTINCT law_project_id FROM old_rows WHERE law_project_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.mark_law_summary_dirty_project() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO public.law_project_summary_dirty (law_project_id) VALUES (NEW.id)
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY[
+        'law_project_votes', 'law_project_authors', 'law_project_matters', 'law_project_ministries'
+    ] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_summary_insert ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_summary_insert AFTER INSERT ON public.%I '
+            'REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.mark_law_summary_dirty()', t, t);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_summary_update ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_summary_update AFTER UPDATE ON public.%I '
+            'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.mark_law_summary_dirty()', t, t);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_summary_delete ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_summary_delete AFTER DELETE ON public.%I '
+            'REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.mark_law_summary_dirty()', t, t);
+    END LOOP;
+END $$;
+
+-- Del proyecto solo importa entry_date (las altas ya salen por falta de fila)
+DROP TRIGGER IF EXISTS trg_law_projects_summary_update ON public.law_projects;
+CREATE TRIGGER trg_law_projects_summary_update
+    AFTER UPDATE OF entry_date ON public.law_projects
+    FOR EACH ROW WHEN (OLD.entry_date IS DISTINCT FROM NEW.entry_date)
+    EXECUTE FUNCTION public.mark_law_summary_dirty_project();
+
+COMMIT;
@@ -0,0 +1,91 @@
+-- ============================
+-- FECHAS DE PARTICIÓN SINCRONIZADAS
+-- ============================
+-- attendances.session_date y law_project_vote_details.vote_date (007) son
+-- copias de legislative_sessions.start_date y law_project_votes.date. Las
+-- consultas filtran por ellas para podar particiones, así que una fecha
+-- corregida se propaga a las filas (Postgres las mueve de partición).
+--
+-- Un movimiento entre particiones es DELETE + INSERT: el tombstone de 008
+-- se omite si la fila sigue existiendo, así /changes no la da por borrada.
+
+BEGIN;
+
+-- ------------------------------------------------------------
+-- Propagación de la Fecha
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.sync_attendance_session_date() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.attendances
+       SET session_date = NEW.start_date
+     WHERE session_id = NEW.id
+       AND session_date IS DISTINCT FROM NEW.start_date;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.sync_vote_detail_date() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.law_project_vote_details
+       SET vote_date = NEW.date
+     WHERE vote_id = NEW.id
+       AND vote_date IS DISTINCT FROM NEW.date;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_legislative_sessions_sync_date ON public.legislative_sessions;
+CREATE TRIGGER trg_legislative_sessions_sync_date
+    AFTER UPDATE OF start_date ON public.legislative_sessions
+    FOR EACH ROW WHEN (OLD.start_date IS DISTINCT FROM NEW.start_date)
+    EXECUTE FUNCTION public.sync_attendance_session_date();
+
+DROP TRIGGER IF EXISTS trg_law_project_votes_sync_date ON public.law_project_votes;
+CREATE TRIGGER trg_law_project_votes_sync_date
+    AFTER UPDATE OF date ON public.law_project_votes
+    FOR EACH ROW WHEN (OLD.date IS DISTINCT FROM NEW.date)
+    EXECUTE FUNCTION public.sync_vote_detail_date();
+
+-- ------------------------------------------------------------
+-- Tombstones: sin entrada para filas movidas de partición
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.record_tombstone_unless_moved() RETURNS trigger AS $$
+DECLARE
+    moved BOOLEAN;
+BEGIN
+    EXECUTE format('SELECT EXISTS (SELECT 1 FROM public.%I WHERE id = $1)', TG_ARGV[0]) INTO moved USING OLD.id;
+    IF NOT moved THEN
+        INSERT INTO public.change_tombstones (table_name, row_id) VALUES (TG_ARGV[0], OLD.id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['attendances', 'law_project_vote_details'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_change_delete ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_change_delete AFTER DELETE ON public.%I '
+            'FOR EACH ROW EXECUTE FUNCTION public.record_tombstone_unless_moved(%L)', t, t, t);
+    END LOOP;
+END $$;
+
+-- ------------------------------------------------------------
+-- Filas ya desalineadas
+-- ------------------------------------------------------------
+UPDATE public.attendances a
+   SET session_date = s.start_date
+  FROM public.legislative_sessions s
+ WHERE s.id = a.session_id
+   AND a.session_date IS DISTINCT FROM s.start_date;
+
+UPDATE public.law_project_vote_details d
+   SET vote_date = v.date
+  FROM public.law_project_votes v
+ WHERE v.id = d.vote_id
+   AND d.vote_date IS DISTINCT FROM v.date;
+
+COMMIT;
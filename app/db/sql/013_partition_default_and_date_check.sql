@@ -0,0 +1,119 @@
+-- ============================
+-- PARTICIONES: DEFAULT Y FECHAS VERIFICADAS
+-- ============================
+-- 007 crea particiones solo hasta now() + 4 años: una fila fuera de rango
+-- hacía fallar el INSERT del loader. Cada tabla tiene ahora una partición
+-- DEFAULT; ensure_legislative_partitions mueve sus filas a la partición
+-- del período al crearla (python -m app.jobs.partitions).
+--
+-- vote_date / session_date las escriben los loaders (Postgres enruta la
+-- fila antes de los triggers BEFORE): un trigger rechaza la fila si la
+-- copia no coincide con la fecha de la votación o sesión. La
+-- sincronización de 012 escribe la fecha nueva y pasa la verificación.
+
+BEGIN;
+
+-- ------------------------------------------------------------
+-- Partición DEFAULT
+-- ------------------------------------------------------------
+CREATE TABLE IF NOT EXISTS public.law_project_vote_details_default
+    PARTITION OF public.law_project_vote_details DEFAULT;
+CREATE TABLE IF NOT EXISTS public.attendances_default
+    PARTITION OF public.attendances DEFAULT;
+
+-- Con DEFAULT, una partición nueva no se puede crear si DEFAULT ya tiene
+-- filas de su rango: se crea suelta, recibe las filas y se adjunta.
+-- Las filas movidas no dejan tombstone (008), como en 012.
+CREATE OR REPLACE FUNCTION public.ensure_legislative_partitions(parent text, since timestamp, upto timestamp)
+RETURNS integer
+LANGUAGE plpgsql AS $$
+DECLARE
+    p_start date := public.legislative_period_start(since);
+    p_last  date := public.legislative_period_start(upto);
+    p_end   date;
+    p_name  text;
+    d_name  text := parent || '_default';
+    key     text;
+    created integer := 0;
+BEGIN
+    SELECT a.attname INTO key
+      FROM pg_partitioned_table p
+      JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+     WHERE p.partrelid = format('public.%I', parent)::regclass;
+
+    WHILE p_start <= p_last LOOP
+        p_name := format('%s_p%s', parent, extract(year FROM p_start)::int);
+        p_end := (p_start + interval '4 years')::date;
+        IF to_regclass(format('public.%I', p_name)) IS NULL THEN
+            IF to_regclass(format('public.%I', d_name)) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+                    p_name, parent, p_start, p_end);
+            ELSE
+                EXECUTE format(
+                    'CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                    p_name, parent);
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM public.%I WHERE %I >= %L AND %I < %L RETURNING *) '
+                    'INSERT INTO public.%I SELECT * FROM moved',
+                    d_name, key, p_start, key, p_end, p_name);
+                EXECUTE format(
+                    'DELETE FROM public.change_tombstones t '
+                    ' WHERE t.table_name = %L AND t.change_xid = pg_current_xact_id()::text::bigint '
+                    '   AND EXISTS (SELECT 1 FROM public.%I m WHERE m.id = t.row_id)',
+                    parent, p_name);
+                EXECUTE format(
+                    'ALTER TABLE public.%I ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+                    parent, p_name, p_start, p_end);
+            END IF;
+            created := created + 1;
+        END IF;
+        p_start := p_end;
+    END LOOP;
+    RETURN created;
+END $$;
+
+-- ------------------------------------------------------------
+-- Verificación de la Fecha Copiada
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.check_vote_detail_date() RETURNS trigger AS $$
+DECLARE
+    parent_date TIMESTAMP;
+BEGIN
+    IF NEW.vote_id IS NOT NULL THEN
+        SELECT date INTO parent_date FROM public.law_project_votes WHERE id = NEW.vote_id;
+        IF FOUND AND NEW.vote_date IS DISTINCT FROM parent_date THEN
+            RAISE EXCEPTION 'law_project_vote_details.vote_date % does not match vote % date %',
+                NEW.vote_date, NEW.vote_id, parent_date
+                USING ERRCODE = 'check_violation';
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.check_attendance_session_date() RETURNS trigger AS $$
+DECLARE
+    parent_date TIMESTAMP;
+BEGIN
+    SELECT start_date INTO parent_date FROM public.legislative_sessions WHERE id = NEW.session_id;
+    IF FOUND AND NEW.session_date IS DISTINCT FROM parent_date THEN
+        RAISE EXCEPTION 'attendances.session_date % does not match session % start_date %',
+            NEW.session_date, NEW.session_id, parent_date
+            USING ERRCODE = 'check_violation';
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_law_project_vote_details_check_date ON public.law_project_vote_details;
+CREATE TRIGGER trg_law_project_vote_details_check_date
+    BEFORE INSERT OR UPDATE OF vote_id, vote_date ON public.law_project_vote_details
+    FOR EACH ROW EXECUTE FUNCTION public.check_vote_detail_date();
+
+DROP TRIGGER IF EXISTS trg_attendances_check_date ON public.attendances;
+CREATE TRIGGER trg_attendances_check_date
+    BEFORE INSERT OR UPDATE OF session_id, session_date ON public.attendances
+    FOR EACH ROW EXECUTE FUNCTION public.check_attendance_session_date();
+
+COMMIT;
@@ -0,0 +1,102 @@
+-- ============================
+-- PARTY VOTE COHESION: VOTACIONES PENDIENTES
+-- ============================
+-- Cualquier cambio que altere los conteos de party_vote_cohesion deja la
+-- votación en party_vote_cohesion_dirty, en la misma transacción que el
+-- cambio (como 011):
+--   law_project_vote_details  alta, corrección o borrado de un voto
+--                             (también vote_date, sincronizada por 012)
+--   party_membership          votaciones del diputado dentro del período
+--                             anterior y nuevo de la militancia
+-- app/jobs/party_cohesion.py borra la marca y las filas de la votación y
+-- las vuelve a insertar en una sola transacción.
+-- Tras aplicarla: python -m app.jobs.party_cohesion --all
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS public.party_vote_cohesion_dirty (
+    vote_id    INTEGER PRIMARY KEY,
+    marked_at  TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- ------------------------------------------------------------
+-- Votos
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.mark_cohesion_dirty_details() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO public.party_vote_cohesion_dirty (vote_id)
+        SELECT DISTINCT vote_id FROM new_rows WHERE vote_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+    -- Votos que cambian de votación o se borran: también la votación anterior
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO public.party_vote_cohesion_dirty (vote_id)
+        SELECT DISTINCT vote_id FROM old_rows WHERE vote_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ------------------------------------------------------------
+-- Militancias: [start_date, end_date) como en el período de 004
+-- ------------------------------------------------------------
+CREATE OR REPLACE FUNCTION public.mark_cohesion_dirty_membership() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO public.party_vote_cohesion_dirty (vote_id)
+        SELECT DISTINCT d.vote_id
+          FROM new_rows m
+          JOIN public.law_project_vote_details d
+            ON d.parliament_member_id = m.parliament_member_id
+           AND (m.start_date IS NULL OR d.vote_date >= m.start_date)
+           AND (m.end_date IS NULL OR d.vote_date < m.end_date)
+         WHERE d.vote_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO public.party_vote_cohesion_dirty (vote_id)
+        SELECT DISTINCT d.vote_id
+          FROM old_rows m
+          JOIN public.law_project_vote_details d
+            ON d.parliament_member_id = m.parliament_member_id
+           AND (m.start_date IS NULL OR d.vote_date >= m.start_date)
+           AND (m.end_date IS NULL OR d.vote_date < m.end_date)
+         WHERE d.vote_id IS NOT NULL
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t TEXT;
+    f TEXT;
+BEGIN
+    FOREACH t IN ARRAY ARRAY['law_project_vote_details', 'party_membership'] LOOP
+        f := CASE t WHEN 'party_membership' THEN 'mark_cohesion_dirty_membership'
+                    ELSE 'mark_cohesion_dirty_details' END;
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_cohesion_insert ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_cohesion_insert AFTER INSERT ON public.%I '
+            'REFERENCING NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.%I()', t, t, f);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_cohesion_update ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_cohesion_update AFTER UPDATE ON public.%I '
+            'REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.%I()', t, t, f);
+
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_cohesion_delete ON public.%I', t, t);
+        EXECUTE format(
+            'CREATE TRIGGER trg_%s_cohesion_delete AFTER DELETE ON public.%I '
+            'REFERENCING OLD TABLE AS old_rows '
+            'FOR EACH STATEMENT EXECUTE FUNCTION public.%I()', t, t, f);
+    END LOOP;
+END $$;
+
+COMMIT;
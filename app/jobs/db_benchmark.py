@@ -0,0 +1,169 @@
+# ============================
+# DB BENCHMARK JOB
+# ============================
+# Run: python -m app.jobs.db_benchmark [--modes psycopg2,psycopg,pipeline] [--requests 200] [--json]
+# Compara el tiempo de DB por request de las consultas calientes (detalle
+# de proyecto, perfil de diputado, cohesión de partido) entre:
+#   psycopg2  configuración actual (sync, sin preparar)
+#   psycopg   psycopg 3 con sentencias preparadas (DB_PREPARE_THRESHOLD)
+#   pipeline  psycopg 3 preparadas + pipeline (app/db/pipeline.py)
+# Cada request usa una sesión nueva del pool del modo; una pasada de
+# calentamiento deja las sentencias ya preparadas en las conexiones.
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.api.laws import build_law_project_detail
+from app.api.parliament import _profile_pipelined
+from app.api.parties import get_party_cohesion
+from app.core.config import settings
+from app.db.base import SessionLocal, engine_args
+from app.db.models import LawProjectAuthor, LawProjectVote, PartyVoteCohesion
+from app.services.reference import ReferenceSnapshot, load_reference_snapshot
+
+# modo -> (driver, pipeline)
+MODES = {
+    "psycopg2": ("psycopg2", False),
+    "psycopg": ("psycopg", False),
+    "pipeline": ("psycopg", True),
+}
+
+# ------------------------------------------------------------
+# Carga de Trabajo
+# ------------------------------------------------------------
+def _sample_ids(db: Session, size: int) -> Dict[str, List[int]]:
+    def top(column):
+        return [r[0] for r in db.execute(
+            select(column).group_by(column).order_by(func.count().desc(), column).limit(size)
+        ).all()]
+
+    return {
+        "law_detail": top(LawProjectVote.law_project_id),
+        "member_profile": top(LawProjectAuthor.parliament_member_id),
+        "party_cohesion": top(PartyVoteCohesion.party_id),
+    }
+
+
+def _workload(ref: ReferenceSnapshot) -> Dict[str, Callable[[Session, int], object]]:
+    return {
+        "law_detail": lambda db, id: build_law_project_detail(db, id, ref),
+        # Sin pipeline las tres consultas van en serie sobre la misma sesión
+        "member_profile": lambda db, id: _profile_pipelined(db, id, 10, 20, ref),
+        "party_cohesion": lambda db, id: get_party_cohesion(id, db, None, None, True, ref),
+    }
+
+# ------------------------------------------------------------
+# Medición
+# ------------------------------------------------------------
+def _run(make_session, fn, ids: List[int], requests: int) -> List[float]:
+    times = []
+    for i in range(requests):
+        db = make_session()
+        try:
+            started = time.perf_counter()
+            fn(db, ids[i % len(ids)])
+            times.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    return times
+
+
+def _stats(times: List[float]) -> Dict[str, float]:
+    ordered = sorted(times)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def _bench_mode(mode: str, ids: Dict[str, List[int]], ref: ReferenceSnapshot, requests: int) -> Dict:
+    driver, pipeline = MODES[mode]
+    url, connect_args = engine_args(driver)
+    engine = create_engine(url, pool_pre_ping=True, connect_args=connect_args)
+    make_session = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    pipelined = settings.db_pipeline
+    settings.db_pipeline = pipeline
+    try:
+        result = {}
+        for name, fn in _workload(ref).items():
+            if not ids[name]:
+                continue
+            _run(make_session, fn, ids[name], len(ids[name]) * max(1, settings.db_prepare_threshold))
+            result[name] = _stats(_run(make_session, fn, ids[name], requests))
+        return result
+    finally:
+        settings.db_pipeline = pipelined
+        engine.dispose()
+
+
+def benchmark(modes: List[str], requests: int = 200, sample: int = 50) -> Dict:
+    db = SessionLocal()
+    try:
+        ids = _sample_ids(db, sample)
+        ref = load_reference_snapshot(db)
+    finally:
+        db.close()
+
+    report: Dict[str, Dict] = {}
+    for mode in modes:
+        try:
+            report[mode] = _bench_mode(mode, ids, ref, requests)
+        except ImportError as e:
+            report[mode] = {"skipped": str(e)}
+
+    # Mejora relativa al primer modo medido
+    baseline = next((r for r in report.values() if "skipped" not in r), None)
+    for results in report.values():
+        if "skipped" in results or baseline is None:
+            continue
+        for name, stats in results.items():
+            if name in baseline:
+                stats["speedup_p50"] = round(baseline[name]["p50_ms"] / stats["p50_ms"], 2) if stats["p50_ms"] else None
+    return {"requests": requests, "sample": sample, "modes": report}
+
+
+def _print_report(report: Dict) -> None:
+    print(f"requests por endpoint: {report['requests']} (ids distintos: hasta {report['sample']})")
+    for mode, results in report["modes"].items():
+        print(f"{mode}:")
+        if "skipped" in results:
+            print(f"  omitido: {results['skipped']}")
+            continue
+        for name, s in results.items():
+            print(
+                f"  {name:<16} p50 {s['p50_ms']:>8.3f}ms  p95 {s['p95_ms']:>8.3f}ms  "
+                f"media {s['mean_ms']:>8.3f}ms  x{s.get('speedup_p50')}"
+            )
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de tiempo de DB por request según driver")
+    parser.add_argument("--modes", default="psycopg2,psycopg,pipeline", help="Modos a comparar, separados por coma")
+    parser.add_argument("--requests", type=int, default=200, help="Requests medidas por endpoint y modo")
+    parser.add_argument("--sample", type=int, default=50, help="Ids distintos por endpoint")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args(argv)
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"modos desconocidos: {', '.join(unknown)}")
+
+    report = benchmark(modes, args.requests, args.sample)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
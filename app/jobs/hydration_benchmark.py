@@ -0,0 +1,136 @@
+# ============================
+# HYDRATION BENCHMARK JOB
+# ============================
+# Run: python -m app.jobs.hydration_benchmark [--rows 10000] [--repeat 5] [--json]
+# Costo por cada 1k filas de leer y serializar una lista, ruta ORM
+# (entidades + identity map + from_attributes) contra la ruta Core de
+# app/db/projections.py (columnas del schema + validación desde el mapping).
+# Fases: fetch (consulta + filas/entidades), model (pydantic) y json.
+# Funciona con cualquier DB_URL que tenga las tablas (también SQLite).
+
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import lazyload
+
+from app.db.base import SessionLocal
+from app.db.models import LawProject, LawProjectVote, LegislativeSession
+from app.db.projections import list_adapter, projection, to_models
+from app.schemas.schemas import LawProjectSchema, LawProjectVoteSchema, LegislativeSessionSchema
+
+TARGETS = {
+    "law_projects": (LawProject, LawProjectSchema),
+    "law_project_votes": (LawProjectVote, LawProjectVoteSchema),
+    "legislative_sessions": (LegislativeSession, LegislativeSessionSchema),
+}
+
+# ------------------------------------------------------------
+# Rutas
+# ------------------------------------------------------------
+def _orm(model, schema: type, rows: int) -> Tuple[int, Dict[str, float]]:
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        # Como en las rutas: sin cargar relaciones
+        objs = db.query(model).options(lazyload("*")).limit(rows).all()
+        t1 = time.perf_counter()
+        models = [schema.model_validate(o) for o in objs]
+        t2 = time.perf_counter()
+        list_adapter(schema).dump_json(models)
+        t3 = time.perf_counter()
+    finally:
+        db.close()
+    return len(objs), {"fetch": t1 - t0, "model": t2 - t1, "json": t3 - t2}
+
+
+def _core(model, schema: type, rows: int) -> Tuple[int, Dict[str, float]]:
+    db = SessionLocal()
+    try:
+        t0 = time.perf_counter()
+        result = db.execute(projection(schema, model).limit(rows)).all()
+        t1 = time.perf_counter()
+        models = to_models(schema, result)
+        t2 = time.perf_counter()
+        list_adapter(schema).dump_json(models)
+        t3 = time.perf_counter()
+    finally:
+        db.close()
+    return len(result), {"fetch": t1 - t0, "model": t2 - t1, "json": t3 - t2}
+
+
+PATHS: Dict[str, Callable] = {"orm": _orm, "core": _core}
+
+# ------------------------------------------------------------
+# Medición
+# ------------------------------------------------------------
+def _per_1k(fn: Callable, model, schema, rows: int, repeat: int) -> Optional[Dict[str, float]]:
+    fn(model, schema, rows)  # calentamiento (conexión, caché de sentencias)
+    runs = [fn(model, schema, rows) for _ in range(repeat)]
+    n = runs[0][0]
+    if not n:
+        return None
+    phases = {
+        phase: round(statistics.median(r[1][phase] for r in runs) * 1000 * 1000 / n, 3)
+        for phase in ("fetch", "model", "json")
+    }
+    phases["total"] = round(sum(phases.values()), 3)
+    return phases
+
+
+def hydration_benchmark(rows: int = 10000, repeat: int = 5, targets: Optional[List[str]] = None) -> Dict:
+    report: Dict[str, Dict] = {}
+    for name in targets or list(TARGETS):
+        model, schema = TARGETS[name]
+        db = SessionLocal()
+        try:
+            available = db.execute(select(func.count()).select_from(model)).scalar() or 0
+        finally:
+            db.close()
+        result = {"rows": min(rows, available)}
+        for path, fn in PATHS.items():
+            result[path] = _per_1k(fn, model, schema, rows, repeat)
+        if result["orm"] and result["core"] and result["core"]["total"]:
+            result["speedup"] = round(result["orm"]["total"] / result["core"]["total"], 2)
+        report[name] = result
+    return {"repeat": repeat, "unit": "ms por 1k filas (mediana)", "targets": report}
+
+
+def _print_report(report: Dict) -> None:
+    print(f"{report['unit']}, {report['repeat']} repeticiones")
+    for name, r in report["targets"].items():
+        print(f"{name} ({r['rows']} filas):")
+        if not r["rows"]:
+            print("  sin filas")
+            continue
+        for path in PATHS:
+            p = r[path]
+            print(
+                f"  {path:<5} fetch {p['fetch']:>8.3f}  model {p['model']:>8.3f}  "
+                f"json {p['json']:>8.3f}  total {p['total']:>8.3f}"
+            )
+        print(f"  x{r.get('speedup')}")
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Costo de hidratación ORM vs proyección Core por 1k filas")
+    parser.add_argument("--rows", type=int, default=10000, help="Filas por lectura")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones (se reporta la mediana)")
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS), help="Tablas a medir (repetible)")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    args = parser.parse_args(argv)
+
+    report = hydration_benchmark(args.rows, args.repeat, args.target)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
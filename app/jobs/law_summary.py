@@ -0,0 +1,184 @@
+# ============================
+# LAW PROJECT SUMMARY JOB
+# ============================
+# Run: python -m app.jobs.law_summary [--all] [--ids 1 2 3]
+
+import argparse
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, func, select, literal_column
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+from sqlalchemy.orm import Session
+
+from app.db.base import SessionLocal
+from app.db.models import (
+    LawProject, LawProjectVote, LawProjectAuthor, LawProjectMatter, LawProjectMinistry, LawProjectSummary,
+    LawProjectSummaryDirty)
+
+BATCH_SIZE = 500
+
+# ------------------------------------------------------------
+# Proyectos Desactualizados
+# ------------------------------------------------------------
+# Sin fila de resumen o marcados por trigger al cambiar cualquier tabla de
+# origen (app/db/sql/011)
+def stale_law_project_ids(db: Session) -> List[int]:
+    missing = (
+        select(LawProject.id)
+        .outerjoin(LawProjectSummary, LawProjectSummary.law_project_id == LawProject.id)
+        .where(LawProjectSummary.law_project_id.is_(None))
+    )
+    dirty = select(LawProjectSummaryDirty.law_project_id)
+    return sorted(set(db.execute(missing).scalars()) | set(db.execute(dirty).scalars()))
+
+# ------------------------------------------------------------
+# Upsert del Resumen
+# ------------------------------------------------------------
+def _summary_select(project_ids: Optional[List[int]]):
+    latest = (
+        select(
+            LawProjectVote.law_project_id,
+            LawProjectVote.id,
+            LawProjectVote.date,
+            LawProjectVote.result,
+            LawProjectVote.total_yes,
+            LawProjectVote.total_no,
+            LawProjectVote.total_abstention,
+            LawProjectVote.total_excused,
+        )
+        .distinct(LawProjectVote.law_project_id)
+        .order_by(LawProjectVote.law_project_id, LawProjectVote.date.desc(), LawProjectVote.id.desc())
+    )
+    votes_count = (
+        select(LawProjectVote.law_project_id, func.count(LawProjectVote.id).label("n"))
+        .group_by(LawProjectVote.law_project_id)
+    )
+    authors = (
+        select(LawProjectAuthor.law_project_id, func.count(LawProjectAuthor.id).label("n"))
+        .group_by(LawProjectAuthor.law_project_id)
+    )
+    matters = (
+        select(
+            LawProjectMatter.law_project_id,
+            func.array_agg(aggregate_order_by(LawProjectMatter.matter_id, LawProjectMatter.matter_id)).label("ids"),
+        )
+        .group_by(LawProjectMatter.law_project_id)
+    )
+    ministries = (
+        select(
+            LawProjectMinistry.law_project_id,
+            func.array_agg(aggregate_order_by(LawProjectMinistry.ministry_id, LawProjectMinistry.ministry_id)).label("ids"),
+        )
+        .group_by(LawProjectMinistry.law_project_id)
+    )
+
+    if project_ids is not None:
+        latest = latest.where(LawProjectVote.law_project_id.in_(project_ids))
+        votes_count = votes_count.where(LawProjectVote.law_project_id.in_(project_ids))
+        authors = authors.where(LawProjectAuthor.law_project_id.in_(project_ids))
+        matters = matters.where(LawProjectMatter.law_project_id.in_(project_ids))
+        ministries = ministries.where(LawProjectMinistry.law_project_id.in_(project_ids))
+
+    lv = latest.subquery("lv")
+    vc = votes_count.subquery("vc")
+    ac = authors.subquery("ac")
+    mt = matters.subquery("mt")
+    mn = ministries.subquery("mn")
+    empty = literal_column("'{}'::integer[]")
+
+    stmt = (
+        select(
+            LawProject.id,
+            LawProject.entry_date,
+            lv.c.id,
+            lv.c.date,
+            lv.c.result,
+            func.coalesce(lv.c.total_yes, 0),
+            func.coalesce(lv.c.total_no, 0),
+            func.coalesce(lv.c.total_abstention, 0),
+            func.coalesce(lv.c.total_excused, 0),
+            func.coalesce(vc.c.n, 0),
+            func.coalesce(ac.c.n, 0),
+            func.coalesce(mt.c.ids, empty),
+            func.coalesce(mn.c.ids, empty),
+        )
+        .outerjoin(lv, lv.c.law_project_id == LawProject.id)
+        .outerjoin(vc, vc.c.law_project_id == LawProject.id)
+        .outerjoin(ac, ac.c.law_project_id == LawProject.id)
+        .outerjoin(mt, mt.c.law_project_id == LawProject.id)
+        .outerjoin(mn, mn.c.law_project_id == LawProject.id)
+    )
+    if project_ids is not None:
+        stmt = stmt.where(LawProject.id.in_(project_ids))
+    return stmt
+
+
+SUMMARY_COLUMNS = [
+    "law_project_id",
+    "entry_date",
+    "latest_vote_id",
+    "latest_vote_date",
+    "latest_vote_result",
+    "total_yes",
+    "total_no",
+    "total_abstention",
+    "total_excused",
+    "votes_count",
+    "authors_count",
+    "matter_ids",
+    "ministry_ids",
+]
+
+
+def refresh_law_project_summary(db: Session, project_ids: Optional[Iterable[int]] = None) -> int:
+    ids = None if project_ids is None else sorted(set(project_ids))
+    if ids is not None and not ids:
+        return 0
+
+    batches = [None] if ids is None else [ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
+    refreshed = 0
+    for batch in batches:
+        # La marca se borra antes de leer el origen: un cambio que confirme
+        # después vuelve a marcar el proyecto
+        clear = delete(LawProjectSummaryDirty)
+        if batch is not None:
+            clear = clear.where(LawProjectSummaryDirty.law_project_id.in_(batch))
+        db.execute(clear)
+
+        stmt = insert(LawProjectSummary).from_select(SUMMARY_COLUMNS, _summary_select(batch))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LawProjectSummary.law_project_id],
+            set_={
+                **{c: getattr(stmt.excluded, c) for c in SUMMARY_COLUMNS[1:]},
+                "refreshed_at": func.now(),
+            },
+        )
+        refreshed += db.execute(stmt).rowcount or 0
+    db.commit()
+    return refreshed
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Actualiza law_project_summary")
+    parser.add_argument("--all", action="store_true", help="Reconstruye todos los proyectos")
+    parser.add_argument("--ids", type=int, nargs="*", help="Proyectos a refrescar")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.all:
+            ids = None
+        elif args.ids:
+            ids = args.ids
+        else:
+            ids = stale_law_project_ids(db)
+        n = refresh_law_project_summary(db, ids)
+        print(f"law_project_summary: {n} filas actualizadas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# ============================
+# PARTITIONS JOB
+# ============================
+# Run: python -m app.jobs.partitions [--years 4]
+# Crea las particiones por período legislativo que falten (app/db/sql/007)
+# y les traspasa las filas de su rango que estaban en DEFAULT (013).
+
+import argparse
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.base import SessionLocal
+
+# Tabla particionada -> columna de partición
+PARTITIONED_TABLES = {
+    "law_project_vote_details": "vote_date",
+    "attendances": "session_date",
+}
+
+# ------------------------------------------------------------
+# Particiones Futuras
+# ------------------------------------------------------------
+def ensure_partitions(db: Session, years: int = 4) -> Dict[str, int]:
+    now = func.localtimestamp()
+    upto = now + func.make_interval(years)
+    created = {
+        table: db.execute(select(func.public.ensure_legislative_partitions(table, now, upto))).scalar() or 0
+        for table in PARTITIONED_TABLES
+    }
+    db.commit()
+    return created
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Crea particiones por período legislativo")
+    parser.add_argument("--years", type=int, default=4, help="Horizonte hacia adelante (años)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        for table, n in ensure_partitions(db, args.years).items():
+            print(f"{table}: {n} particiones creadas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# ============================
+# PARTY COHESION JOB
+# ============================
+# Run: python -m app.jobs.party_cohesion [--all] [--ids 1 2 3]
+
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.analytics.voting import ABSTENTION, NO, YES
+from app.db.base import SessionLocal
+from app.db.models import (
+    LawProjectVote, LawProjectVoteDetail, PartyMembership, PartyVoteCohesion, PartyVoteCohesionDirty, VoteOption)
+
+BATCH_SIZE = 1000
+
+# ------------------------------------------------------------
+# Votaciones Desactualizadas
+# ------------------------------------------------------------
+# Marcadas por trigger al cambiar votos o militancias (app/db/sql/014)
+def stale_vote_ids(db: Session) -> List[int]:
+    dirty = select(PartyVoteCohesionDirty.vote_id).order_by(PartyVoteCohesionDirty.vote_id)
+    return list(db.execute(dirty).scalars())
+
+# ------------------------------------------------------------
+# Conteos por Votación y Partido (militancia a la fecha del voto)
+# ------------------------------------------------------------
+def _option_counts(db: Session, vote_ids: Optional[List[int]]):
+    # Resuelto con el índice GiST (parliament_member_id, period) de la restricción de exclusión
+    membership_at_vote = and_(
+        PartyMembership.parliament_member_id == LawProjectVoteDetail.parliament_member_id,
+        PartyMembership.period.contains(func.timezone("UTC", LawProjectVote.date)),
+    )
+    stmt = (
+        select(
+            LawProjectVote.id,
+            LawProjectVote.date,
+            PartyMembership.party_id,
+            VoteOption.kind,
+            func.count(),
+        )
+        .select_from(LawProjectVoteDetail)
+        .join(
+            LawProjectVote,
+            and_(
+                LawProjectVote.id == LawProjectVoteDetail.vote_id,
+                LawProjectVote.date == LawProjectVoteDetail.vote_date,
+            ),
+        )
+        .join(VoteOption, VoteOption.id == LawProjectVoteDetail.vote_option_id)
+        .join(PartyMembership, membership_at_vote)
+        .group_by(LawProjectVote.id, LawProjectVote.date, PartyMembership.party_id, VoteOption.kind)
+    )
+    if vote_ids is not None:
+        # Rango de fechas del lote: poda las particiones de otros períodos
+        first, last = db.execute(
+            select(func.min(LawProjectVote.date), func.max(LawProjectVote.date))
+            .where(LawProjectVote.id.in_(vote_ids))
+        ).one()
+        if first is None:
+            return []
+        stmt = stmt.where(
+            LawProjectVoteDetail.vote_id.in_(vote_ids),
+            LawProjectVoteDetail.vote_date.between(first, last),
+        )
+    return db.execute(stmt.execution_options(yield_per=10_000))
+
+
+def cohesion_row(party_id: int, vote_id: int, vote_date, counts: Dict[int, int]) -> Dict:
+    yes, no, abst = counts.get(YES, 0), counts.get(NO, 0), counts.get(ABSTENTION, 0)
+    members = yes + no + abst
+    return {
+        "party_id": party_id,
+        "vote_id": vote_id,
+        "vote_date": vote_date,
+        "members": members,
+        "yes": yes,
+        "no": no,
+        "abstention": abst,
+        "rice_index": abs(yes - no) / (yes + no) if yes + no else None,
+        "majority_share": max(yes, no, abst) / members if members else None,
+    }
+
+
+def _upsert(db: Session, rows: List[Dict]) -> None:
+    if not rows:
+        return
+    stmt = insert(PartyVoteCohesion).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[PartyVoteCohesion.party_id, PartyVoteCohesion.vote_id],
+        set_={c: getattr(stmt.excluded, c) for c in rows[0] if c not in ("party_id", "vote_id")},
+    )
+    db.execute(stmt)
+
+# ------------------------------------------------------------
+# Refresco por Votación
+# ------------------------------------------------------------
+def _refresh_batch(db: Session, vote_ids: Optional[List[int]]) -> int:
+    # La marca se borra antes de leer el origen: un cambio que confirme
+    # después vuelve a marcar la votación
+    clear = delete(PartyVoteCohesionDirty)
+    stale = delete(PartyVoteCohesion)
+    if vote_ids is not None:
+        clear = clear.where(PartyVoteCohesionDirty.vote_id.in_(vote_ids))
+        stale = stale.where(PartyVoteCohesion.vote_id.in_(vote_ids))
+    db.execute(clear)
+    # Borrar y reinsertar: un partido sin votos restantes no deja fila
+    db.execute(stale)
+
+    groups: Dict[Tuple[int, int], Tuple[object, Dict[int, int]]] = {}
+    for vote_id, vote_date, party_id, kind, n in _option_counts(db, vote_ids):
+        _, counts = groups.setdefault((vote_id, party_id), (vote_date, {}))
+        counts[kind] = counts.get(kind, 0) + n
+
+    rows = [
+        cohesion_row(party_id, vote_id, vote_date, counts)
+        for (vote_id, party_id), (vote_date, counts) in groups.items()
+    ]
+    for i in range(0, len(rows), BATCH_SIZE):
+        _upsert(db, rows[i:i + BATCH_SIZE])
+    return len(rows)
+
+
+def refresh_party_cohesion(db: Session, vote_ids: Optional[Iterable[int]] = None) -> int:
+    ids = None if vote_ids is None else sorted(set(vote_ids))
+    if ids is not None and not ids:
+        return 0
+
+    batches = [None] if ids is None else [ids[i:i + BATCH_SIZE] for i in range(0, len(ids), BATCH_SIZE)]
+    refreshed = sum(_refresh_batch(db, batch) for batch in batches)
+    db.commit()
+    return refreshed
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Actualiza party_vote_cohesion")
+    parser.add_argument("--all", action="store_true", help="Recalcula todas las votaciones")
+    parser.add_argument("--ids", type=int, nargs="*", help="Votaciones a refrescar")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.all:
+            ids = None
+        elif args.ids:
+            ids = args.ids
+        else:
+            ids = stale_vote_ids(db)
+        n = refresh_party_cohesion(db, ids)
+        print(f"party_vote_cohesion: {n} filas actualizadas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# ============================
+# STARTUP PROFILE JOB
+# ============================
+# Run: python -m app.jobs.startup_profile [--runs 3] [--path /api/health] [--top 15] [--json]
+# Mide el arranque en procesos nuevos: tiempo de import por módulo
+# (-X importtime), fases del lifespan (app/core/startup.py) y latencia de
+# las primeras requests, hasta el primer request servido.
+# Sin imports de app.* a nivel de módulo: el proceso hijo mide desde cero.
+
+import argparse
+import asyncio
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# ------------------------------------------------------------
+# Proceso Hijo
+# ------------------------------------------------------------
+async def _asgi_get(app, path: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"startup-profile")],
+        "client": None,
+        "server": ("startup-profile", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def _child(paths: List[str]) -> None:
+    started = time.perf_counter()
+    from app.main import app
+    from app.core.startup import startup_profile
+
+    imported = time.perf_counter()
+
+    async def run() -> Dict:
+        requests = []
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            for path in paths:
+                t = time.perf_counter()
+                status = await _asgi_get(app, path)
+                requests.append({"path": path, "status": status, "seconds": time.perf_counter() - t})
+            first_served = time.perf_counter()
+        return {
+            "import_seconds": imported - started,
+            "lifespan_seconds": ready - imported,
+            "first_request_seconds": first_served - started,
+            "phases": startup_profile.report()["phases"],
+            "requests": requests,
+        }
+
+    print(json.dumps(asyncio.run(run())))
+
+# ------------------------------------------------------------
+# Proceso Padre
+# ------------------------------------------------------------
+def _parse_importtime(stderr: str) -> List[Tuple[str, int]]:
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(self_us)))
+    return modules
+
+
+def _run_once(paths: List[str]) -> Tuple[Dict, List[Tuple[str, int]], float]:
+    cmd = [sys.executable, "-X", "importtime", "-m", "app.jobs.startup_profile", "--child"]
+    for p in paths:
+        cmd += ["--path", p]
+    started = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result, _parse_importtime(proc.stderr), wall
+
+
+def _group(name: str) -> str:
+    parts = name.split(".")
+    # app.* por submódulo; el resto por paquete
+    return ".".join(parts[:3]) if parts[0] == "app" else parts[0]
+
+
+def profile_startup(paths: List[str], runs: int = 3, top: int = 15) -> Dict:
+    results, modules, walls = [], [], []
+    for _ in range(runs):
+        result, mods, wall = _run_once(paths)
+        results.append(result)
+        modules.append(mods)
+        walls.append(wall)
+
+    groups: Dict[str, List[int]] = {}
+    for mods in modules:
+        per_run: Dict[str, int] = {}
+        for name, us in mods:
+            per_run[_group(name)] = per_run.get(_group(name), 0) + us
+        for g, us in per_run.items():
+            groups.setdefault(g, []).append(us)
+
+    def median(key: str) -> float:
+        return round(statistics.median(r[key] for r in results), 4)
+
+    return {
+        "runs": runs,
+        "process_seconds": round(statistics.median(walls), 4),
+        "import_seconds": median("import_seconds"),
+        "lifespan_seconds": median("lifespan_seconds"),
+        "first_request_seconds": median("first_request_seconds"),
+        "phases": {
+            name: round(statistics.median(r["phases"].get(name, 0.0) for r in results), 4)
+            for name in results[0]["phases"]
+        },
+        "requests": [
+            {
+                "path": req["path"],
+                "status": req["status"],
+                "seconds": round(statistics.median(r["requests"][i]["seconds"] for r in results), 4),
+            }
+            for i, req in enumerate(results[0]["requests"])
+        ],
+        "imports": [
+            {"module": g, "seconds": round(statistics.median(us) / 1e6, 4)}
+            for g, us in sorted(groups.items(), key=lambda kv: -statistics.median(kv[1]))[:top]
+        ],
+    }
+
+
+def _print_report(report: Dict) -> None:
+    print(f"runs: {report['runs']} (medianas)")
+    print(f"proceso completo:       {report['process_seconds']:.3f}s")
+    print(f"import app.main:        {report['import_seconds']:.3f}s")
+    print(f"lifespan (hasta listo): {report['lifespan_seconds']:.3f}s")
+    print(f"primer request servido: {report['first_request_seconds']:.3f}s")
+    print("fases:")
+    for name, s in report["phases"].items():
+        print(f"  {name:<22}{s:.3f}s")
+    print("requests:")
+    for r in report["requests"]:
+        print(f"  {r['path']:<30}{r['status']}  {r['seconds']:.4f}s")
+    print("imports (self, por paquete):")
+    for m in report["imports"]:
+        print(f"  {m['module']:<40}{m['seconds']:.3f}s")
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Perfil de arranque de la API")
+    parser.add_argument("--path", action="append", help="Requests a medir tras el arranque (repetible)")
+    parser.add_argument("--runs", type=int, default=3, help="Procesos a medir (se reporta la mediana)")
+    parser.add_argument("--top", type=int, default=15, help="Paquetes más lentos de importar")
+    parser.add_argument("--json", action="store_true", help="Salida en JSON")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    paths = args.path or ["/api/health"]
+
+    if args.child:
+        _child(paths)
+        return
+
+    report = profile_startup(paths, args.runs, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
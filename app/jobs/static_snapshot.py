@@ -0,0 +1,267 @@
+# ============================
+# STATIC SNAPSHOT JOB
+# ============================
+# Run: python -m app.jobs.static_snapshot --out ./static [--workers 4] [--full]
+# Renderiza las respuestas deterministas de la API (partidos, diputados,
+# territorio, sesiones y detalle de proyectos) a un árbol de JSON con
+# variantes comprimidas y un manifest.json (ver app/core/static_snapshot.py).
+# Cada documento lleva la versión de sus filas de origen (change_seq,
+# app/db/sql/008); solo se vuelven a renderizar los que cambiaron.
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.compression import ENCODERS
+from app.core.config import settings
+from app.core.static_snapshot import BYPASS_SCOPE_KEY, MANIFEST, load_manifest, snapshot_file
+from app.db.base import SessionLocal, get_engine
+from app.db.models import (
+    Attendance, District, LawProject, LawProjectAuthor, LawProjectMatter, LawProjectMinistry, LawProjectVote,
+    LawProjectVoteDetail, LegislativeSession, ParliamentMember, Party)
+from app.services.reference import current_version
+
+BATCH_SIZE = 200
+EXTENSIONS = {"gzip": ".gz", "br": ".br", "zstd": ".zst"}
+
+# ------------------------------------------------------------
+# Versión de Origen por Documento
+# ------------------------------------------------------------
+def _grouped(db: Session, key, seq) -> Dict[int, str]:
+    # max(change_seq) + count: un borrado también cambia la versión
+    rows = db.execute(select(key, func.max(seq), func.count()).group_by(key)).all()
+    return {k: f"{m}.{n}" for k, m, n in rows}
+
+
+def document_versions(db: Session) -> Dict[str, str]:
+    p = settings.api_prefix
+    ref = f"r{current_version(db)}"
+    # Las militancias "actuales" dependen también del día
+    ref_today = f"{ref}:{date.today().isoformat()}"
+    docs: Dict[str, str] = {}
+
+    docs[f"{p}/parliament/"] = ref
+    for m in db.execute(select(ParliamentMember.id)).scalars():
+        docs[f"{p}/parliament/{m}"] = ref
+        docs[f"{p}/parliament/{m}/parties"] = ref
+        docs[f"{p}/parliament/{m}/party"] = ref_today
+
+    docs[f"{p}/parties/"] = ref
+    for party in db.execute(select(Party.id)).scalars():
+        docs[f"{p}/parties/{party}"] = ref_today
+        docs[f"{p}/parties/{party}/members"] = ref_today
+
+    docs[f"{p}/territory/districts"] = ref
+    docs[f"{p}/territory/communes"] = ref
+    for d in db.execute(select(District.id)).scalars():
+        docs[f"{p}/territory/districts/{d}"] = ref
+
+    sessions = db.execute(select(LegislativeSession.id, LegislativeSession.change_seq)).all()
+    attendances = _grouped(db, Attendance.session_id, Attendance.change_seq)
+    docs[f"{p}/sessions/"] = "s%s.%s" % (max((s for _, s in sessions), default=0), len(sessions))
+    for s, seq in sessions:
+        docs[f"{p}/sessions/{s}"] = f"s{seq}"
+        docs[f"{p}/sessions/{s}/attendances"] = f"{ref}:s{seq}:a{attendances.get(s, '0')}"
+
+    laws = db.execute(select(LawProject.id, LawProject.change_seq)).all()
+    children = [
+        _grouped(db, LawProjectVote.law_project_id, LawProjectVote.change_seq),
+        _vote_detail_versions(db),
+        _grouped(db, LawProjectMatter.law_project_id, LawProjectMatter.change_seq),
+        _grouped(db, LawProjectMinistry.law_project_id, LawProjectMinistry.change_seq),
+        _grouped(db, LawProjectAuthor.law_project_id, LawProjectAuthor.change_seq),
+    ]
+    for law, seq in laws:
+        docs[f"{p}/laws/{law}/detail"] = ":".join([ref, f"l{seq}"] + [c.get(law, "0") for c in children])
+
+    return docs
+
+
+def _vote_detail_versions(db: Session) -> Dict[int, str]:
+    rows = db.execute(
+        select(LawProjectVote.law_project_id, func.max(LawProjectVoteDetail.change_seq), func.count())
+        .join(LawProjectVote, LawProjectVote.id == LawProjectVoteDetail.vote_id)
+        .group_by(LawProjectVote.law_project_id)
+    ).all()
+    return {k: f"{m}.{n}" for k, m, n in rows}
+
+# ------------------------------------------------------------
+# Render (proceso hijo): la app se llama como ASGI, sin HTTP
+# ------------------------------------------------------------
+_app = None
+
+
+def _init_worker() -> None:
+    global _app
+    from app.main import app
+    from app.services.reference import refresh_reference
+
+    # Con fork el hijo hereda las conexiones del pool del padre: se descartan
+    # sin cerrarlas (siguen siendo del padre) y el hijo abre las suyas
+    get_engine().dispose(close=False)
+    refresh_reference(True)
+    _app = app
+
+
+async def _get(path: str) -> Tuple[int, bytes]:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"static-snapshot"), (b"accept-encoding", b"identity")],
+        "client": None,
+        "server": ("static-snapshot", 80),
+        BYPASS_SCOPE_KEY: True,
+    }
+    status = 500
+    chunks: List[bytes] = []
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        # Un solo mensaje de request; después el "cliente" sigue conectado hasta
+        # el final del cuerpo (StreamingResponse escucha la desconexión)
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    await _app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+def _write(path: str, data: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _render_batch(out: str, batch: List[Tuple[str, str]]) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+    async def run():
+        results = []
+        for path, version in batch:
+            status, body = await _get(path)
+            if status != 200:
+                results.append((path, None))
+                continue
+
+            file = snapshot_file(path)
+            _write(os.path.join(out, file), body)
+            encodings = {}
+            for name, encoder in ENCODERS.items():
+                variant = file + EXTENSIONS[name]
+                _write(os.path.join(out, variant), encoder.compress(body))
+                encodings[name] = variant
+
+            results.append((path, {
+                "file": file,
+                "version": version,
+                "etag": 'W/"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest(),
+                "bytes": len(body),
+                "encodings": encodings,
+            }))
+        return results
+
+    return asyncio.run(run())
+
+
+def _remove(out: str, entry: Dict[str, Any]) -> None:
+    for file in [entry["file"], *entry.get("encodings", {}).values()]:
+        try:
+            os.remove(os.path.join(out, file))
+        except FileNotFoundError:
+            pass
+
+# ------------------------------------------------------------
+# Snapshot Incremental
+# ------------------------------------------------------------
+def build_static_snapshot(out: str, workers: int = 4, full: bool = False) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        versions = document_versions(db)
+    finally:
+        db.close()
+
+    documents: Dict[str, Dict[str, Any]] = {} if full else load_manifest(out).get("documents", {})
+    stale = [
+        (path, version) for path, version in versions.items()
+        if documents.get(path, {}).get("version") != version
+        or not os.path.exists(os.path.join(out, documents[path]["file"]))
+    ]
+    removed = [path for path in documents if path not in versions]
+    for path in removed:
+        _remove(out, documents.pop(path))
+
+    rendered = skipped = 0
+    batches = [stale[i:i + BATCH_SIZE] for i in range(0, len(stale), BATCH_SIZE)]
+    if batches:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for results in pool.map(_render_batch, [out] * len(batches), batches):
+                for path, entry in results:
+                    if entry is None:
+                        old = documents.pop(path, None)
+                        if old is not None:
+                            _remove(out, old)
+                        skipped += 1
+                    else:
+                        documents[path] = entry
+                        rendered += 1
+
+    manifest = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "documents": dict(sorted(documents.items())),
+    }
+    _write(os.path.join(out, MANIFEST), json.dumps(manifest, separators=(",", ":")).encode())
+    return {
+        "documents": len(documents),
+        "rendered": rendered,
+        "unchanged": len(versions) - len(stale),
+        "skipped": skipped,
+        "removed": len(removed),
+    }
+
+# ------------------------------------------------------------
+# CLI
+# ------------------------------------------------------------
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Genera el snapshot estático de la API")
+    parser.add_argument("--out", default=settings.static_snapshot_dir, help="Directorio de salida")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos de render")
+    parser.add_argument("--full", action="store_true", help="Ignora el manifest y renderiza todo")
+    args = parser.parse_args(argv)
+    if not args.out:
+        parser.error("--out (o STATIC_SNAPSHOT_DIR) es obligatorio")
+
+    stats = build_static_snapshot(args.out, args.workers, args.full)
+    print("static snapshot: " + ", ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,138 @@
 # Run: uvicorn app.main:app --reload
 # Docs: http://localhost:8000/docs
 
-from fastapi import FastAPI
+import time
+
+# Inicio del import de la app (perfil de arranque)
+_import_started = time.perf_counter()
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.exc import DBAPIError
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import settings
-from app.api import parliament, parties, sessions, territory, laws
+from app.core.admission import (
+    DeadlineExceeded, admission, db_admission, deadline_exceeded_handler, statement_timeout_handler)
+from app.core.compression import CompressionMiddleware
+from app.core.profiling import ProfilingMiddleware
+from app.core.static_snapshot import StaticSnapshotMiddleware
+from app.core.startup import run_warmups, startup_profile, warmup
+from app.api import parliament, parties, sessions, territory, laws, analytics, changes, live, search, admin
+from app.db.base import SessionLocal, get_engine, prefill_pool
+from app.services.law_facets import law_facet_cache
+from app.services.live import live_broker
+from app.services.reference import refresh_reference, poll_reference
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------
+# Warm-ups (WARMUP_TASKS, en paralelo tras el arranque)
+# ------------------------------------------------------------
+def _with_session(fn):
+    def run():
+        db = SessionLocal()
+        try:
+            return fn(db)
+        finally:
+            db.close()
+    return run
+
+
+# Los módulos de analytics se importan al correr el warm-up (o en la primera
+# request de /analytics), no al importar la app
+def _similarity(db):
+    from app.analytics.voting import similarity_cache
+    return similarity_cache.matrix(db)
+
+
+def _coauthorship(db):
+    from app.analytics.coauthorship import coauthorship_cache
+    return coauthorship_cache.rows(db)
+
+
+warmup("pool")(lambda: prefill_pool(settings.warmup_pool_connections))
+warmup("law_facets")(_with_session(law_facet_cache.index))
+warmup("similarity")(_with_session(_similarity))
+warmup("coauthorship")(_with_session(_coauthorship))
+
+# ------------------------------------------------------------
+# Ciclo de Vida: Engine + Snapshot de Referencia + Listener Live
+# ------------------------------------------------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with startup_profile.phase("engine"):
+        await run_in_threadpool(get_engine)
+
+    # El pool y las cachés se llenan mientras se carga el snapshot
+    warmups = asyncio.create_task(run_warmups(settings.warmup_tasks_list))
+
+    async with startup_profile.phase("reference"):
+        try:
+            await run_in_threadpool(refresh_reference, True)
+        except Exception:
+            logger.exception("Initial reference snapshot failed; retrying in background")
+
+    poller = asyncio.create_task(poll_reference(settings.reference_poll_seconds))
+    if settings.live_enabled:
+        live_broker.start(asyncio.get_running_loop())
+
+    app.state.startup = startup_profile
+    logger.info("Startup: %s", startup_profile.report()["phases"])
+    try:
+        yield
+    finally:
+        warmups.cancel()
+        poller.cancel()
+        live_broker.stop()
 
 # ------------------------------------------------------------
 # Inicialización de la App
 # ------------------------------------------------------------
-app = FastAPI(title="VotaBien API", version="0.1.0")
+app = FastAPI(title="VotaBien API", version="0.1.0", lifespan=lifespan)
+
+# ------------------------------------------------------------
+# Compresión (gzip / br / zstd) + ETag
+# ------------------------------------------------------------
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_min_size,
+    cache_bytes=settings.compression_cache_mb * 1024 * 1024,
+)
+
+# ------------------------------------------------------------
+# Snapshot Estático (app/jobs/static_snapshot.py)
+# ------------------------------------------------------------
+if settings.static_snapshot_dir:
+    app.add_middleware(
+        StaticSnapshotMiddleware,
+        root=settings.static_snapshot_dir,
+        mode=settings.static_snapshot_mode,
+        base_url=settings.static_snapshot_base_url,
+    )
+
+# ------------------------------------------------------------
+# Profiling bajo Demanda (header firmado o muestreo)
+# ------------------------------------------------------------
+if settings.profile_secret or settings.profile_sample_rate > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        secret=settings.profile_secret,
+        sample_rate=settings.profile_sample_rate,
+        interval_ms=settings.profile_interval_ms,
+        max_seconds=settings.profile_max_seconds,
+    )
 
 # ------------------------------------------------------------
 # Configuración de CORS
 # ------------------------------------------------------------
+# Se registra al final: el último middleware envuelve a los demás, así las
+# respuestas del snapshot estático y del profiler también llevan CORS
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
@@ -26,18 +144,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ------------------------------------------------------------
+# Deadlines / Load Shedding (503 + Retry-After)
+# ------------------------------------------------------------
+app.add_exception_handler(DeadlineExceeded, deadline_exceeded_handler)
+app.add_exception_handler(DBAPIError, statement_timeout_handler)
+
 # ------------------------------------------------------------
 # Routers
 # ------------------------------------------------------------
+# Routers y schemas se importan aquí: FastAPI construye el validador de cada
+# response_model al registrar la ruta (defer_build solo movería ese costo).
+# Routers con DB: admisión + statement_timeout. parliament y parties se
+# sirven del snapshot en memoria; sus rutas con DB llevan la admisión propia
+admitted = [Depends(db_admission)]
+
 app.include_router(parliament.router, prefix=settings.api_prefix)
 app.include_router(parties.router, prefix=settings.api_prefix)
-app.include_router(sessions.router, prefix=settings.api_prefix)
+app.include_router(sessions.router, prefix=settings.api_prefix, dependencies=admitted)
 app.include_router(territory.router, prefix=settings.api_prefix)
-app.include_router(laws.router, prefix=settings.api_prefix)
+app.include_router(laws.router, prefix=settings.api_prefix, dependencies=admitted)
+app.include_router(analytics.router, prefix=settings.api_prefix, dependencies=admitted)
+app.include_router(changes.router, prefix=settings.api_prefix, dependencies=admitted)
+app.include_router(live.router, prefix=settings.api_prefix)
+app.include_router(search.router, prefix=settings.api_prefix)
+app.include_router(admin.router, prefix=settings.api_prefix)
 
 # ------------------------------------------------------------
 # Endpoint de Health Check
 # ------------------------------------------------------------
 @app.get(settings.api_prefix + "/health")
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+# ------------------------------------------------------------
+# Métricas (formato Prometheus)
+# ------------------------------------------------------------
+@app.get(settings.api_prefix + "/metrics", response_class=PlainTextResponse)
+def metrics():
+    return admission.metrics.render(admission)
+
+
+startup_profile.record("import", time.perf_counter() - _import_started)
@@ -4,7 +4,7 @@
 
 from pydantic import BaseModel, ConfigDict
 from datetime import date, datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 from math import ceil
 
 # ------------------------------------------------------------
@@ -90,6 +90,50 @@ class MemberWithAllPartiesSchema(BaseModel):
 class PartyWithMembersSchema(PartySchema):
     members: List[MemberWithMembershipSchema]
 
+# ------------------------------------------------------------
+# Cohesión de Partido
+# ------------------------------------------------------------
+class PartyVoteCohesionSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    vote_id: int
+    vote_date: datetime
+    members: int
+    yes: int
+    no: int
+    abstention: int
+    rice_index: Optional[float] = None
+    majority_share: Optional[float] = None
+
+
+class PartyCohesionMonthSchema(BaseModel):
+    month: date
+    votes: int
+    rice_index: Optional[float] = None
+    majority_share: Optional[float] = None
+
+
+class PartyCohesionSchema(BaseModel):
+    party_id: int
+    months: List[PartyCohesionMonthSchema]
+    votes: List[PartyVoteCohesionSchema]
+
+# ------------------------------------------------------------
+# Composición de la Cámara
+# ------------------------------------------------------------
+class PartySeatsSchema(BaseModel):
+    party_id: int
+    name: Optional[str] = None
+    abbreviation: Optional[str] = None
+    seats: List[int]
+
+
+class ChamberCompositionSchema(BaseModel):
+    step: str
+    dates: List[date]
+    total: List[int]
+    parties: List[PartySeatsSchema]
+
 # ------------------------------------------------------------
 # Attendance
 # ------------------------------------------------------------
@@ -121,6 +165,25 @@ class LegislativeSessionSchema(BaseModel):
     session_type: str
     session_status: str
 
+# ------------------------------------------------------------
+# Matriz de Asistencia (heatmap)
+# ------------------------------------------------------------
+class AttendanceMatrixCodeSchema(BaseModel):
+    code: int
+    attendance_type_id: int
+    label: str
+    is_present: bool
+
+
+class AttendanceMatrixSchema(BaseModel):
+    member_ids: List[int]
+    session_ids: List[int]
+    session_dates: List[datetime]
+    shape: List[int]
+    encoding: Literal["nibble", "rle"]
+    legend: List[AttendanceMatrixCodeSchema]
+    data: str
+
 # ------------------------------------------------------------
 # Esquemas Compuestos: Sesión con Asistencias
 # ------------------------------------------------------------
@@ -244,12 +307,59 @@ class LawProjectMinistrySchema(BaseModel):
     ministry_id: int
 
 
+class LawProjectSummarySchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    latest_vote_id: Optional[int] = None
+    latest_vote_date: Optional[datetime] = None
+    latest_vote_result: Optional[str] = None
+
+    total_yes: int
+    total_no: int
+    total_abstention: int
+    total_excused: int
+
+    votes_count: int
+    authors_count: int
+    matter_ids: List[int]
+    ministry_ids: List[int]
+
+
+class LawProjectWithSummarySchema(LawProjectSchema):
+    summary: Optional[LawProjectSummarySchema]
+
+
+class FacetValueSchema(BaseModel):
+    value: Union[int, str]
+    label: Optional[str] = None
+    count: int
+
+
+class LawFacetsSchema(BaseModel):
+    matters: List[FacetValueSchema]
+    ministries: List[FacetValueSchema]
+    initiative_types: List[FacetValueSchema]
+    years: List[FacetValueSchema]
+
+
 class PaginatedLawProjectsSchema(BaseModel):
     items: List[LawProjectSchema]
     total: int
     page: int
     size: int
     pages: int
+    facets: Optional[LawFacetsSchema] = None
+
+
+class PaginatedLawProjectsWithSummarySchema(PaginatedLawProjectsSchema):
+    items: List[LawProjectWithSummarySchema]
+
+class PaginatedLawProjectVotesSchema(BaseModel):
+    items: List[LawProjectVoteSchema]
+    total: int
+    page: int
+    size: int
+    pages: int
 
 # ------------------------------------------------------------
 # Esquema Compuesto: Ley, Votaciones y Detalles
@@ -282,6 +392,22 @@ class MatterSchema(BaseModel):
     id: int
     name: Optional[str] = None
 
+# ------------------------------------------------------------
+# Diccionarios: Opción de Voto + Tipo de Asistencia
+# ------------------------------------------------------------
+class VoteOptionSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    label: str
+    kind: int
+
+
+class AttendanceTypeSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: int
+    label: str
+    is_present: bool
+
 # ------------------------------------------------------------
 # Vote Detail
 # ------------------------------------------------------------
@@ -289,4 +415,119 @@ class VoteDetailHumanSchema(BaseModel):
     id: int
     name: str
     party: Optional[str] = None
-    vote: str
\ No newline at end of file
+    vote: str
+
+
+class LawProjectVoteWithDetailSchema(LawProjectVoteSchema):
+    votacion: List[VoteDetailHumanSchema]
+
+# ------------------------------------------------------------
+# Analytics: Similitud de Votación
+# ------------------------------------------------------------
+class PartyAgreementSchema(BaseModel):
+    party_id: int
+    members: int
+    agreement: Optional[float] = None
+
+
+class SimilarityMatrixSchema(BaseModel):
+    member_ids: List[int]
+    votes: int
+    agreement: List[List[Optional[float]]]
+    parties: List[PartyAgreementSchema]
+
+# ------------------------------------------------------------
+# Red de Coautoría
+# ------------------------------------------------------------
+class CoauthorMemberSchema(BaseModel):
+    member_id: int
+    party_id: Optional[int] = None
+    bills: int
+    degree: int
+    strength: int
+    centrality: float
+    cross_party_share: Optional[float] = None
+
+
+class CoauthorEdgeSchema(BaseModel):
+    source: int
+    target: int
+    weight: int
+    cross_party_weight: int
+
+
+class PartyCollaborationSchema(BaseModel):
+    party_a: int
+    party_b: int
+    weight: int
+
+
+class CoauthorshipSchema(BaseModel):
+    bills: int
+    members_total: int
+    edges_total: int
+    cross_party_share: Optional[float] = None
+    members: List[CoauthorMemberSchema]
+    edges: List[CoauthorEdgeSchema]
+    party_pairs: List[PartyCollaborationSchema]
+
+# ------------------------------------------------------------
+# Feed de Cambios (delta sync)
+# ------------------------------------------------------------
+class ChangeSchema(BaseModel):
+    table: str
+    op: Literal["upsert", "delete"]
+    id: int
+    row: Optional[Dict[str, Any]] = None
+
+
+class ChangeFeedSchema(BaseModel):
+    changes: List[ChangeSchema]
+    next: str
+    has_more: bool
+
+# ------------------------------------------------------------
+# Perfil de Diputado (agregado)
+# ------------------------------------------------------------
+class MemberVoteSchema(BaseModel):
+    vote_id: int
+    law_project_id: int
+    bulletin_number: str
+    project_name: str
+    date: datetime
+    description: str
+    result: str
+    vote: str
+
+
+class MemberProfileSchema(BaseModel):
+    member: ParliamentMemberSchema
+    party: Optional[PartyWithMembershipSchema] = None
+    parties: List[PartyWithMembershipSchema]
+    attendance: AttendanceResumeSchema
+    authored: List[LawProjectSchema]
+    authored_total: int
+    recent_votes: List[MemberVoteSchema]
+
+# ------------------------------------------------------------
+# Búsqueda (autocompletar)
+# ------------------------------------------------------------
+class CommuneSearchResultSchema(BaseModel):
+    commune: CommuneSchema
+    districts: List[DistrictSchema]
+    members: List[ParliamentMemberSchema]
+
+# ------------------------------------------------------------
+# Perfiles de Request (admin)
+# ------------------------------------------------------------
+class RequestProfileSchema(BaseModel):
+    id: str
+    method: str
+    path: str
+    status: Optional[int] = None
+    duration_ms: float
+    samples: int
+    categories: Dict[str, float]
+    sql_count: int
+    sql_ms: float
+    created_at: datetime
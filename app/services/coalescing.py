@@ -0,0 +1,132 @@
+# ============================
+# SINGLE-FLIGHT
+# ============================
+# Agrupa peticiones concurrentes idénticas en una sola ejecución.
+#   fresh_seconds: el último resultado se reutiliza tal cual.
+#   stale_seconds: pasado fresh, se sirve el resultado anterior mientras una
+#                  sola ejecución lo recalcula (stale-while-revalidate).
+#   lock_dir:      opcional; coordina los workers del mismo host con flock y
+#                  comparte el resultado en un archivo JSON (el resultado
+#                  debe ser serializable a JSON). Sin fcntl (Windows) se
+#                  agrupa solo dentro de cada worker.
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "task")
+
+    def __init__(self):
+        self.value: Any = None
+        self.stored_at = float("-inf")
+        self.task: Optional[asyncio.Future] = None
+
+
+class SingleFlight:
+    def __init__(
+        self,
+        name: str,
+        fresh_seconds: float = 1.0,
+        stale_seconds: float = 5.0,
+        max_entries: int = 512,
+        lock_dir: Optional[str] = None,
+    ):
+        self.name = name
+        self.fresh_seconds = fresh_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.lock_dir = lock_dir
+        self._fcntl = None
+        if lock_dir:
+            try:
+                import fcntl
+                self._fcntl = fcntl
+            except ImportError:
+                logger.warning("%s: flock not available; coalescing per worker only", name)
+                self.lock_dir = None
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+
+    # ------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------
+    async def get(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = _Entry()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+
+        age = time.monotonic() - entry.stored_at
+        if age < self.fresh_seconds:
+            return entry.value
+
+        if entry.task is None:
+            entry.task = asyncio.ensure_future(self._run(key, entry, compute))
+            entry.task.add_done_callback(self._log_failure)
+
+        if age < self.fresh_seconds + self.stale_seconds:
+            return entry.value
+        # shield: si un cliente se desconecta, la ejecución compartida sigue
+        return await asyncio.shield(entry.task)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    # ------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------
+    async def _run(self, key: Hashable, entry: _Entry, compute: Callable[[], Any]) -> Any:
+        try:
+            value = await run_in_threadpool(self._compute, key, compute)
+            entry.value = value
+            entry.stored_at = time.monotonic()
+            return value
+        finally:
+            entry.task = None
+
+    def _log_failure(self, task: asyncio.Future) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("%s: computation failed", self.name, exc_info=task.exception())
+
+    def _compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        if not self.lock_dir:
+            return compute()
+
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:20]
+        path = os.path.join(self.lock_dir, f"{self.name}-{digest}")
+        fcntl = self._fcntl
+        with open(path + ".lock", "a+") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Otro worker pudo calcularlo mientras esperábamos el lock
+                try:
+                    if time.time() - os.path.getmtime(path + ".json") < self.fresh_seconds:
+                        with open(path + ".json") as f:
+                            return json.load(f)
+                except (OSError, ValueError):
+                    pass
+
+                value = compute()
+                tmp = f"{path}.{os.getpid()}.tmp"
+                with open(tmp, "w") as f:
+                    json.dump(value, f, default=str)
+                os.replace(tmp, path + ".json")
+                return value
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
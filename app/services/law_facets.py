@@ -0,0 +1,221 @@
+# ============================
+# LAW FACET INDEX
+# ============================
+# Índice en memoria para filtrar /laws y contar facetas sin GROUP BY.
+# Los proyectos se guardan en el orden del listado (entry_date desc, id desc);
+# materias y ministerios como bitmaps empaquetados (un bitmap por valor),
+# tipo de iniciativa, cámara y año como códigos por proyecto.
+# Se reconstruye cuando cambia max(change_seq) de las tablas de proyectos
+# (app/db/sql/008).
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import ChangeTombstone, LawProject, LawProjectMatter, LawProjectMinistry
+
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+FACETS = ("matters", "ministries", "initiative_types", "years")
+
+# ------------------------------------------------------------
+# Columnas del Índice
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class _Codes:
+    values: np.ndarray
+    codes: np.ndarray
+
+    @classmethod
+    def build(cls, column: np.ndarray) -> "_Codes":
+        values, codes = np.unique(column, return_inverse=True)
+        return cls(values, codes.astype(np.int32))
+
+    def mask(self, wanted: Sequence) -> np.ndarray:
+        return np.isin(self.codes, np.flatnonzero(np.isin(self.values, list(wanted))))
+
+    def counts(self, mask: np.ndarray) -> np.ndarray:
+        return np.bincount(self.codes[mask], minlength=self.values.size)
+
+
+@dataclass(frozen=True)
+class _Bitmaps:
+    values: np.ndarray
+    bits: np.ndarray
+    size: int
+
+    @classmethod
+    def build(cls, pairs: np.ndarray, positions: Dict[int, int], size: int) -> "_Bitmaps":
+        rows = [(positions[p], v) for p, v in pairs if p in positions]
+        values = np.unique(np.fromiter((v for _, v in rows), dtype=np.int64, count=len(rows)))
+        dense = np.zeros((values.size, size), dtype=bool)
+        if rows:
+            pos = np.fromiter((p for p, _ in rows), dtype=np.int64, count=len(rows))
+            val = np.searchsorted(values, np.fromiter((v for _, v in rows), dtype=np.int64, count=len(rows)))
+            dense[val, pos] = True
+        return cls(values, np.packbits(dense, axis=1), size)
+
+    def mask(self, wanted: Sequence[int]) -> np.ndarray:
+        rows = self.bits[np.isin(self.values, list(wanted))]
+        if not rows.size:
+            return np.zeros(self.size, dtype=bool)
+        return np.unpackbits(np.bitwise_or.reduce(rows, axis=0), count=self.size).astype(bool)
+
+    def counts(self, mask: np.ndarray) -> np.ndarray:
+        packed = np.packbits(mask)
+        return POPCOUNT[self.bits & packed].sum(axis=1, dtype=np.int64)
+
+
+@dataclass
+class LawFilters:
+    matter_ids: List[int] = field(default_factory=list)
+    ministry_ids: List[int] = field(default_factory=list)
+    initiative_types: List[str] = field(default_factory=list)
+    origin_chambers: List[str] = field(default_factory=list)
+    years: List[int] = field(default_factory=list)
+    admissible: Optional[bool] = None
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+
+    def any(self) -> bool:
+        return bool(
+            self.matter_ids or self.ministry_ids or self.initiative_types or self.origin_chambers
+            or self.years or self.admissible is not None or self.date_from or self.date_to
+        )
+
+# ------------------------------------------------------------
+# Índice
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class LawFacetIndex:
+    version: tuple
+    ids: np.ndarray
+    entry_dates: np.ndarray
+    admissible: np.ndarray
+    initiative_types: _Codes
+    origin_chambers: _Codes
+    years: _Codes
+    matters: _Bitmaps
+    ministries: _Bitmaps
+
+    def _masks(self, f: LawFilters) -> Dict[str, np.ndarray]:
+        masks: Dict[str, np.ndarray] = {}
+        if f.matter_ids:
+            masks["matters"] = self.matters.mask(f.matter_ids)
+        if f.ministry_ids:
+            masks["ministries"] = self.ministries.mask(f.ministry_ids)
+        if f.initiative_types:
+            masks["initiative_types"] = self.initiative_types.mask(f.initiative_types)
+        if f.years:
+            masks["years"] = self.years.mask(f.years)
+        if f.origin_chambers:
+            masks["origin_chambers"] = self.origin_chambers.mask(f.origin_chambers)
+        if f.admissible is not None:
+            masks["admissible"] = self.admissible == f.admissible
+        if f.date_from:
+            masks["date_from"] = self.entry_dates >= np.datetime64(f.date_from, "D")
+        if f.date_to:
+            masks["date_to"] = self.entry_dates <= np.datetime64(f.date_to, "D")
+        return masks
+
+    def _combine(self, masks: Dict[str, np.ndarray], skip: Optional[str] = None) -> np.ndarray:
+        result = np.ones(self.ids.size, dtype=bool)
+        for name, m in masks.items():
+            if name != skip:
+                result &= m
+        return result
+
+    def search(self, f: LawFilters, offset: int, size: int, facets: bool = False):
+        masks = self._masks(f)
+        mask = self._combine(masks)
+        matched = self.ids[mask]
+        page = matched[offset:offset + size].tolist()
+
+        counts = None
+        if facets:
+            # Facetas disyuntivas: cada una se cuenta sin su propio filtro
+            counts = {
+                "matters": (self.matters.values, self.matters.counts(self._combine(masks, "matters"))),
+                "ministries": (self.ministries.values, self.ministries.counts(self._combine(masks, "ministries"))),
+                "initiative_types": (
+                    self.initiative_types.values,
+                    self.initiative_types.counts(self._combine(masks, "initiative_types")),
+                ),
+                "years": (self.years.values, self.years.counts(self._combine(masks, "years"))),
+            }
+        return page, int(matched.size), counts
+
+
+def _index_version(db: Session) -> tuple:
+    return db.execute(
+        select(
+            select(func.max(LawProject.change_seq)).scalar_subquery(),
+            select(func.max(LawProjectMatter.change_seq)).scalar_subquery(),
+            select(func.max(LawProjectMinistry.change_seq)).scalar_subquery(),
+            select(func.max(ChangeTombstone.change_seq))
+            .where(ChangeTombstone.table_name.in_(
+                [LawProject.__tablename__, LawProjectMatter.__tablename__, LawProjectMinistry.__tablename__]))
+            .scalar_subquery(),
+        )
+    ).one()._tuple()
+
+
+def load_law_facet_index(db: Session, version: tuple) -> LawFacetIndex:
+    rows = db.execute(
+        select(
+            LawProject.id,
+            LawProject.entry_date,
+            LawProject.admissible,
+            LawProject.initiative_type,
+            LawProject.origin_chamber,
+        ).order_by(LawProject.entry_date.desc(), LawProject.id.desc())
+    ).all()
+    n = len(rows)
+    ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=n)
+    entry_dates = np.array([r[1] for r in rows], dtype="datetime64[D]")
+    positions = {int(pid): i for i, pid in enumerate(ids)}
+
+    matter_pairs = db.execute(select(LawProjectMatter.law_project_id, LawProjectMatter.matter_id)).all()
+    ministry_pairs = db.execute(select(LawProjectMinistry.law_project_id, LawProjectMinistry.ministry_id)).all()
+
+    return LawFacetIndex(
+        version=version,
+        ids=ids,
+        entry_dates=entry_dates,
+        admissible=np.fromiter((bool(r[2]) for r in rows), dtype=bool, count=n),
+        initiative_types=_Codes.build(np.array([r[3] for r in rows], dtype=object)),
+        origin_chambers=_Codes.build(np.array([r[4] for r in rows], dtype=object)),
+        years=_Codes.build(entry_dates.astype("datetime64[Y]").astype(np.int64) + 1970),
+        matters=_Bitmaps.build(matter_pairs, positions, n),
+        ministries=_Bitmaps.build(ministry_pairs, positions, n),
+    )
+
+# ------------------------------------------------------------
+# Caché (mismo esquema que SimilarityCache)
+# ------------------------------------------------------------
+class LawFacetCache:
+    def __init__(self, refresh_seconds: float = 30.0):
+        self.refresh_seconds = refresh_seconds
+        self._index: Optional[LawFacetIndex] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def index(self, db: Session) -> LawFacetIndex:
+        if self._index is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return self._index
+        with self._lock:
+            if self._index is None or time.monotonic() - self._checked_at >= self.refresh_seconds:
+                version = _index_version(db)
+                if self._index is None or version != self._index.version:
+                    self._index = load_law_facet_index(db, version)
+                self._checked_at = time.monotonic()
+        return self._index
+
+
+law_facet_cache = LawFacetCache(refresh_seconds=settings.law_facets_refresh_seconds)
@@ -0,0 +1,185 @@
+# ============================
+# LIVE BROKER
+# ============================
+# Pub/sub en proceso para /live (SSE). Un solo hilo por worker escucha
+# LISTEN votabien_live (app/db/sql/009), arma cada evento una vez
+# (una consulta) y lo reparte ya serializado a todas las colas suscritas.
+# Las consultas de cada lote pasan por la admisión con LIVE_DEADLINE_SECONDS.
+# Un suscriptor lento cuya cola se llena se desconecta; EventSource
+# reconecta solo.
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.admission import thread_admission
+from app.core.config import settings
+from app.db.base import SessionLocal, get_engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "votabien_live"
+_CLOSE = None
+
+Resolver = Callable[[Session, Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+def sse_message(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+def _drain_notifies(conn) -> List[str]:
+    # psycopg2: poll() + lista notifies; psycopg 3 (DB_DRIVER=psycopg): generador
+    if hasattr(conn, "poll"):
+        conn.poll()
+        payloads = []
+        while conn.notifies:
+            payloads.append(conn.notifies.pop(0).payload)
+        return payloads
+    return [n.payload for n in conn.notifies(timeout=0)]
+
+
+class LiveBroker:
+    def __init__(self, queue_size: int = 64, keepalive_seconds: float = 15.0):
+        self.queue_size = queue_size
+        self.keepalive_seconds = keepalive_seconds
+        self._subs: Dict[str, Set[asyncio.Queue]] = {}
+        self._resolvers: Dict[str, Resolver] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def resolver(self, event_type: str):
+        def register(fn: Resolver) -> Resolver:
+            self._resolvers[event_type] = fn
+            return fn
+        return register
+
+    # ------------------------------------------------------------
+    # Suscriptores (event loop)
+    # ------------------------------------------------------------
+    async def stream(self, topic: str) -> AsyncIterator[str]:
+        q: asyncio.Queue = asyncio.Queue(self.queue_size)
+        self._subs.setdefault(topic, set()).add(q)
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    msg = await asyncio.wait_for(q.get(), self.keepalive_seconds)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if msg is _CLOSE:
+                    return
+                yield msg
+        finally:
+            subs = self._subs.get(topic)
+            if subs is not None:
+                subs.discard(q)
+                if not subs:
+                    self._subs.pop(topic, None)
+
+    def publish(self, topic: str, message: str) -> None:
+        for q in list(self._subs.get(topic, ())):
+            try:
+                q.put_nowait(message)
+            except asyncio.QueueFull:
+                while not q.empty():
+                    q.get_nowait()
+                q.put_nowait(_CLOSE)
+
+    # ------------------------------------------------------------
+    # Listener (hilo)
+    # ------------------------------------------------------------
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._thread is not None:
+            return
+        self._loop = loop
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._listen, name="live-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            conn = None
+            try:
+                # Conexión dedicada, fuera del pool
+                proxied = get_engine().raw_connection()
+                proxied.detach()
+                conn = proxied.dbapi_connection
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CHANNEL}")
+                backoff = 1.0
+
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    payloads = _drain_notifies(conn)
+                    if payloads:
+                        self._dispatch(payloads)
+            except Exception:
+                logger.exception("Live listener failed; reconnecting in %ss", backoff)
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _dispatch(self, payloads: List[str]) -> None:
+        events = []
+        for raw in dict.fromkeys(payloads):
+            try:
+                payload = json.loads(raw)
+            except ValueError:
+                continue
+            # Sin suscriptores no se consulta nada
+            if payload.get("topic") in self._subs and payload.get("type") in self._resolvers:
+                events.append(payload)
+        if not events:
+            return
+
+        # Las consultas cuentan en la admisión y llevan statement_timeout
+        try:
+            with thread_admission(self._loop, settings.live_deadline_seconds):
+                self._resolve(events)
+        except HTTPException:
+            logger.warning("Live events dropped (server busy): %s", events)
+
+    def _resolve(self, events: List[Dict[str, Any]]) -> None:
+        db = SessionLocal()
+        try:
+            for payload in events:
+                try:
+                    data = self._resolvers[payload["type"]](db, payload)
+                except Exception:
+                    logger.exception("Live event %s failed", payload)
+                    db.rollback()
+                    continue
+                if data is not None:
+                    message = sse_message(payload["type"], data)
+                    self._loop.call_soon_threadsafe(self.publish, payload["topic"], message)
+        finally:
+            db.close()
+
+
+live_broker = LiveBroker(
+    queue_size=settings.live_queue_size,
+    keepalive_seconds=settings.live_keepalive_seconds,
+)
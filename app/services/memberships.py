@@ -0,0 +1,249 @@
+# ============================
+# MEMBERSHIP INTERVAL INDEX
+# ============================
+# Índice en memoria de militancias para consultas "a la fecha" (as_of) y
+# para la composición de la cámara en el tiempo (barrido de eventos).
+# Al recargar el snapshot solo se vuelven a leer las militancias cuyo
+# change_seq cambió (app/db/sql/008).
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Generic, Iterable, List, Mapping, Optional, Sequence, Set, Tuple, TypeVar
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import PartyMembership
+
+T = TypeVar("T")
+OPEN_END = datetime.max
+
+
+def as_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+# ------------------------------------------------------------
+# Árbol de Intervalos (centrado, estático, [start, end))
+# ------------------------------------------------------------
+class _Node:
+    __slots__ = ("center", "by_start", "by_end", "left", "right")
+
+    def __init__(self, center, by_start, by_end, left, right):
+        self.center = center
+        self.by_start = by_start
+        self.by_end = by_end
+        self.left = left
+        self.right = right
+
+
+class IntervalTree(Generic[T]):
+    def __init__(self, intervals: Sequence[Tuple[datetime, datetime, T]]):
+        self._root = self._build([iv for iv in intervals if iv[0] < iv[1]])
+
+    def _build(self, intervals):
+        if not intervals:
+            return None
+        # Mediana de los inicios: al menos un intervalo contiene el centro
+        starts = sorted(iv[0] for iv in intervals)
+        center = starts[len(starts) // 2]
+
+        here, left, right = [], [], []
+        for iv in intervals:
+            if iv[1] <= center:
+                left.append(iv)
+            elif iv[0] > center:
+                right.append(iv)
+            else:
+                here.append(iv)
+
+        return _Node(
+            center,
+            sorted(here, key=lambda iv: iv[0]),
+            sorted(here, key=lambda iv: iv[1], reverse=True),
+            self._build(left),
+            self._build(right),
+        )
+
+    def at(self, point: datetime) -> List[T]:
+        found: List[T] = []
+        node = self._root
+        while node is not None:
+            if point < node.center:
+                for s, _, payload in node.by_start:
+                    if s > point:
+                        break
+                    found.append(payload)
+                node = node.left
+            else:
+                for _, e, payload in node.by_end:
+                    if e <= point:
+                        break
+                    found.append(payload)
+                node = node.right if point > node.center else None
+        return found
+
+# ------------------------------------------------------------
+# Composición en el Tiempo (barrido de inicios / términos)
+# ------------------------------------------------------------
+def _datetime64(values: Iterable[datetime]) -> np.ndarray:
+    return np.array(list(values), dtype="datetime64[s]")
+
+
+class CompositionTimeline:
+    def __init__(self, record_ids: np.ndarray, times: np.ndarray, parties: np.ndarray, deltas: np.ndarray):
+        order = np.argsort(times, kind="stable")
+        self.record_ids = record_ids[order]
+        self.times = times[order]
+        self.parties = parties[order]
+        self.deltas = deltas[order]
+
+        # seats[k] = escaños por partido tras los primeros k eventos
+        self.party_ids, codes = np.unique(self.parties, return_inverse=True)
+        steps = np.zeros((self.times.size + 1, self.party_ids.size), dtype=np.int32)
+        steps[np.arange(1, self.times.size + 1), codes] = self.deltas
+        self.seats = np.cumsum(steps, axis=0, dtype=np.int32)
+
+    @classmethod
+    def build(cls, records: Sequence["MembershipRecord"]) -> "CompositionTimeline":
+        return cls(*cls._events(records))
+
+    @staticmethod
+    def _events(records: Sequence["MembershipRecord"]):
+        spans = [r for r in records if r.end_date is None or r.start_date < r.end_date]
+        closed = [r for r in spans if r.end_date is not None]
+        record_ids = np.array([r.id for r in spans] + [r.id for r in closed], dtype=np.int64)
+        times = np.concatenate([
+            _datetime64(r.start_date for r in spans),
+            _datetime64(r.end_date for r in closed),
+        ]).astype("datetime64[s]")
+        parties = np.array([r.party_id for r in spans] + [r.party_id for r in closed], dtype=np.int64)
+        deltas = np.concatenate([np.ones(len(spans), np.int32), -np.ones(len(closed), np.int32)])
+        return record_ids, times, parties, deltas
+
+    def patched(self, removed: Set[int], added: Sequence["MembershipRecord"]) -> "CompositionTimeline":
+        keep = ~np.isin(self.record_ids, np.fromiter(removed, dtype=np.int64, count=len(removed)))
+        ids, times, parties, deltas = self._events(added)
+        return CompositionTimeline(
+            np.concatenate([self.record_ids[keep], ids]),
+            np.concatenate([self.times[keep], times]),
+            np.concatenate([self.parties[keep], parties]),
+            np.concatenate([self.deltas[keep], deltas]),
+        )
+
+    @property
+    def first(self) -> Optional[datetime]:
+        return self.times[0].astype(datetime) if self.times.size else None
+
+    def at(self, points: np.ndarray) -> np.ndarray:
+        # [start, end): en el instante t cuentan todos los eventos <= t
+        return self.seats[np.searchsorted(self.times, points.astype("datetime64[s]"), side="right")]
+
+# ------------------------------------------------------------
+# Índice de Militancias
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class MembershipRecord:
+    id: int
+    parliament_member_id: int
+    party_id: int
+    start_date: datetime
+    end_date: Optional[datetime]
+
+
+class MembershipIndex:
+    def __init__(
+        self,
+        records: Sequence[MembershipRecord],
+        stamps: Optional[Mapping[int, int]] = None,
+        timeline: Optional[CompositionTimeline] = None,
+    ):
+        self.records = tuple(records)
+        self.stamps: Mapping[int, int] = stamps or {}
+        self.timeline = timeline if timeline is not None else CompositionTimeline.build(self.records)
+
+        by_member: Dict[int, List[MembershipRecord]] = {}
+        by_party: Dict[int, List[MembershipRecord]] = {}
+        for r in records:
+            by_member.setdefault(r.parliament_member_id, []).append(r)
+            by_party.setdefault(r.party_id, []).append(r)
+
+        self._by_member = {
+            m: tuple(sorted(rs, key=lambda r: (r.start_date, r.id))) for m, rs in by_member.items()
+        }
+        self._member_starts = {m: [r.start_date for r in rs] for m, rs in self._by_member.items()}
+        self._party_records = {p: tuple(rs) for p, rs in by_party.items()}
+        self._by_party = {
+            p: IntervalTree([(r.start_date, r.end_date or OPEN_END, r) for r in rs])
+            for p, rs in by_party.items()
+        }
+
+    def history(self, member_id: int) -> Tuple[MembershipRecord, ...]:
+        return self._by_member.get(member_id, ())
+
+    def current(self, member_id: int) -> Optional[MembershipRecord]:
+        records = self._by_member.get(member_id)
+        if not records:
+            return None
+        open_records = [r for r in records if r.end_date is None]
+        return (open_records or records)[-1]
+
+    def party_current(self, party_id: int, now: datetime) -> List[MembershipRecord]:
+        now = as_naive_utc(now)
+        return [
+            r for r in self._party_records.get(party_id, ())
+            if r.end_date is None or r.end_date > now
+        ]
+
+    def member_party_at(self, member_id: int, at: datetime) -> Optional[MembershipRecord]:
+        records = self._by_member.get(member_id)
+        if not records:
+            return None
+        at = as_naive_utc(at)
+        i = bisect_right(self._member_starts[member_id], at) - 1
+        while i >= 0:
+            r = records[i]
+            if r.end_date is None or r.end_date > at:
+                return r
+            i -= 1
+        return None
+
+    def party_members_at(self, party_id: int, at: datetime) -> List[MembershipRecord]:
+        tree = self._by_party.get(party_id)
+        return tree.at(as_naive_utc(at)) if tree else []
+
+
+_RECORD_COLUMNS = (
+    PartyMembership.id,
+    PartyMembership.parliament_member_id,
+    PartyMembership.party_id,
+    PartyMembership.start_date,
+    PartyMembership.end_date,
+)
+
+
+def load_membership_index(db: Session, previous: Optional[MembershipIndex] = None) -> MembershipIndex:
+    if previous is None or not previous.stamps:
+        rows = db.execute(select(*_RECORD_COLUMNS, PartyMembership.change_seq)).all()
+        return MembershipIndex(
+            [MembershipRecord(*r[:5]) for r in rows],
+            {r[0]: r[5] for r in rows},
+        )
+
+    # Solo (id, change_seq); se leen completas las filas nuevas o modificadas
+    stamps = dict(db.execute(select(PartyMembership.id, PartyMembership.change_seq)).all())
+    if stamps == previous.stamps:
+        return previous
+
+    changed = [i for i, seq in stamps.items() if previous.stamps.get(i) != seq]
+    removed = set(previous.stamps) - set(stamps) | set(changed)
+    added = [
+        MembershipRecord(*r)
+        for r in db.execute(select(*_RECORD_COLUMNS).where(PartyMembership.id.in_(changed)))
+    ] if changed else []
+
+    records = [r for r in previous.records if r.id not in removed] + added
+    return MembershipIndex(records, stamps, previous.timeline.patched(removed, added))
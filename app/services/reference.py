@@ -0,0 +1,205 @@
+# ============================
+# REFERENCE SNAPSHOT
+# ============================
+# Snapshot inmutable en memoria de las tablas de referencia (diputados,
+# partidos, militancias, territorio, ministerios, materias y diccionarios
+# de opciones de voto / tipos de asistencia).
+# Se construye en el arranque y se reemplaza de forma atómica cuando
+# cambia reference_data_version.
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.base import SessionLocal
+from app.db.models import (
+    ParliamentMember, Party, District, Commune, DistrictCommune, Ministry, Matter, VoteOption, AttendanceType,
+    ReferenceDataVersion)
+from app.schemas.schemas import (
+    ParliamentMemberSchema,
+    PartySchema,
+    DistrictSchema,
+    CommuneSchema,
+    DistrictWithCommunesAndMembersSchema,
+    MinistrySchema,
+    MatterSchema,
+    VoteOptionSchema,
+    AttendanceTypeSchema,
+    AttendanceSchema,
+)
+from app.services.memberships import MembershipIndex, load_membership_index
+from app.services.search import PrefixIndex
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------
+# Snapshot
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class ReferenceSnapshot:
+    version: int
+
+    members: Tuple[ParliamentMemberSchema, ...]
+    members_by_id: Mapping[int, ParliamentMemberSchema]
+    members_by_constituency: Mapping[str, Tuple[ParliamentMemberSchema, ...]]
+
+    parties: Tuple[PartySchema, ...]
+    parties_by_id: Mapping[int, PartySchema]
+    memberships: MembershipIndex
+
+    districts: Tuple[DistrictWithCommunesAndMembersSchema, ...]
+    districts_by_id: Mapping[int, DistrictWithCommunesAndMembersSchema]
+    communes: Tuple[CommuneSchema, ...]
+    districts_by_commune: Mapping[int, Tuple[DistrictWithCommunesAndMembersSchema, ...]]
+
+    ministries_by_id: Mapping[int, MinistrySchema]
+    matters_by_id: Mapping[int, MatterSchema]
+
+    vote_options: Mapping[int, VoteOptionSchema]
+    attendance_types: Mapping[int, AttendanceTypeSchema]
+
+    member_search: PrefixIndex[ParliamentMemberSchema]
+    commune_search: PrefixIndex[CommuneSchema]
+
+    def vote_label(self, option_id: Optional[int]) -> str:
+        option = self.vote_options.get(option_id)
+        return option.label if option else ""
+
+    def is_present(self, attendance_type_id: int) -> bool:
+        t = self.attendance_types.get(attendance_type_id)
+        return bool(t and t.is_present)
+
+    def attendance(self, a) -> AttendanceSchema:
+        t = self.attendance_types.get(a.attendance_type_id)
+        return AttendanceSchema(
+            id=a.id,
+            session_id=a.session_id,
+            parliament_member_id=a.parliament_member_id,
+            attendance_type=t.label if t else "",
+            justification=a.justification,
+            reduces_attendance=a.reduces_attendance,
+            reduces_quorum=a.reduces_quorum,
+        )
+
+
+def _member_sort_key(m: ParliamentMemberSchema):
+    return (m.last_name or "", m.first_name or "")
+
+
+def _rows(db: Session, model, schema, *order_by):
+    stmt = select(*model.__table__.c).order_by(*order_by)
+    return [schema.model_validate(r._mapping) for r in db.execute(stmt)]
+
+
+def current_version(db: Session) -> int:
+    return db.execute(
+        select(ReferenceDataVersion.version).where(ReferenceDataVersion.id == 1)
+    ).scalar() or 0
+
+
+def load_reference_snapshot(db: Session, previous: Optional[ReferenceSnapshot] = None) -> ReferenceSnapshot:
+    version = current_version(db)
+
+    members = _rows(db, ParliamentMember, ParliamentMemberSchema, ParliamentMember.id)
+    parties = _rows(db, Party, PartySchema, Party.id)
+    districts = _rows(db, District, DistrictSchema, District.number)
+    communes = _rows(db, Commune, CommuneSchema, Commune.id)
+    ministries = _rows(db, Ministry, MinistrySchema, Ministry.id)
+    matters = _rows(db, Matter, MatterSchema, Matter.id)
+    vote_options = _rows(db, VoteOption, VoteOptionSchema, VoteOption.id)
+    attendance_types = _rows(db, AttendanceType, AttendanceTypeSchema, AttendanceType.id)
+    district_communes = db.execute(select(DistrictCommune.district_id, DistrictCommune.commune_id)).all()
+
+    by_constituency: Dict[str, List[ParliamentMemberSchema]] = {}
+    for m in members:
+        if m.constituency is not None:
+            by_constituency.setdefault(m.constituency, []).append(m)
+    members_by_constituency = {
+        k: tuple(sorted(v, key=_member_sort_key)) for k, v in by_constituency.items()
+    }
+
+    communes_by_id = {c.id: c for c in communes}
+    communes_by_district: Dict[int, List[CommuneSchema]] = {}
+    for d_id, c_id in district_communes:
+        if c_id in communes_by_id:
+            communes_by_district.setdefault(d_id, []).append(communes_by_id[c_id])
+
+    district_tree = tuple(
+        DistrictWithCommunesAndMembersSchema(
+            district=d,
+            communes=sorted(communes_by_district.get(d.id, []), key=lambda c: c.name or ""),
+            members=list(members_by_constituency.get(str(d.number), ())),
+        )
+        for d in districts
+    )
+
+    districts_by_commune: Dict[int, List[DistrictWithCommunesAndMembersSchema]] = {}
+    for d in district_tree:
+        for c in d.communes:
+            districts_by_commune.setdefault(c.id, []).append(d)
+
+    return ReferenceSnapshot(
+        version=version,
+        members=tuple(members),
+        members_by_id=MappingProxyType({m.id: m for m in members}),
+        members_by_constituency=MappingProxyType(members_by_constituency),
+        parties=tuple(parties),
+        parties_by_id=MappingProxyType({p.id: p for p in parties}),
+        memberships=load_membership_index(db, previous.memberships if previous else None),
+        districts=district_tree,
+        districts_by_id=MappingProxyType({d.district.id: d for d in district_tree}),
+        communes=tuple(communes),
+        districts_by_commune=MappingProxyType({k: tuple(v) for k, v in districts_by_commune.items()}),
+        ministries_by_id=MappingProxyType({m.id: m for m in ministries}),
+        matters_by_id=MappingProxyType({m.id: m for m in matters}),
+        vote_options=MappingProxyType({o.id: o for o in vote_options}),
+        attendance_types=MappingProxyType({t.id: t for t in attendance_types}),
+        member_search=PrefixIndex(
+            (m, (m.first_name, m.middle_name, m.last_name, m.second_last_name)) for m in members
+        ),
+        commune_search=PrefixIndex((c, (c.name,)) for c in communes),
+    )
+
+# ------------------------------------------------------------
+# Snapshot Actual (swap atómico)
+# ------------------------------------------------------------
+_snapshot: Optional[ReferenceSnapshot] = None
+
+
+def current_reference() -> Optional[ReferenceSnapshot]:
+    return _snapshot
+
+
+async def get_reference() -> ReferenceSnapshot:
+    if _snapshot is None:
+        raise HTTPException(status_code=503, detail="Reference data not loaded")
+    return _snapshot
+
+
+def refresh_reference(force: bool = False) -> bool:
+    global _snapshot
+    db = SessionLocal()
+    try:
+        if not force and _snapshot is not None and current_version(db) == _snapshot.version:
+            return False
+        _snapshot = load_reference_snapshot(db, _snapshot)
+        logger.info("Reference snapshot loaded (version %s)", _snapshot.version)
+        return True
+    finally:
+        db.close()
+
+
+async def poll_reference(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(refresh_reference)
+        except Exception:
+            logger.exception("Reference snapshot refresh failed")
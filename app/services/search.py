@@ -0,0 +1,104 @@
+# ============================
+# SEARCH INDEX
+# ============================
+# Índice en memoria para autocompletar (sin acentos ni mayúsculas).
+# Cada palabra de la consulta debe ser prefijo de alguna palabra del
+# documento; si nada coincide se recurre a similitud por trigramas
+# (errores de tipeo: "nunoa" -> "Ñuñoa", "peres" -> "Pérez").
+
+import re
+import unicodedata
+from bisect import bisect_left
+from typing import Dict, Generic, Iterable, List, Sequence, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+# Fracción de trigramas de la consulta presentes en el documento
+MIN_SIMILARITY = 0.5
+
+
+def fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _NON_WORD.sub(" ", stripped.lower()).strip()
+
+
+def _trigrams(folded: str) -> Set[str]:
+    grams: Set[str] = set()
+    for word in folded.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class PrefixIndex(Generic[T]):
+    def __init__(self, entries: Iterable[Tuple[T, Sequence[str]]]):
+        self._items: List[T] = []
+        self._texts: List[str] = []
+        self._words: List[Set[str]] = []
+        postings: Dict[str, Set[int]] = {}
+        trigram_postings: Dict[str, Set[int]] = {}
+
+        for item, parts in entries:
+            doc = len(self._items)
+            text = fold(" ".join(p for p in parts if p))
+            words = set(text.split())
+            self._items.append(item)
+            self._texts.append(text)
+            self._words.append(words)
+            for w in words:
+                postings.setdefault(w, set()).add(doc)
+            for g in _trigrams(text):
+                trigram_postings.setdefault(g, set()).add(doc)
+
+        self._tokens = sorted(postings)
+        self._postings = {w: frozenset(d) for w, d in postings.items()}
+        self._trigram_postings = {g: frozenset(d) for g, d in trigram_postings.items()}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _prefix_docs(self, prefix: str) -> Set[int]:
+        docs: Set[int] = set()
+        i = bisect_left(self._tokens, prefix)
+        while i < len(self._tokens) and self._tokens[i].startswith(prefix):
+            docs |= self._postings[self._tokens[i]]
+            i += 1
+        return docs
+
+    def search(self, query: str, limit: int = 10) -> List[T]:
+        words = fold(query).split()
+        if not words:
+            return []
+
+        docs = self._prefix_docs(words[0])
+        for w in words[1:]:
+            if not docs:
+                break
+            docs &= self._prefix_docs(w)
+
+        if docs:
+            # Más palabras exactas primero; luego orden alfabético
+            ranked = sorted(
+                docs,
+                key=lambda d: (-sum(w in self._words[d] for w in words), self._texts[d]),
+            )
+            return [self._items[d] for d in ranked[:limit]]
+
+        return self._similar(words, limit)
+
+    def _similar(self, words: List[str], limit: int) -> List[T]:
+        grams = _trigrams(" ".join(words))
+        shared: Dict[int, int] = {}
+        for g in grams:
+            for d in self._trigram_postings.get(g, ()):
+                shared[d] = shared.get(d, 0) + 1
+
+        scored = []
+        for d, n in shared.items():
+            similarity = n / len(grams)
+            if similarity >= MIN_SIMILARITY:
+                scored.append((-similarity, self._texts[d], d))
+        scored.sort()
+        return [self._items[d] for _, _, d in scored[:limit]]